@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+长期归档基准测试
+
+每天一次快照、保留一整年：对比把历史留在 SQLite 中按技能查询再组装成 技能 × 天数 矩阵，
+与从按月 .npy 归档（内存映射）直接切出矩阵的耗时，以及两者的磁盘占用
+
+用法:
+    python benchmarks/bench_archive.py
+    python benchmarks/bench_archive.py --skills 500 --days 90 --names 50
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.archive import SnapshotArchive, MISSING
+from src.database import Database
+
+
+def sql_matrix(db: Database, names, dates) -> np.ndarray:
+    """原做法：从 SQLite 查询历史，再逐行填入矩阵"""
+    history = db.get_skills_history_many(names, days=len(dates) + 1)
+    column = {d: i for i, d in enumerate(dates)}
+    matrix = np.full((len(names), len(dates)), MISSING, dtype=np.int32)
+    for row, name in enumerate(names):
+        for item in history.get(name, []):
+            if item["date"] in column:
+                matrix[row, column[item["date"]]] = item["rank"]
+    return matrix
+
+
+def timed(func, repeat: int) -> float:
+    """平均耗时（毫秒）"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="长期归档基准测试")
+    parser.add_argument("--skills", type=int, default=2000, help="每次快照的技能数")
+    parser.add_argument("--days", type=int, default=365, help="天数（每天一次快照）")
+    parser.add_argument("--names", type=int, default=100, help="每次读取的技能数")
+    parser.add_argument("--repeat", type=int, default=5, help="重复次数")
+    args = parser.parse_args()
+
+    names = [f"skill-{i:05d}" for i in range(0, args.skills, max(1, args.skills // args.names))][:args.names]
+    start = datetime.now() - timedelta(days=args.days)
+    dates = [(start + timedelta(days=n)).strftime("%Y-%m-%d") for n in range(args.days)]
+    print(f"{args.skills} 个技能 × {args.days} 天，读取 {len(names)} 个技能的全部历史\n")
+
+    with tempfile.TemporaryDirectory() as directory:
+        db_path = os.path.join(directory, "archive.db")
+        db = Database(db_path, archive_dir=os.path.join(directory, "archive"))
+        with contextlib.redirect_stdout(io.StringIO()):
+            db.init_db()
+            for n, date in enumerate(dates):
+                db.save_snapshot(f"{date} 12:00:00", date, [
+                    {"rank": (i + n) % args.skills + 1, "name": f"skill-{i:05d}", "owner": "owner/repo",
+                     "installs": 100_000 - i + n}
+                    for i in range(args.skills)
+                ])
+        db.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        db_size = os.path.getsize(db_path)
+
+        started = time.perf_counter()
+        with db.reader() as conn:
+            archived = db.archive.append(tuple(row) for row in conn.execute("""
+                SELECT s.skill_id, p.date, s.rank, s.installs
+                FROM snapshots p JOIN skills_snapshot s ON s.snapshot_id = p.id
+            """))
+        archive_seconds = time.perf_counter() - started
+        archive_size = sum(
+            os.path.getsize(os.path.join(root, f))
+            for root, _, files in os.walk(db.archive.archive_dir) for f in files
+        )
+
+        expected = sql_matrix(db, names, dates)
+        got = db.get_archived_matrix(dates[0], dates[-1], names)
+        assert got["names"] == names and np.array_equal(got["rank"], expected)
+
+        sql_ms = timed(lambda: sql_matrix(db, names, dates), args.repeat)
+        archive_ms = timed(lambda: db.get_archived_matrix(dates[0], dates[-1], names), args.repeat)
+        full_archive = SnapshotArchive(db.archive.archive_dir)
+        full_ms = timed(lambda: full_archive.matrix(dates[0], dates[-1]), args.repeat)
+        db.close()
+
+    print(f"归档写入 {archived:,} 个单元格: {archive_seconds:.2f}s")
+    print(f"磁盘占用: SQLite {db_size / 1024 / 1024:.2f}MB，归档 {archive_size / 1024 / 1024:.2f}MB\n")
+    print(f"{len(names)} 个技能 × {args.days} 天矩阵: SQLite {sql_ms:.2f}ms，归档 {archive_ms:.2f}ms")
+    print(f"全部 {args.skills} 个技能 × {args.days} 天矩阵（rank + installs）: 归档 {full_ms:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
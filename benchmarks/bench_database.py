@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+数据库写入基准测试
+
+1. 快照写入：逐行写入（batch_size=1）与分批 executemany，分别在 SQLite 默认 PRAGMA 和调优 PRAGMA 下，
+   对比 100 / 10k / 1M 行的每行耗时
+2. 逐条提交：模拟流水线中每个 AI 结果单独 save_skill_details，对比两种 PRAGMA 下的每次提交耗时
+
+用法:
+    python benchmarks/bench_database.py
+    python benchmarks/bench_database.py --sizes 100,10000
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.database import Database
+
+SNAPSHOT_TIME = "2026-01-24 08:00:00"
+DATE = "2026-01-24"
+COMMITS = 200
+
+
+def make_skills(count: int):
+    """生成模拟榜单（生成器）"""
+    for i in range(count):
+        yield {
+            "rank": i + 1,
+            "name": f"skill-{i}",
+            "owner": f"owner-{i % 1000}/repo",
+            "installs": 1_000_000 - i,
+            "installs_delta": i % 50,
+            "installs_rate": 0.01,
+            "rank_delta": 0,
+            "url": f"https://skills.sh/owner-{i % 1000}/repo/skill-{i}",
+        }
+
+
+def open_db(directory: str, label: str, pragmas, batch_size: int = None) -> Database:
+    """在临时目录中创建并初始化数据库（屏蔽初始化日志）"""
+    db = Database(os.path.join(directory, f"{label}.db"), pragmas=pragmas, batch_size=batch_size)
+    stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+    try:
+        db.init_db()
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+    return db
+
+
+def bench_snapshot(size: int, directory: str) -> list:
+    """快照写入：返回 [(方案, 每行微秒)]"""
+    results = []
+    for label, pragmas, batch_size in (
+        ("逐行 + 默认 PRAGMA", {}, 1),
+        ("逐行 + 调优 PRAGMA", None, 1),
+        ("批量 + 调优 PRAGMA", None, None),
+    ):
+        db = open_db(directory, f"snapshot-{size}-{len(results)}", pragmas, batch_size)
+        stdout, sys.stdout = sys.stdout, open(os.devnull, "w")
+        try:
+            started = time.perf_counter()
+            db.save_snapshot(SNAPSHOT_TIME, DATE, make_skills(size))
+            elapsed = time.perf_counter() - started
+        finally:
+            sys.stdout.close()
+            sys.stdout = stdout
+        db.close()
+        results.append((label, elapsed / size * 1e6, elapsed))
+    return results
+
+
+def bench_commits(directory: str) -> list:
+    """逐条提交 save_skill_details：返回 [(方案, 每次提交毫秒)]"""
+    results = []
+    for label, pragmas in (("默认 PRAGMA", {}), ("调优 PRAGMA", None)):
+        db = open_db(directory, f"commits-{len(results)}", pragmas)
+        started = time.perf_counter()
+        for i in range(COMMITS):
+            db.save_skill_details([{
+                "name": f"skill-{i}", "summary": "摘要", "description": "描述", "use_case": "场景",
+                "solves": ["a", "b"], "category": "other", "category_zh": "其他", "rules_count": 3,
+                "owner": "owner", "url": "https://skills.sh/x", "content_hash": "0" * 64,
+            }], verbose=False)
+        elapsed = time.perf_counter() - started
+        db.close()
+        results.append((label, elapsed / COMMITS * 1000))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数据库写入基准测试")
+    parser.add_argument("--sizes", default="100,10000,1000000", help="快照行数，逗号分隔")
+    args = parser.parse_args()
+    sizes = [int(s) for s in args.sizes.split(",") if s]
+
+    with tempfile.TemporaryDirectory() as directory:
+        print("快照写入（每行一条快照表记录，历史由快照汇总）")
+        print(f"{'行数':>9}  {'方案':<20} {'每行':>10} {'总耗时':>10}")
+        for size in sizes:
+            for label, per_row_us, elapsed in bench_snapshot(size, directory):
+                print(f"{size:>9}  {label:<20} {per_row_us:>8.2f}µs {elapsed:>9.3f}s")
+
+        print(f"\n逐条提交 save_skill_details（{COMMITS} 次）")
+        for label, per_commit_ms in bench_commits(directory):
+            print(f"  {label:<14} {per_commit_ms:>7.3f}ms/次")
+
+
+if __name__ == "__main__":
+    main()
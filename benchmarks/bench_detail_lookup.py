@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+技能详情查询基准测试
+
+skills_details 分别有 1k / 10k / 100k 条记录时，取榜单上 100 个技能的详情：
+全表读取（get_all_skill_details，原 TrendAnalyzer 的做法）对比批量 IN 查询（冷缓存 / 热缓存）
+
+用法:
+    python benchmarks/bench_detail_lookup.py
+    python benchmarks/bench_detail_lookup.py --sizes 1000,10000 --names 200
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.database import Database
+
+
+def make_details(count: int):
+    """生成模拟 AI 分析结果"""
+    for i in range(count):
+        yield {
+            "name": f"skill-{i:06d}",
+            "summary": f"技能 {i} 的一句话摘要，说明它能做什么",
+            "description": "详细描述。" * 20,
+            "use_case": "使用场景说明。" * 5,
+            "solves": [f"问题 {j}" for j in range(3)],
+            "category": "coding",
+            "category_zh": "编程开发",
+            "rules_count": 5,
+            "owner": f"owner-{i % 500}/repo",
+            "url": f"https://skills.sh/owner-{i % 500}/repo/skill-{i:06d}",
+            "content_hash": "0" * 64,
+        }
+
+
+def timed(func, repeat: int) -> float:
+    """平均耗时（毫秒）"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="技能详情查询基准测试")
+    parser.add_argument("--sizes", default="1000,10000,100000", help="skills_details 记录数，逗号分隔")
+    parser.add_argument("--names", type=int, default=100, help="每次查询的技能数（榜单大小）")
+    parser.add_argument("--repeat", type=int, default=10, help="重复次数")
+    args = parser.parse_args()
+
+    print(f"每次查询榜单上的 {args.names} 个技能，单位：毫秒\n")
+    print(f"{'记录数':>8} {'全表读取':>10} {'批量冷缓存':>10} {'批量热缓存':>10}")
+
+    for size in [int(s) for s in args.sizes.split(",") if s]:
+        with tempfile.TemporaryDirectory() as directory:
+            db = Database(os.path.join(directory, "details.db"))
+            with contextlib.redirect_stdout(io.StringIO()):
+                db.init_db()
+            db.save_skill_details(list(make_details(size)), verbose=False)
+
+            step = max(1, size // args.names)
+            names = [f"skill-{i:06d}" for i in range(0, size, step)][:args.names]
+
+            def cold():
+                db._detail_cache.clear()
+                return db.get_skill_details_many(names)
+
+            full = timed(db.get_all_skill_details, args.repeat)
+            cold_ms = timed(cold, args.repeat)
+            warm_ms = timed(lambda: db.get_skill_details_many(names), args.repeat)
+
+            all_details = db.get_all_skill_details()
+            assert db.get_skill_details_many(names) == {n: all_details[n] for n in names}
+            db.close()
+
+        print(f"{size:>8} {full:>8.2f}ms {cold_ms:>8.2f}ms {warm_ms:>8.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
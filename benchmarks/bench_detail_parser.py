@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+详情页解析器基准测试
+
+1. 用录制的详情页（benchmarks/fixtures/detail_page*.html）校验 lxml 后端与 BeautifulSoup 后端提取结果一致
+2. 对比两个后端的单页解析耗时
+
+用法:
+    python benchmarks/bench_detail_parser.py
+"""
+import glob
+import os
+import sys
+import time
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.detail_fetcher import DetailFetcher
+
+FIXTURES_DIR = os.path.join(project_root, "benchmarks", "fixtures")
+URL = "https://skills.sh/owner/repo/skill"
+REPEAT = 200
+FIELDS = ("name", "when_to_use", "rules")
+
+
+def load_fixtures() -> list:
+    """读取录制的详情页"""
+    pages = []
+    for path in sorted(glob.glob(os.path.join(FIXTURES_DIR, "detail_page*.html"))):
+        with open(path, encoding="utf-8") as f:
+            pages.append((os.path.basename(path), f.read()))
+    return pages
+
+
+def best_of(fetcher: DetailFetcher, html: str, repeat: int) -> float:
+    """多次运行取最短耗时（毫秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fetcher.parse_detail_page(html, URL, {})
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def main():
+    bs4_fetcher = DetailFetcher(cache=False, parser="bs4")
+    lxml_fetcher = DetailFetcher(cache=False, parser="lxml")
+    pages = load_fixtures()
+    ok = bool(pages)
+
+    print("📋 录制页面校验 / ⏱️ 单页解析耗时")
+    print(f"  {'页面':<30} {'规则':>4}  {'结果':<6} {'bs4':>10}  {'lxml':>10}  {'加速':>6}")
+    for fixture, html in pages:
+        old = bs4_fetcher.parse_detail_page(html, URL, {})
+        new = lxml_fetcher.parse_detail_page(html, URL, {})
+        same = all(old[field] == new[field] for field in FIELDS)
+        ok = ok and same
+
+        bs4_ms = best_of(bs4_fetcher, html, REPEAT)
+        lxml_ms = best_of(lxml_fetcher, html, REPEAT)
+
+        print(f"  {fixture:<30} {new['rules_count']:>4}  {'一致' if same else '不一致':<6} "
+              f"{bs4_ms:>8.2f}ms  {lxml_ms:>8.2f}ms  {bs4_ms / lxml_ms:>5.1f}x")
+
+        if not same:
+            for field in FIELDS:
+                if old[field] != new[field]:
+                    print(f"    {field}: bs4={old[field]!r:.120}")
+                    print(f"    {' ' * len(field)}  lxml={new[field]!r:.120}")
+
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
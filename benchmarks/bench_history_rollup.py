@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+历史趋势汇总视图基准测试
+
+对比快照写入吞吐量：原实现每行同时写快照表和历史表，当前实现只写快照表（历史由视图汇总）；
+并对比逐个查询与批量查询 50 个技能历史的耗时
+
+用法:
+    python benchmarks/bench_history_rollup.py
+    python benchmarks/bench_history_rollup.py --skills 1000 --days 7 --per-day 4
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.database import Database
+
+
+class DualWriteDatabase(Database):
+    """模拟原实现：保存快照时再按 (skill_id, date) 写一份历史表"""
+
+    def init_db(self) -> None:
+        super().init_db()
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS skills_history_table (
+                id INTEGER PRIMARY KEY,
+                skill_id INTEGER NOT NULL,
+                date TEXT NOT NULL,
+                rank INTEGER NOT NULL,
+                installs INTEGER NOT NULL,
+                UNIQUE(skill_id, date)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_history_table_date ON skills_history_table(date)")
+        self.conn.commit()
+
+    def save_snapshot(self, snapshot_time, date, skills):
+        skills = list(skills)
+        with self.transaction() as cursor:
+            count = super().save_snapshot(snapshot_time, date, skills)
+            skill_ids = self._load_skill_ids(cursor)
+            cursor.executemany("""
+                INSERT OR REPLACE INTO skills_history_table (skill_id, date, rank, installs)
+                VALUES (?, ?, ?, ?)
+            """, [
+                (skill_ids[(s["owner"], s["name"])], date, s["rank"], s["installs"])
+                for s in skills
+            ])
+        return count
+
+
+def snapshots(days: int, per_day: int, skills: int):
+    """生成 (snapshot_time, date, 技能列表)，每天 per_day 次"""
+    start = datetime.now() - timedelta(days=days)
+    for n in range(days * per_day):
+        moment = start + timedelta(hours=n * 24 // per_day)
+        rows = [
+            {"rank": (i + n) % skills + 1, "name": f"skill-{i:05d}", "owner": "owner/repo",
+             "installs": 100_000 - i + n}
+            for i in range(skills)
+        ]
+        yield moment.strftime("%Y-%m-%d %H:%M:%S"), moment.strftime("%Y-%m-%d"), rows
+
+
+def bench_writes(db: Database, args) -> float:
+    """写入全部快照，返回每秒写入的快照行数"""
+    with contextlib.redirect_stdout(io.StringIO()):
+        db.init_db()
+        data = list(snapshots(args.days, args.per_day, args.skills))
+        started = time.perf_counter()
+        for snapshot_time, date, rows in data:
+            db.save_snapshot(snapshot_time, date, rows)
+        elapsed = time.perf_counter() - started
+    return len(data) * args.skills / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="历史趋势汇总视图基准测试")
+    parser.add_argument("--skills", type=int, default=2000, help="每次快照的技能数")
+    parser.add_argument("--days", type=int, default=14, help="天数")
+    parser.add_argument("--per-day", type=int, default=4, help="每天快照次数")
+    parser.add_argument("--repeat", type=int, default=20, help="历史查询重复次数")
+    args = parser.parse_args()
+
+    names = [f"skill-{i:05d}" for i in range(0, args.skills, max(1, args.skills // 50))]
+    print(f"{args.skills} 个技能 × {args.days} 天 × 每天 {args.per_day} 次快照\n")
+
+    with tempfile.TemporaryDirectory() as directory:
+        results = []
+        for label, cls in (("快照 + 历史表", DualWriteDatabase), ("只写快照", Database)):
+            path = os.path.join(directory, f"{cls.__name__}.db")
+            db = cls(path)
+            rows_per_second = bench_writes(db, args)
+            db.close()
+            results.append((label, rows_per_second, os.path.getsize(path)))
+
+        print(f"{'写入':<14} {'行/秒':>10} {'文件大小':>10}")
+        for label, rows_per_second, size in results:
+            print(f"{label:<14} {rows_per_second:>10,.0f} {size / 1024 / 1024:>8.2f}MB")
+
+        db = Database(os.path.join(directory, "Database.db"))
+        db.connect()
+        single = time.perf_counter()
+        for _ in range(args.repeat):
+            for name in names:
+                db.get_skill_history(name, days=args.days + 1)
+        single = (time.perf_counter() - single) / args.repeat * 1000
+        batched = time.perf_counter()
+        for _ in range(args.repeat):
+            history = db.get_skills_history_many(names, days=args.days + 1)
+        batched = (time.perf_counter() - batched) / args.repeat * 1000
+        db.close()
+
+        assert len(history) == len(names) and all(len(h) >= args.days for h in history.values())
+        print(f"\n{len(names)} 个技能的历史：逐个查询 {single:.2f}ms，批量查询 {batched:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+排行榜解析器基准测试
+
+1. 用录制的页面文本（benchmarks/fixtures）校验新解析器与旧正则解析结果一致
+2. 生成 100 / 10k / 100k 行的排行榜（新格式和 ### 旧格式），对比新旧解析器的吞吐量
+
+用法:
+    python benchmarks/bench_leaderboard_parser.py
+"""
+import os
+import re
+import sys
+import time
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.leaderboard_parser import LeaderboardParser, parse_installs
+
+BASE_URL = "https://skills.sh"
+FIXTURES_DIR = os.path.join(project_root, "benchmarks", "fixtures")
+FIXTURES = ["trending_innertext.txt", "trending_innertext_legacy.txt"]
+SIZES = [100, 10_000, 100_000]
+
+
+def legacy_parse(html_content: str) -> list:
+    """旧版解析逻辑（多个正则依次全文扫描），作为对照"""
+    for marker in ["SKILLS LEADERBOARD", "Skills Leaderboard", "LEADERBOARD", "Leaderboard"]:
+        leaderboard_start = html_content.find(marker)
+        if leaderboard_start != -1:
+            break
+    if leaderboard_start == -1:
+        return []
+
+    content = html_content[leaderboard_start:]
+    patterns = [
+        r'(\d+)\s*\n\s*([a-z0-9-]+)\s*\n\s*([\w-]+/[\w-]+)\s*\n\s*([\d.]+K?)',
+        r'(\d+)\s*\n\s*([a-zA-Z0-9_-]+)\s*\n\s*([\w-]+/[\w-]+)\s*\n\s*([\d.]+K?)',
+        r'(\d+)\s*\n\s*###\s*([\w-]+)\s*\n\s*([\w-]+/[\w-]+)\s*\n\s*([\d.]+K?)',
+        r'(\d+)\s+([a-zA-Z0-9_-]+)\s+([\w-]+/[\w-]+)\s+([\d.]+K?)',
+    ]
+
+    skills_dict = {}
+    for pattern in patterns:
+        for match in re.finditer(pattern, content, re.MULTILINE):
+            rank = int(match.group(1))
+            name = match.group(2)
+            owner = match.group(3)
+            if name not in skills_dict or skills_dict[name]["rank"] > rank:
+                skills_dict[name] = {
+                    "rank": rank,
+                    "name": name,
+                    "owner": owner,
+                    "installs": parse_installs(match.group(4)),
+                    "url": f"{BASE_URL}/{owner}/{name}"
+                }
+        if skills_dict:
+            break
+
+    return sorted(skills_dict.values(), key=lambda x: x["rank"])
+
+
+def build_page(rows: int, legacy: bool = False) -> str:
+    """生成指定行数的排行榜页面文本"""
+    prefix = "### " if legacy else ""
+    lines = ["skills.sh", "Docs", "SKILLS LEADERBOARD", "All Time", "#", "SKILL", "INSTALLS"]
+    for i in range(1, rows + 1):
+        lines.append(str(i))
+        lines.append(f"{prefix}skill-{i}-best-practices")
+        lines.append(f"owner-{i % 997}/skills")
+        lines.append(f"{max(1, 100_000 - i) / 1000:.1f}K")
+    lines.append("© 2026 skills.sh")
+    return "\n".join(lines)
+
+
+def best_of(func, text: str, repeat: int) -> float:
+    """多次运行取最短耗时（秒）"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(text)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def check_fixtures() -> bool:
+    """校验录制页面上新旧解析结果一致"""
+    ok = True
+    parser = LeaderboardParser(BASE_URL)
+
+    for fixture in FIXTURES:
+        with open(os.path.join(FIXTURES_DIR, fixture), encoding="utf-8") as f:
+            text = f.read()
+
+        new = parser.parse(text)
+        old = legacy_parse(text)
+        same = new == old
+        ok = ok and same and len(new) > 0
+        print(f"  {fixture:<36} {len(new):>4} 条  拒绝 {parser.rejected_count:>3} 行  "
+              f"{'一致' if same else '不一致'}")
+
+        if not same:
+            old_names = {s["name"] for s in old}
+            new_names = {s["name"] for s in new}
+            print(f"    仅新解析器: {sorted(new_names - old_names)[:5]}")
+            print(f"    仅旧解析器: {sorted(old_names - new_names)[:5]}")
+
+    return ok
+
+
+def run_benchmarks() -> None:
+    """吞吐量基准"""
+    parser = LeaderboardParser(BASE_URL)
+
+    print(f"  {'格式':<6} {'行数':>8}  {'新解析器':>12}  {'行/秒':>12}  {'旧正则':>12}  {'行/秒':>12}")
+    for legacy in (False, True):
+        for rows in SIZES:
+            text = build_page(rows, legacy)
+            repeat = 20 if rows <= 10_000 else 3
+
+            new_time = best_of(parser.parse, text, repeat)
+            old_time = best_of(legacy_parse, text, repeat)
+
+            assert len(parser.parse(text)) == rows
+
+            print(f"  {'###' if legacy else '新':<6} {rows:>8}  {new_time * 1000:>10.2f}ms  "
+                  f"{rows / new_time:>12,.0f}  {old_time * 1000:>10.2f}ms  {rows / old_time:>12,.0f}")
+
+
+def main():
+    print("📋 录制页面校验")
+    ok = check_fixtures()
+    print()
+    print("⏱️ 吞吐量")
+    run_benchmarks()
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+抓取 + AI 分析流水线基准测试
+
+详情抓取用固定延迟模拟（不访问网络），AI 分析使用本地 Mock Anthropic 服务，
+对比先抓取完再分析（串行）与流水线两种方式的总耗时
+
+用法:
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --page-latency 0.8 --fetch-concurrency 2
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+os.environ.setdefault("DETAIL_CACHE_ENABLED", "false")
+
+from src.detail_fetcher import DetailFetcher
+from src.claude_summarizer import ClaudeSummarizer
+from src.pipeline import FetchSummarizePipeline
+from mock_anthropic_server import MockAnthropicServer
+
+
+class SimulatedFetcher(DetailFetcher):
+    """每个详情页固定耗时的抓取器"""
+
+    def __init__(self, page_latency: float, **kwargs):
+        super().__init__(**kwargs)
+        self.page_latency = page_latency
+
+    def fetch_detail_page(self, url, skill_info=None):
+        time.sleep(self.page_latency)
+        name = skill_info["name"]
+        return {
+            "name": name,
+            "owner": skill_info["owner"],
+            "url": url,
+            "when_to_use": f"Use this skill when working on {name}. " * 6,
+            "rules": [{"file": f"rule-{j}.md", "desc": f"Rule {j} of {name}"} for j in range(4)],
+            "rules_count": 4,
+        }
+
+
+def make_skills(count: int) -> list:
+    """生成模拟榜单"""
+    return [
+        {"name": f"bench-skill-{i:02d}", "owner": f"owner-{i % 5}",
+         "url": f"https://skills.sh/owner-{i % 5}/repo/bench-skill-{i:02d}"}
+        for i in range(count)
+    ]
+
+
+def run(skills: list, enabled: bool, args) -> dict:
+    """运行一次抓取 + 分析"""
+    with MockAnthropicServer(mode="synthesize", latency=args.latency,
+                             token_latency=args.token_latency) as server:
+        with contextlib.redirect_stdout(io.StringIO()):
+            fetcher = SimulatedFetcher(args.page_latency, concurrency=args.fetch_concurrency,
+                                       rate_limit=100, delay=0)
+            summarizer = ClaudeSummarizer(api_key="mock", base_url=server.url)
+            pipeline = FetchSummarizePipeline(fetcher, summarizer, enabled=enabled)
+            details, summaries = pipeline.run(skills)
+
+    assert [d["name"] for d in details] == [s["name"] for s in skills[:20]]
+    assert [s["name"] for s in summaries] == [d["name"] for d in details]
+    return pipeline.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="抓取 + AI 分析流水线基准测试")
+    parser.add_argument("--page-latency", type=float, default=0.5, help="每个详情页的模拟耗时（秒）")
+    parser.add_argument("--fetch-concurrency", type=int, default=2, help="详情抓取并发数")
+    parser.add_argument("--latency", type=float, default=0.5, help="每个 Claude 请求的固定延迟（秒）")
+    parser.add_argument("--token-latency", type=float, default=0.001, help="每输出 token 延迟（秒）")
+    args = parser.parse_args()
+
+    skills = make_skills(20)
+    print(f"20 个技能，详情页 {args.page_latency}s × 并发 {args.fetch_concurrency}，"
+          f"Claude 固定延迟 {args.latency}s + 每 token {args.token_latency * 1000:.1f}ms\n")
+    print(f"{'模式':<10} {'抓取':>8} {'抓取后等待':>10} {'总计':>8} {'批次':>5} {'请求块':>6}")
+
+    for label, enabled in (("串行", False), ("流水线", True)):
+        stats = run(skills, enabled, args)
+        print(f"{label:<10} {stats['crawl_seconds']:>7.2f}s {stats['tail_seconds']:>9.2f}s "
+              f"{stats['total_seconds']:>7.2f}s {stats['batches']:>5} {stats['chunks']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+只读连接池基准测试
+
+写线程持续保存快照（模拟每日任务），同时多个读线程查询最新快照和技能历史（模拟插件查询 / 报告重建），
+对比不同只读连接数下的查询吞吐量、p95 延迟，以及写入吞吐量受到的影响
+
+用法:
+    python benchmarks/bench_read_pool.py
+    python benchmarks/bench_read_pool.py --threads 8 --pool-sizes 1,2,4,8 --seconds 3
+"""
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.database import Database
+
+
+def make_skills(count: int, n: int):
+    """生成模拟榜单"""
+    return [
+        {"rank": (i + n) % count + 1, "name": f"skill-{i:05d}", "owner": "owner/repo", "installs": 100_000 - i + n}
+        for i in range(count)
+    ]
+
+
+def run(path: str, pool_size: int, threads: int, seconds: float, skills: int) -> dict:
+    """运行一轮：返回读 / 写吞吐量和读延迟"""
+    db = Database(path, read_pool_size=pool_size)
+    stop = threading.Event()
+    latencies = []
+    lock = threading.Lock()
+    names = [f"skill-{i:05d}" for i in range(0, skills, max(1, skills // 20))]
+
+    def reader():
+        local = []
+        while not stop.is_set():
+            started = time.perf_counter()
+            db.get_last_snapshot()
+            db.get_skills_history_many(names, days=3650)
+            local.append(time.perf_counter() - started)
+        with lock:
+            latencies.extend(local)
+
+    workers = [threading.Thread(target=reader) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+
+    written = 0
+    start = datetime(2026, 1, 1)
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        while time.perf_counter() - started < seconds:
+            moment = start + timedelta(hours=written)
+            db.save_snapshot(moment.strftime("%Y-%m-%d %H:%M:%S"), moment.strftime("%Y-%m-%d"),
+                             make_skills(skills, written))
+            written += 1
+    elapsed = time.perf_counter() - started
+
+    stop.set()
+    for worker in workers:
+        worker.join()
+    stats = db.pool.get_stats()
+    db.close()
+
+    latencies.sort()
+    return {
+        "reads": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000 if latencies else 0.0,
+        "p95": latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0.0,
+        "writes": written * skills / elapsed,
+        "waits": stats["waits"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="只读连接池基准测试")
+    parser.add_argument("--threads", type=int, default=4, help="读线程数")
+    parser.add_argument("--pool-sizes", default="1,2,4", help="只读连接数，逗号分隔")
+    parser.add_argument("--seconds", type=float, default=3.0, help="每轮时长（秒）")
+    parser.add_argument("--skills", type=int, default=2000, help="每次快照的技能数")
+    args = parser.parse_args()
+
+    print(f"{args.threads} 个读线程 + 1 个写线程，每次快照 {args.skills} 个技能，每轮 {args.seconds:.0f}s\n")
+    print(f"{'只读连接':>8} {'查询/秒':>9} {'p50':>9} {'p95':>9} {'写入行/秒':>11} {'排队次数':>8}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        rounds = [("无读线程", 1, 0)] + [(str(size), size, args.threads)
+                                      for size in (int(s) for s in args.pool_sizes.split(",") if s)]
+        for label, pool_size, threads in rounds:
+            path = os.path.join(directory, f"pool-{label}.db")
+            db = Database(path)
+            with contextlib.redirect_stdout(io.StringIO()):
+                db.init_db()
+                db.save_snapshot("2025-12-31 23:00:00", "2025-12-31", make_skills(args.skills, 0))
+            db.close()
+
+            result = run(path, pool_size, threads, args.seconds, args.skills)
+            print(f"{label:>8} {result['reads']:>9.1f} {result['p50']:>7.2f}ms {result['p95']:>7.2f}ms "
+                  f"{result['writes']:>11,.0f} {result['waits']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+skills 维度表基准测试
+
+按原始表结构（快照表 / 历史表直接保存 name、owner、url 字符串）生成模拟数据库，
+复制一份用 Database.init_db() 迁移到整数 id 结构，对比文件大小、索引大小和常用查询耗时
+
+用法:
+    python benchmarks/bench_skill_ids.py
+    python benchmarks/bench_skill_ids.py --skills 5000 --snapshots 60
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.config import SKILLS_BASE_URL
+from src.database import Database, _SNAPSHOT_COLUMNS
+
+LEGACY_SCHEMA = """
+    CREATE TABLE skills_snapshot (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        snapshot_time TEXT NOT NULL,
+        date TEXT NOT NULL,
+        rank INTEGER NOT NULL,
+        name TEXT NOT NULL,
+        owner TEXT NOT NULL,
+        installs INTEGER NOT NULL,
+        installs_delta INTEGER DEFAULT 0,
+        installs_rate REAL DEFAULT 0,
+        rank_delta INTEGER DEFAULT 0,
+        url TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        UNIQUE(snapshot_time, name)
+    );
+    CREATE TABLE skills_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        skill_name TEXT NOT NULL,
+        date TEXT NOT NULL,
+        rank INTEGER NOT NULL,
+        installs INTEGER NOT NULL,
+        UNIQUE(skill_name, date)
+    );
+    CREATE INDEX idx_snapshot_time ON skills_snapshot(snapshot_time);
+    CREATE INDEX idx_snapshot_date ON skills_snapshot(date);
+    CREATE INDEX idx_snapshot_name ON skills_snapshot(name);
+    CREATE INDEX idx_snapshot_rank ON skills_snapshot(snapshot_time, rank);
+    CREATE INDEX idx_history_name ON skills_history(skill_name);
+    CREATE INDEX idx_history_date ON skills_history(date);
+"""
+
+# 同一查询在两种结构下的 SQL：(原结构, 当前结构)
+QUERIES = {
+    "最新快照": ("""
+        SELECT rank, name, owner, installs, installs_delta, installs_rate, rank_delta, url
+        FROM skills_snapshot
+        WHERE snapshot_time = (SELECT MAX(snapshot_time) FROM skills_snapshot)
+        ORDER BY rank
+    """, f"""
+        SELECT {_SNAPSHOT_COLUMNS}
+        FROM skills_snapshot s
+        JOIN skills k ON k.id = s.skill_id
+        WHERE s.snapshot_id = (SELECT id FROM snapshots ORDER BY snapshot_time DESC LIMIT 1)
+        ORDER BY s.rank
+    """),
+    "单技能历史": ("""
+        SELECT date, rank, installs FROM skills_history
+        WHERE skill_name = ? ORDER BY date ASC
+    """, """
+        SELECT p.date, s.rank, s.installs, MAX(p.snapshot_time)
+        FROM skills k
+        JOIN skills_snapshot s ON s.skill_id = k.id
+        JOIN snapshots p ON p.id = s.snapshot_id
+        WHERE k.name = ?
+        GROUP BY p.date ORDER BY p.date ASC
+    """),
+    "排名上升": ("""
+        SELECT name, rank, rank_delta FROM skills_snapshot
+        WHERE snapshot_time = (SELECT MAX(snapshot_time) FROM skills_snapshot)
+        ORDER BY rank_delta DESC, rank ASC LIMIT 5
+    """, """
+        SELECT k.name, s.rank, s.rank_delta
+        FROM skills_snapshot s
+        JOIN skills k ON k.id = s.skill_id
+        WHERE s.snapshot_id = (SELECT id FROM snapshots ORDER BY snapshot_time DESC LIMIT 1)
+        ORDER BY s.rank_delta DESC, s.rank ASC LIMIT 5
+    """),
+}
+
+
+def build_legacy(path: str, skills: int, snapshots: int) -> None:
+    """生成原始结构的模拟数据库：每天一次快照，每次 skills 个技能"""
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    for day in range(snapshots):
+        date = f"2026-{1 + day // 28:02d}-{1 + day % 28:02d}"
+        snapshot_time = f"{date} 08:00:00"
+        rows = []
+        for i in range(skills):
+            rank = (i + day * 7) % skills + 1
+            owner = f"owner-{i % 700}/agent-skills-collection"
+            name = f"skill-name-{i:06d}"
+            rows.append((snapshot_time, date, rank, name, owner, 100_000 - rank + day * 10,
+                         day, 0.001, 0, f"https://skills.sh/{owner}/{name}"))
+        conn.executemany("""
+            INSERT INTO skills_snapshot
+            (snapshot_time, date, rank, name, owner, installs, installs_delta, installs_rate, rank_delta, url)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
+        conn.executemany("""
+            INSERT INTO skills_history (skill_name, date, rank, installs) VALUES (?, ?, ?, ?)
+        """, [(r[3], r[1], r[2], r[5]) for r in rows])
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+
+
+def object_sizes(path: str) -> dict:
+    """各表 / 索引占用的字节数（dbstat 不可用时只返回文件大小）"""
+    sizes = {"文件": os.path.getsize(path)}
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute("""
+            SELECT m.type, SUM(d.pgsize)
+            FROM dbstat d JOIN sqlite_master m ON m.name = d.name
+            GROUP BY m.type
+        """).fetchall()
+        for kind, size in rows:
+            sizes["表" if kind == "table" else "索引"] = size
+    except sqlite3.OperationalError:
+        pass
+    finally:
+        conn.close()
+    return sizes
+
+
+def timed(func, repeat: int) -> float:
+    """平均耗时（毫秒）"""
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="skills 维度表基准测试")
+    parser.add_argument("--skills", type=int, default=2000, help="每次快照的技能数")
+    parser.add_argument("--snapshots", type=int, default=30, help="快照次数（每天一次）")
+    parser.add_argument("--repeat", type=int, default=20, help="每个查询重复次数")
+    args = parser.parse_args()
+
+    names = [f"skill-name-{i:06d}" for i in range(0, args.skills, max(1, args.skills // 50))]
+
+    with tempfile.TemporaryDirectory() as directory:
+        legacy_path = os.path.join(directory, "legacy.db")
+        migrated_path = os.path.join(directory, "migrated.db")
+        build_legacy(legacy_path, args.skills, args.snapshots)
+        shutil.copy(legacy_path, migrated_path)
+
+        db = Database(migrated_path)
+        started = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            db.init_db()
+        migrate_seconds = time.perf_counter() - started
+        db.close()
+
+        print(f"{args.skills} 个技能 × {args.snapshots} 次快照，迁移耗时 {migrate_seconds:.2f}s\n")
+        legacy_sizes = object_sizes(legacy_path)
+        migrated_sizes = object_sizes(migrated_path)
+        print(f"{'大小':<6} {'原结构':>10} {'当前结构':>10} {'节省':>7}")
+        for key in legacy_sizes:
+            before, after = legacy_sizes[key], migrated_sizes.get(key, 0)
+            print(f"{key:<6} {before / 1024 / 1024:>8.2f}MB {after / 1024 / 1024:>8.2f}MB "
+                  f"{(1 - after / before) * 100:>6.1f}%")
+
+        legacy = sqlite3.connect(legacy_path)
+        migrated = sqlite3.connect(migrated_path)
+        latest_legacy, latest_migrated = QUERIES["最新快照"]
+        assert (legacy.execute(latest_legacy).fetchall()
+                == migrated.execute(latest_migrated, (SKILLS_BASE_URL,)).fetchall())
+
+        print(f"\n{'查询':<12} {'原结构':>10} {'当前结构':>10}")
+        for label, (legacy_sql, migrated_sql) in QUERIES.items():
+            if "?" in legacy_sql:
+                before = timed(lambda: [legacy.execute(legacy_sql, (n,)).fetchall() for n in names], args.repeat)
+                after = timed(lambda: [migrated.execute(migrated_sql, (n,)).fetchall() for n in names], args.repeat)
+                label = f"{label} ×{len(names)}"
+            else:
+                params = (SKILLS_BASE_URL,) if "?" in migrated_sql else ()
+                before = timed(lambda: legacy.execute(legacy_sql).fetchall(), args.repeat)
+                after = timed(lambda: migrated.execute(migrated_sql, params).fetchall(), args.repeat)
+            print(f"{label:<12} {before:>8.2f}ms {after:>8.2f}ms")
+
+        legacy.close()
+        migrated.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+快照目录表基准测试
+
+按原始表结构生成每小时一次快照的模拟数据库，复制一份迁移到当前结构（snapshots 目录表），
+随快照数量增长对比 最新 / 上一次 / 按日期 / 快照列表 四种查找的耗时
+
+用法:
+    python benchmarks/bench_snapshot_catalog.py
+    python benchmarks/bench_snapshot_catalog.py --snapshots 100,1000 --skills 50
+"""
+import argparse
+import contextlib
+import io
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.database import Database
+from bench_skill_ids import LEGACY_SCHEMA, timed
+
+# (查找, 原实现 SQL, 目录表 SQL)；参数 time 为最新快照时间，date 为最新快照日期
+LOOKUPS = [
+    ("最新快照", """
+        SELECT DISTINCT snapshot_time FROM skills_snapshot ORDER BY snapshot_time DESC LIMIT 1
+    """, """
+        SELECT id FROM snapshots ORDER BY snapshot_time DESC LIMIT 1
+    """, ()),
+    ("上一次快照", """
+        SELECT DISTINCT snapshot_time FROM skills_snapshot
+        WHERE snapshot_time < :time ORDER BY snapshot_time DESC LIMIT 1
+    """, """
+        SELECT id FROM snapshots WHERE snapshot_time < :time ORDER BY snapshot_time DESC LIMIT 1
+    """, ("time",)),
+    ("按日期最新", """
+        SELECT MAX(snapshot_time) FROM skills_snapshot WHERE date = :date
+    """, """
+        SELECT id FROM snapshots WHERE date = :date ORDER BY snapshot_time DESC LIMIT 1
+    """, ("date",)),
+    ("快照列表 50", """
+        SELECT DISTINCT snapshot_time, date, COUNT(*) as skill_count
+        FROM skills_snapshot GROUP BY snapshot_time ORDER BY snapshot_time DESC LIMIT 50
+    """, """
+        SELECT snapshot_time, date, row_count as skill_count, content_hash
+        FROM snapshots ORDER BY snapshot_time DESC LIMIT 50
+    """, ()),
+]
+
+
+def build_legacy_hourly(path: str, snapshots: int, skills: int) -> dict:
+    """生成原始结构的模拟数据库：每小时一次快照，返回最新快照的时间和日期"""
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    start = datetime(2024, 1, 1)
+    for n in range(snapshots):
+        moment = start + timedelta(hours=n)
+        snapshot_time = moment.strftime("%Y-%m-%d %H:%M:%S")
+        date = moment.strftime("%Y-%m-%d")
+        conn.executemany("""
+            INSERT INTO skills_snapshot
+            (snapshot_time, date, rank, name, owner, installs, url)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (snapshot_time, date, i + 1, f"skill-{i:04d}", "owner/repo", 100_000 - i + n,
+             f"https://skills.sh/owner/repo/skill-{i:04d}")
+            for i in range(skills)
+        ])
+        conn.executemany("""
+            INSERT OR REPLACE INTO skills_history (skill_name, date, rank, installs) VALUES (?, ?, ?, ?)
+        """, [(f"skill-{i:04d}", date, i + 1, 100_000 - i + n) for i in range(skills)])
+    conn.commit()
+    conn.close()
+    return {"time": snapshot_time, "date": date}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="快照目录表基准测试")
+    parser.add_argument("--snapshots", default="100,1000,10000", help="快照数量（每小时一次），逗号分隔")
+    parser.add_argument("--skills", type=int, default=100, help="每次快照的技能数")
+    parser.add_argument("--repeat", type=int, default=200, help="每个查找重复次数")
+    args = parser.parse_args()
+
+    print(f"每次快照 {args.skills} 个技能，单位：每次查找的毫秒数\n")
+    print(f"{'快照数':>7}  {'查找':<10} {'原实现':>9} {'目录表':>9}")
+
+    for count in [int(c) for c in args.snapshots.split(",") if c]:
+        with tempfile.TemporaryDirectory() as directory:
+            legacy_path = os.path.join(directory, "legacy.db")
+            current_path = os.path.join(directory, "current.db")
+            params = build_legacy_hourly(legacy_path, count, args.skills)
+            shutil.copy(legacy_path, current_path)
+
+            db = Database(current_path)
+            with contextlib.redirect_stdout(io.StringIO()):
+                db.init_db()
+            db.close()
+
+            legacy = sqlite3.connect(legacy_path)
+            current = sqlite3.connect(current_path)
+            for label, legacy_sql, current_sql, names in LOOKUPS:
+                bound = {name: params[name] for name in names}
+                before = timed(lambda: legacy.execute(legacy_sql, bound).fetchall(), args.repeat)
+                after = timed(lambda: current.execute(current_sql, bound).fetchall(), args.repeat)
+                print(f"{count:>7}  {label:<10} {before:>7.3f}ms {after:>7.3f}ms")
+            legacy.close()
+            current.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+AI 分析阶段离线基准测试
+
+在本地启动 Mock Anthropic 服务（benchmarks/mock_anthropic_server.py），不需要 ZHIPU_API_KEY：
+1. 对比不同块大小、并发数、流式/非流式下的总耗时
+2. 注入 429 限流、JSON 格式错误和流式截断，验证重试后所有技能都有结果
+
+模拟延迟 = 每请求固定延迟 + 每输出 token 延迟；故障注入使用固定随机种子。
+
+用法:
+    python benchmarks/bench_summarizer.py
+    python benchmarks/bench_summarizer.py --skills 100 --latency 0.5
+"""
+import argparse
+import contextlib
+import io
+import os
+import sys
+import time
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.claude_summarizer import ClaudeSummarizer
+from mock_anthropic_server import MockAnthropicServer
+
+SEED = 42
+
+# (名称, 块大小, 并发数, 流式, 故障注入)
+SCENARIOS = [
+    ("串行 / 块 20", 20, 1, False, {}),
+    ("串行 / 块 10", 10, 1, False, {}),
+    ("并发 3 / 块 10", 10, 3, False, {}),
+    ("并发 3 / 块 10 / 流式", 10, 3, True, {}),
+    ("并发 5 / 块 5 / 流式", 5, 5, True, {}),
+    ("并发 3 / 块 10 / 流式 + 故障", 10, 3, True,
+     {"rate_limit_rate": 0.15, "malformed_rate": 0.15, "truncate_rate": 0.15}),
+]
+
+
+def make_details(count: int) -> list:
+    """生成模拟技能详情"""
+    return [
+        {
+            "name": f"bench-skill-{i:03d}",
+            "owner": f"owner-{i % 7}",
+            "url": f"https://skills.sh/owner-{i % 7}/repo/bench-skill-{i:03d}",
+            "when_to_use": f"Use this skill when working on task {i}. " * 8,
+            "rules": [
+                {"file": f"rule-{j}.md", "desc": f"Rule {j} for skill {i}: keep things consistent."}
+                for j in range(4)
+            ],
+        }
+        for i in range(count)
+    ]
+
+
+def run_scenario(details: list, chunk_size: int, concurrency: int, stream: bool,
+                 faults: dict, latency: float, token_latency: float) -> dict:
+    """在独立的 Mock 服务上运行一次 AI 分析"""
+    with MockAnthropicServer(mode="synthesize", latency=latency, token_latency=token_latency,
+                             seed=SEED, **faults) as server:
+        with contextlib.redirect_stdout(io.StringIO()):
+            summarizer = ClaudeSummarizer(api_key="mock", base_url=server.url,
+                                          chunk_size=chunk_size, concurrency=concurrency,
+                                          max_retries=4, stream=stream)
+            summarizer.retry_backoff = 0.05
+
+            started = time.perf_counter()
+            results = summarizer.summarize_and_classify(details)
+            elapsed = time.perf_counter() - started
+
+        server_stats = server.get_stats()
+
+    names = {d["name"] for d in details}
+    ok = sum(1 for r in results if r["name"] in names and r["summary"].endswith("模拟摘要"))
+    return {
+        "elapsed": elapsed,
+        "chunks": summarizer.stats["chunks"],
+        "requests": server_stats["requests"],
+        "retries": summarizer.stats["retries"],
+        "failed_chunks": summarizer.stats["failed_chunks"],
+        "ok": ok,
+        "total": len(results),
+        "faults": server_stats["rate_limited"] + server_stats["malformed"] + server_stats["truncated"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI 分析阶段离线基准测试")
+    parser.add_argument("--skills", type=int, default=60, help="技能数")
+    parser.add_argument("--latency", type=float, default=0.3, help="每请求固定延迟（秒）")
+    parser.add_argument("--token-latency", type=float, default=0.0003, help="每输出 token 延迟（秒）")
+    args = parser.parse_args()
+
+    details = make_details(args.skills)
+    print(f"技能数: {args.skills}，固定延迟 {args.latency}s，每 token {args.token_latency * 1000:.2f}ms\n")
+    print(f"{'场景':<28} {'耗时':>8} {'块':>4} {'请求':>5} {'重试':>5} {'故障':>5} {'失败块':>6} {'成功':>9}")
+
+    for name, chunk_size, concurrency, stream, faults in SCENARIOS:
+        r = run_scenario(details, chunk_size, concurrency, stream, faults,
+                         args.latency, args.token_latency)
+        print(f"{name:<28} {r['elapsed']:>7.2f}s {r['chunks']:>4} {r['requests']:>5} "
+              f"{r['retries']:>5} {r['faults']:>5} {r['failed_chunks']:>6} {r['ok']:>4}/{r['total']:<4}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+"""
+Mock Anthropic Server - 本地替身 Messages API，用于离线压测和回归 ClaudeSummarizer
+
+把 ANTHROPIC_BASE_URL 指向本服务即可，无需 ZHIPU_API_KEY：
+    - replay:     按请求内容回放录制的响应（未命中返回 404）
+    - record:     转发到真实接口并把响应录制为 fixture
+    - synthesize: 根据提示词中的技能名称合成合法响应
+    - auto:       有 fixture 就回放，否则合成（默认）
+
+支持模拟延迟（固定 + 按输出 token）、SSE 流式响应、429 限流、JSON 格式错误、
+流式响应中途截断，以及 prompt caching 的命中统计或直接拒绝 cache_control。
+
+用法:
+    python benchmarks/mock_anthropic_server.py --port 8765 --latency 0.3 --rate-limit-rate 0.1
+    ANTHROPIC_BASE_URL=http://127.0.0.1:8765 ZHIPU_API_KEY=mock python src/main_trending.py
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+# 添加项目根目录到 Python 路径
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.token_budget import estimate_tokens
+from src.claude_summarizer import CATEGORIES
+
+
+DEFAULT_FIXTURES_DIR = "benchmarks/fixtures/anthropic"
+MODES = ("auto", "replay", "record", "synthesize")
+
+# 合成响应时按名称关键词猜测分类
+SYNTH_KEYWORDS = [
+    ("video", "video"),
+    ("react", "frontend"),
+    ("vue", "frontend"),
+    ("seo", "marketing"),
+    ("test", "testing"),
+    ("design", "design"),
+    ("sql", "database"),
+    ("docker", "devops"),
+]
+
+
+def request_key(body: Dict) -> str:
+    """
+    请求的 fixture 键：只取决于模型、system 文本和消息内容
+
+    cache_control、max_tokens、stream 等参数不影响键，同一份录制可用于流式和普通请求
+
+    Args:
+        body: 请求体
+
+    Returns:
+        sha256 十六进制字符串
+    """
+    content = json.dumps({
+        "model": body.get("model"),
+        "system": system_text(body),
+        "messages": body.get("messages"),
+    }, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def system_text(body: Dict) -> str:
+    """把 system 参数（字符串或文本块列表）还原为纯文本"""
+    system = body.get("system") or ""
+    if isinstance(system, list):
+        return "".join(block.get("text", "") for block in system if isinstance(block, dict))
+    return system
+
+
+def has_cache_control(body: Dict) -> bool:
+    """请求中是否带有 cache_control 标记"""
+    system = body.get("system")
+    return isinstance(system, list) and any(
+        isinstance(block, dict) and "cache_control" in block for block in system
+    )
+
+
+def skill_names(body: Dict) -> List[str]:
+    """从最后一条用户消息中提取 "名称: xxx" 行"""
+    messages = body.get("messages") or []
+    if not messages:
+        return []
+    content = messages[-1].get("content", "")
+    if isinstance(content, list):
+        content = "".join(block.get("text", "") for block in content if isinstance(block, dict))
+    return [line.split(":", 1)[1].strip() for line in content.split("\n") if line.startswith("名称:")]
+
+
+def synthesize_text(names: List[str]) -> str:
+    """为技能名称合成一个合法的 JSON 数组响应"""
+    items = []
+    for name in names:
+        category = next((c for keyword, c in SYNTH_KEYWORDS if keyword in name.lower()), "other")
+        items.append({
+            "name": name,
+            "summary": f"{name} 的模拟摘要",
+            "description": f"这是本地模拟服务为 {name} 生成的描述，用于离线基准测试和回归测试。",
+            "use_case": "离线压测、回归测试",
+            "solves": ["模拟数据", "离线测试", "性能基准"],
+            "category": category,
+            "category_zh": CATEGORIES[category],
+        })
+    return "```json\n" + json.dumps(items, ensure_ascii=False, indent=2) + "\n```"
+
+
+def message_text(message: Dict) -> str:
+    """拼接录制消息中的文本块"""
+    return "".join(block.get("text", "") for block in message.get("content", []) if block.get("type") == "text")
+
+
+def message_usage(message: Dict) -> Dict:
+    """
+    录制消息中的 usage，缓存读写 token 折回 input_tokens
+
+    回放时由 apply_cache_usage 按本服务的缓存状态重新拆分
+    """
+    usage = message.get("usage") or {}
+    input_tokens = sum(usage.get(key) or 0 for key in
+                       ("input_tokens", "cache_read_input_tokens", "cache_creation_input_tokens"))
+    return {"input_tokens": input_tokens, "output_tokens": usage.get("output_tokens") or 0}
+
+
+class MockAnthropicServer:
+    """本地 Messages API 替身（后台线程运行）"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, mode: str = "auto",
+                 fixtures_dir: str = None, upstream: str = None,
+                 latency: float = 0.0, jitter: float = 0.0, token_latency: float = 0.0,
+                 rate_limit_rate: float = 0.0, malformed_rate: float = 0.0, truncate_rate: float = 0.0,
+                 reject_cache_control: bool = False, min_cache_tokens: int = 1024, seed: int = None):
+        """
+        初始化
+
+        Args:
+            host: 监听地址
+            port: 监听端口，0 表示自动分配
+            mode: auto / replay / record / synthesize
+            fixtures_dir: fixture 目录（每个请求一个 JSON 文件）
+            upstream: record 模式转发的真实接口地址，如 https://api.anthropic.com
+            latency: 每个请求的固定延迟（秒，模拟首 token 耗时）
+            jitter: 固定延迟上叠加的随机抖动（秒）
+            token_latency: 每个输出 token 的延迟（秒），总耗时随输出长度增长
+            rate_limit_rate: 返回 429 的概率
+            malformed_rate: 返回格式错误 JSON 的概率（破坏第一个数组元素）
+            truncate_rate: 流式响应中途断开的概率
+            reject_cache_control: 带 cache_control 的请求一律返回 400（模拟不支持缓存的代理）
+            min_cache_tokens: 可缓存前缀的最小 token 数，更短的前缀不读写缓存（与真实接口一致）
+            seed: 随机种子，固定后故障注入可复现
+        """
+        if mode not in MODES:
+            raise ValueError(f"未知模式: {mode}，可选 {', '.join(MODES)}")
+
+        self.mode = mode
+        self.fixtures_dir = Path(fixtures_dir or DEFAULT_FIXTURES_DIR)
+        self.upstream = upstream.rstrip("/") if upstream else None
+        self.latency = latency
+        self.jitter = jitter
+        self.token_latency = token_latency
+        self.rate_limit_rate = rate_limit_rate
+        self.malformed_rate = malformed_rate
+        self.truncate_rate = truncate_rate
+        self.reject_cache_control = reject_cache_control
+        self.min_cache_tokens = min_cache_tokens
+
+        if mode == "record" and not self.upstream:
+            raise ValueError("record 模式需要指定 upstream")
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._cached_prefixes = set()
+        self._thread: Optional[threading.Thread] = None
+
+        self.stats = {
+            "requests": 0,
+            "streaming": 0,
+            "replayed": 0,
+            "recorded": 0,
+            "synthesized": 0,
+            "rate_limited": 0,
+            "malformed": 0,
+            "truncated": 0,
+            "rejected_cache_control": 0,
+            "misses": 0,
+        }
+
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        """可直接用作 ANTHROPIC_BASE_URL 的地址"""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockAnthropicServer":
+        """在后台线程中启动"""
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """停止服务"""
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def get_stats(self) -> Dict:
+        """获取统计信息"""
+        with self._lock:
+            return dict(self.stats)
+
+    def _count(self, key: str) -> None:
+        """统计计数"""
+        with self._lock:
+            self.stats[key] += 1
+
+    def _roll(self, rate: float) -> bool:
+        """按概率触发故障（共享随机源，加锁保证可复现）"""
+        if rate <= 0:
+            return False
+        with self._lock:
+            return self._random.random() < rate
+
+    def _delay(self) -> float:
+        """本次请求的固定延迟（含随机抖动）"""
+        if not self.jitter:
+            return self.latency
+        with self._lock:
+            return self.latency + self._random.random() * self.jitter
+
+    # ------------------------------------------------------------------
+    # 响应生成
+    # ------------------------------------------------------------------
+
+    def _fixture_path(self, key: str) -> Path:
+        """fixture 文件路径"""
+        return self.fixtures_dir / f"{key}.json"
+
+    def resolve(self, body: Dict, headers: Dict[str, str]) -> Tuple[Optional[str], Dict]:
+        """
+        生成响应文本和 usage
+
+        Args:
+            body: 请求体
+            headers: 请求头（record 模式转发认证信息）
+
+        Returns:
+            (响应文本, usage)，replay 未命中时文本为 None
+        """
+        key = request_key(body)
+        path = self._fixture_path(key)
+
+        if self.mode in ("auto", "replay") and path.exists():
+            with open(path, encoding="utf-8") as f:
+                fixture = json.load(f)
+            self._count("replayed")
+            message = fixture["response"]
+            return message_text(message), message_usage(message)
+
+        if self.mode == "replay":
+            self._count("misses")
+            return None, {}
+
+        if self.mode == "record":
+            message = self._forward(body, headers)
+            self.fixtures_dir.mkdir(parents=True, exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                json.dump({
+                    "request": {"model": body.get("model"), "skills": skill_names(body)},
+                    "response": message
+                }, f, ensure_ascii=False, indent=2)
+            self._count("recorded")
+            return message_text(message), message_usage(message)
+
+        self._count("synthesized")
+        text = synthesize_text(skill_names(body))
+        usage = {
+            "input_tokens": estimate_tokens(system_text(body)) + estimate_tokens(json.dumps(body.get("messages"), ensure_ascii=False)),
+            "output_tokens": estimate_tokens(text),
+        }
+        return text, usage
+
+    def _forward(self, body: Dict, headers: Dict[str, str]) -> Dict:
+        """record 模式：以非流式请求转发到真实接口"""
+        forward_headers = {
+            key: value for key, value in headers.items()
+            if key.lower() in ("x-api-key", "authorization", "anthropic-version", "anthropic-beta")
+        }
+        forward_headers["content-type"] = "application/json"
+        payload = dict(body)
+        payload.pop("stream", None)
+
+        response = requests.post(f"{self.upstream}/v1/messages", json=payload,
+                                 headers=forward_headers, timeout=300)
+        response.raise_for_status()
+        return response.json()
+
+    def apply_cache_usage(self, body: Dict, usage: Dict) -> None:
+        """模拟 prompt caching：同一 system 前缀第一次写入缓存，之后命中；短于最小长度的前缀不缓存"""
+        if not has_cache_control(body):
+            return
+        prefix_tokens = estimate_tokens(system_text(body))
+        if prefix_tokens < self.min_cache_tokens:
+            usage["cache_read_input_tokens"] = 0
+            usage["cache_creation_input_tokens"] = 0
+            return
+        prefix_key = hashlib.sha256(system_text(body).encode("utf-8")).hexdigest()
+        with self._lock:
+            hit = prefix_key in self._cached_prefixes
+            self._cached_prefixes.add(prefix_key)
+        usage["cache_read_input_tokens"] = prefix_tokens if hit else 0
+        usage["cache_creation_input_tokens"] = 0 if hit else prefix_tokens
+        usage["input_tokens"] = max(0, usage.get("input_tokens", 0) - prefix_tokens)
+
+    def corrupt(self, text: str) -> str:
+        """破坏第一个数组元素的 JSON（去掉第一个键的引号），其余元素保持合法"""
+        index = text.find('"', text.find("{"))
+        if index == -1:
+            return text[: len(text) // 2]
+        return text[:index] + text[index + 1:]
+
+    def _handler_class(self):
+        """构造绑定到本实例的请求处理类"""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.rstrip("/").endswith("/stats"):
+                    self._send_json(200, server.get_stats())
+                else:
+                    self._send_error(404, "not_found_error", f"未知路径: {self.path}")
+
+            def do_POST(self):
+                if not self.path.rstrip("/").endswith("/v1/messages"):
+                    self._send_error(404, "not_found_error", f"未知路径: {self.path}")
+                    return
+
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    body = json.loads(self.rfile.read(length) or b"{}")
+                except json.JSONDecodeError:
+                    self._send_error(400, "invalid_request_error", "请求体不是合法 JSON")
+                    return
+
+                server._count("requests")
+                streaming = bool(body.get("stream"))
+                if streaming:
+                    server._count("streaming")
+
+                if server.reject_cache_control and has_cache_control(body):
+                    server._count("rejected_cache_control")
+                    self._send_error(400, "invalid_request_error", "cache_control is not supported")
+                    return
+
+                if server._roll(server.rate_limit_rate):
+                    server._count("rate_limited")
+                    self._send_error(429, "rate_limit_error", "Number of requests has exceeded your rate limit",
+                                     {"retry-after": "1"})
+                    return
+
+                delay = server._delay()
+                if delay > 0:
+                    time.sleep(delay)
+
+                try:
+                    text, usage = server.resolve(body, dict(self.headers))
+                except Exception as e:
+                    self._send_error(502, "api_error", f"上游请求失败: {e}")
+                    return
+
+                if text is None:
+                    self._send_error(404, "not_found_error", "没有匹配的 fixture（replay 模式）")
+                    return
+
+                if server._roll(server.malformed_rate):
+                    server._count("malformed")
+                    text = server.corrupt(text)
+
+                usage.setdefault("input_tokens", 0)
+                usage["output_tokens"] = usage.get("output_tokens") or estimate_tokens(text)
+                server.apply_cache_usage(body, usage)
+
+                if streaming:
+                    self._send_stream(body, text, usage, truncate=server._roll(server.truncate_rate))
+                else:
+                    if server.token_latency:
+                        time.sleep(server.token_latency * usage["output_tokens"])
+                    self._send_json(200, self._message(body, text, usage))
+
+            def _message(self, body: Dict, text: str, usage: Dict) -> Dict:
+                return {
+                    "id": f"msg_mock_{hashlib.sha1(text.encode('utf-8')).hexdigest()[:20]}",
+                    "type": "message",
+                    "role": "assistant",
+                    "model": body.get("model", "mock"),
+                    "content": [{"type": "text", "text": text}],
+                    "stop_reason": "end_turn",
+                    "stop_sequence": None,
+                    "usage": usage,
+                }
+
+            def _send_json(self, status: int, payload: Dict, headers: Dict[str, str] = None) -> None:
+                data = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_error(self, status: int, error_type: str, message: str,
+                            headers: Dict[str, str] = None) -> None:
+                self._send_json(status, {
+                    "type": "error",
+                    "error": {"type": error_type, "message": message}
+                }, headers)
+
+            def _event(self, event: str, payload: Dict) -> None:
+                self.wfile.write(f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+            def _send_stream(self, body: Dict, text: str, usage: Dict, truncate: bool) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Connection", "close")
+                self.end_headers()
+
+                message = self._message(body, "", dict(usage, output_tokens=1))
+                message["content"] = []
+                message["stop_reason"] = None
+                self._event("message_start", {"type": "message_start", "message": message})
+                self._event("content_block_start", {
+                    "type": "content_block_start", "index": 0,
+                    "content_block": {"type": "text", "text": ""}
+                })
+
+                pieces = [text[i:i + 24] for i in range(0, len(text), 24)]
+                cut_at = len(pieces) // 2 if truncate else None
+
+                for i, piece in enumerate(pieces):
+                    if cut_at is not None and i >= cut_at:
+                        # 中途断开：不发送结束事件，直接关闭连接
+                        server._count("truncated")
+                        self.close_connection = True
+                        return
+                    if server.token_latency:
+                        time.sleep(server.token_latency * estimate_tokens(piece))
+                    self._event("content_block_delta", {
+                        "type": "content_block_delta", "index": 0,
+                        "delta": {"type": "text_delta", "text": piece}
+                    })
+
+                self._event("content_block_stop", {"type": "content_block_stop", "index": 0})
+                self._event("message_delta", {
+                    "type": "message_delta",
+                    "delta": {"stop_reason": "end_turn", "stop_sequence": None},
+                    "usage": {"output_tokens": usage["output_tokens"]}
+                })
+                self._event("message_stop", {"type": "message_stop"})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="本地 Anthropic Messages API 替身")
+    parser.add_argument("--host", default="127.0.0.1", help="监听地址")
+    parser.add_argument("--port", type=int, default=8765, help="监听端口")
+    parser.add_argument("--mode", choices=MODES, default="auto", help="响应来源")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES_DIR, help="fixture 目录")
+    parser.add_argument("--upstream", default=os.getenv("MOCK_UPSTREAM_URL"),
+                        help="record 模式转发的真实接口地址")
+    parser.add_argument("--latency", type=float, default=0.0, help="每个请求的固定延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="随机抖动上限（秒）")
+    parser.add_argument("--token-latency", type=float, default=0.0, help="每个输出 token 的延迟（秒）")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="返回 429 的概率")
+    parser.add_argument("--malformed-rate", type=float, default=0.0, help="返回格式错误 JSON 的概率")
+    parser.add_argument("--truncate-rate", type=float, default=0.0, help="流式响应中途断开的概率")
+    parser.add_argument("--reject-cache-control", action="store_true", help="拒绝带 cache_control 的请求")
+    parser.add_argument("--min-cache-tokens", type=int, default=1024, help="可缓存前缀的最小 token 数")
+    parser.add_argument("--seed", type=int, default=None, help="随机种子")
+    args = parser.parse_args()
+
+    try:
+        server = MockAnthropicServer(
+            host=args.host, port=args.port, mode=args.mode, fixtures_dir=args.fixtures,
+            upstream=args.upstream, latency=args.latency, jitter=args.jitter,
+            token_latency=args.token_latency, rate_limit_rate=args.rate_limit_rate,
+            malformed_rate=args.malformed_rate, truncate_rate=args.truncate_rate,
+            reject_cache_control=args.reject_cache_control, min_cache_tokens=args.min_cache_tokens,
+            seed=args.seed,
+        )
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    print(f"🧪 Mock Anthropic 服务已启动: {server.url} (模式 {args.mode})")
+    print(f"   ANTHROPIC_BASE_URL={server.url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print(f"\n📊 {json.dumps(server.get_stats(), ensure_ascii=False)}")
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+"""
+Snapshot Archive - 过期快照的列式长期归档
+每月一个目录，按指标各存一个 NumPy .npy 矩阵：行 = 技能（skills 表 id），列 = 当月每一天（当天最后一次快照），
+读取时使用内存映射，按日期范围直接切出 技能 × 天数 矩阵，不经过 Python 对象
+"""
+import os
+import calendar
+import threading
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config import ARCHIVE_DIR
+
+
+# 归档的指标及其 dtype
+METRICS = {"rank": np.int32, "installs": np.int64}
+
+# 没有数据的单元格
+MISSING = -1
+
+
+def _month_of(day: date) -> str:
+    """日期所在月份：YYYY-MM"""
+    return day.strftime("%Y-%m")
+
+
+def _parse_date(value) -> date:
+    """YYYY-MM-DD 字符串或 date 转为 date"""
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def _row_positions(month_ids: np.ndarray, skill_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    在月份的行索引中查找技能
+
+    Returns:
+        (skill_ids 中找到的位置掩码, 对应的月份矩阵行号)
+    """
+    if len(month_ids) == 0:
+        return np.zeros(len(skill_ids), dtype=bool), np.empty(0, dtype=np.int64)
+    sorter = np.argsort(month_ids, kind="stable")
+    index = np.searchsorted(month_ids, skill_ids, sorter=sorter)
+    index = np.minimum(index, len(month_ids) - 1)
+    rows = sorter[index]
+    found = month_ids[rows] == skill_ids
+    return found, rows[found]
+
+
+class SnapshotArchive:
+    """
+    只追加的列式归档
+
+    每个月份目录包含：
+        skill_ids.npy          行对应的技能 id（新技能追加在末尾）
+        rank.npy / installs.npy  技能 × 当月天数 的矩阵，缺失为 MISSING
+        days.npy               当月已归档的天（bool），已归档的天不会再被改写
+
+    写入时先写指标矩阵，最后写 skill_ids.npy 和 days.npy 作为提交标记；
+    读取时只使用前 len(skill_ids) 行，中途失败的写入不会被读到
+    """
+
+    def __init__(self, archive_dir: str = None):
+        """
+        初始化（目录在第一次写入时创建）
+
+        Args:
+            archive_dir: 归档目录，默认使用配置中的值
+        """
+        self.archive_dir = Path(archive_dir or ARCHIVE_DIR)
+        self._lock = threading.Lock()
+
+    def _month_dir(self, month: str) -> Path:
+        """月份目录"""
+        return self.archive_dir / month
+
+    def months(self) -> List[str]:
+        """
+        已归档的月份
+
+        Returns:
+            月份列表（YYYY-MM），按升序排列
+        """
+        if not self.archive_dir.is_dir():
+            return []
+        return sorted(p.name for p in self.archive_dir.iterdir() if (p / "days.npy").exists())
+
+    def load_month(self, month: str) -> Optional[Dict[str, np.ndarray]]:
+        """
+        以内存映射方式打开一个月的归档
+
+        Args:
+            month: 月份（YYYY-MM）
+
+        Returns:
+            {"skill_ids", "days", "rank", "installs"}，均为只读内存映射；月份不存在返回 None
+        """
+        month_dir = self._month_dir(month)
+        try:
+            # skill_ids / days 最后写入，先读取它们确定有效行数
+            skill_ids = np.load(month_dir / "skill_ids.npy", mmap_mode="r")
+            days = np.load(month_dir / "days.npy", mmap_mode="r")
+            data = {"skill_ids": skill_ids, "days": days}
+            for metric in METRICS:
+                data[metric] = np.load(month_dir / f"{metric}.npy", mmap_mode="r")[:len(skill_ids)]
+        except FileNotFoundError:
+            return None
+        return data
+
+    def append(self, rows: Iterable[Sequence]) -> int:
+        """
+        追加每日数据
+
+        已归档的天会被跳过（只追加，不改写）
+
+        Args:
+            rows: (skill_id, date, rank, installs) 序列，每个技能每天一行
+
+        Returns:
+            新写入的单元格数（技能 × 天）
+        """
+        by_month: Dict[str, List[Tuple[int, int, int, int]]] = {}
+        # 同一天的行很多，日期只解析一次：{date: (月份行列表, 天序号)}
+        parsed: Dict = {}
+        for skill_id, day, rank, installs in rows:
+            target = parsed.get(day)
+            if target is None:
+                value = _parse_date(day)
+                target = parsed[day] = (by_month.setdefault(_month_of(value), []), value.day - 1)
+            target[0].append((skill_id, target[1], rank, installs))
+
+        written = 0
+        with self._lock:
+            for month, month_rows in sorted(by_month.items()):
+                written += self._append_month(month, np.array(month_rows, dtype=np.int64))
+        return written
+
+    def _append_month(self, month: str, rows: np.ndarray) -> int:
+        """把一个月的 (skill_id, 天序号, rank, installs) 数组合并进月份文件"""
+        year, month_number = (int(part) for part in month.split("-"))
+        days_in_month = calendar.monthrange(year, month_number)[1]
+
+        existing = self.load_month(month)
+        if existing is None:
+            old_ids = np.empty(0, dtype=np.int64)
+            archived = np.zeros(days_in_month, dtype=bool)
+        else:
+            old_ids = np.asarray(existing["skill_ids"])
+            archived = np.array(existing["days"])
+
+        rows = rows[~archived[rows[:, 1]]]
+        if len(rows) == 0:
+            return 0
+
+        new_ids = np.setdiff1d(rows[:, 0], old_ids)
+        skill_ids = np.concatenate([old_ids, new_ids])
+        _, positions = _row_positions(skill_ids, rows[:, 0])
+
+        month_dir = self._month_dir(month)
+        month_dir.mkdir(parents=True, exist_ok=True)
+        for column, (metric, dtype) in enumerate(METRICS.items(), start=2):
+            matrix = np.full((len(skill_ids), days_in_month), MISSING, dtype=dtype)
+            if existing is not None:
+                matrix[:len(old_ids)] = existing[metric]
+            matrix[positions, rows[:, 1]] = rows[:, column]
+            self._save(month_dir / f"{metric}.npy", matrix)
+
+        archived[np.unique(rows[:, 1])] = True
+        self._save(month_dir / "skill_ids.npy", skill_ids)
+        self._save(month_dir / "days.npy", archived)
+        return len(rows)
+
+    def _save(self, path: Path, array: np.ndarray) -> None:
+        """原子写入 .npy（先写临时文件再替换，已打开的内存映射继续读取旧文件）"""
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, array)
+        os.replace(tmp_path, path)
+
+    def matrix(self, start_date, end_date, skill_ids: Iterable[int] = None,
+               metrics: Sequence[str] = ("rank", "installs")) -> Dict:
+        """
+        读取日期范围内的 技能 × 天数 矩阵
+
+        只从内存映射中取出请求的行和日期列，不会把整个归档读入内存
+
+        Args:
+            start_date: 开始日期（含），YYYY-MM-DD 或 date
+            end_date: 结束日期（含），YYYY-MM-DD 或 date
+            skill_ids: 技能 id 列表，默认为范围内出现过的全部技能（按 id 升序）
+            metrics: 要读取的指标
+
+        Returns:
+            {"skill_ids": 行对应的技能 id, "dates": 列对应的日期列表, <指标>: 矩阵}，缺失为 MISSING
+        """
+        start, end = _parse_date(start_date), _parse_date(end_date)
+        total_days = max(0, (end - start).days + 1)
+        dates = [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(total_days)]
+
+        # 范围内每个月份：(月份, 当月起始天序号, 结束天序号, 在结果中的起始列)
+        spans = []
+        day = start
+        while day <= end:
+            last = date(day.year, day.month, calendar.monthrange(day.year, day.month)[1])
+            span_end = min(last, end)
+            spans.append((_month_of(day), day.day - 1, span_end.day, (day - start).days))
+            day = span_end + timedelta(days=1)
+
+        loaded = [(self.load_month(month), first, stop, column) for month, first, stop, column in spans]
+        loaded = [item for item in loaded if item[0] is not None]
+
+        if skill_ids is None:
+            ids = [np.asarray(data["skill_ids"]) for data, _, _, _ in loaded]
+            skill_ids = np.unique(np.concatenate(ids)) if ids else np.empty(0, dtype=np.int64)
+        else:
+            skill_ids = np.asarray(list(skill_ids), dtype=np.int64)
+
+        result = {"skill_ids": skill_ids, "dates": dates}
+        for metric in metrics:
+            result[metric] = np.full((len(skill_ids), total_days), MISSING, dtype=METRICS[metric])
+
+        for data, first, stop, column in loaded:
+            found, rows = _row_positions(np.asarray(data["skill_ids"]), skill_ids)
+            if not len(rows):
+                continue
+            width = stop - first
+            for metric in metrics:
+                result[metric][found, column:column + width] = data[metric][rows, first:stop]
+
+        return result
+
+    def get_stats(self) -> Dict:
+        """归档统计：月份数、技能数（各月之和）、已归档天数、磁盘占用"""
+        stats = {"months": 0, "rows": 0, "days": 0, "bytes": 0}
+        for month in self.months():
+            data = self.load_month(month)
+            if data is None:
+                continue
+            stats["months"] += 1
+            stats["rows"] += len(data["skill_ids"])
+            stats["days"] += int(np.count_nonzero(data["days"]))
+            stats["bytes"] += sum(p.stat().st_size for p in self._month_dir(month).glob("*.npy"))
+        return stats
+
+    def format_stats(self) -> str:
+        """格式化统计信息"""
+        stats = self.get_stats()
+        return (
+            f"{stats['months']} 个月, {stats['days']} 天, "
+            f"{stats['rows']} 行, {stats['bytes'] / 1024 / 1024:.2f}MB"
+        )
+
+
+def load_archive_matrix(start_date, end_date, skill_ids: Iterable[int] = None,
+                        archive_dir: str = None) -> Dict:
+    """
+    便捷函数：读取归档中的 技能 × 天数 矩阵（rank 和 installs）
+
+    Args:
+        start_date: 开始日期（含）
+        end_date: 结束日期（含）
+        skill_ids: 技能 id 列表，默认为全部
+        archive_dir: 归档目录，默认使用配置中的值
+
+    Returns:
+        见 SnapshotArchive.matrix
+    """
+    return SnapshotArchive(archive_dir).matrix(start_date, end_date, skill_ids)
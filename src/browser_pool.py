@@ -0,0 +1,293 @@
+"""
+Browser Pool - 进程级共享的 Chromium 浏览器池
+Chromium 每个进程只启动一次，按需分发隔离的上下文/页面，崩溃页面连同上下文一起丢弃
+"""
+import time
+import atexit
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+from typing import Dict, List, Optional
+
+
+# 启动参数 - CI 环境使用 headless 模式
+DEFAULT_LAUNCH_ARGS = [
+    '--disable-dev-shm-usage',
+    '--no-sandbox',
+    '--disable-setuid-sandbox',
+    '--disable-blink-features=AutomationControlled',
+]
+
+# 设置用户代理，避免被识别为机器人
+DEFAULT_USER_AGENT = (
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 '
+    '(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+)
+
+
+class BrowserPool:
+    """
+    进程级 Chromium 浏览器池
+
+    Playwright 对象绑定在创建它们的事件循环上，因此浏览器池自带一个后台事件循环线程，
+    所有使用浏览器的协程都通过 run() 提交到该循环执行。这样多次 asyncio 调用、
+    多次重试以及不同抓取阶段都能共享同一个已启动的 Chromium。
+    """
+
+    def __init__(self, headless: bool = True, launch_args: List[str] = None,
+                 user_agent: str = None):
+        """
+        初始化
+
+        Args:
+            headless: 是否使用无头模式
+            launch_args: Chromium 启动参数
+            user_agent: 新建上下文使用的用户代理
+        """
+        self.headless = headless
+        self.launch_args = launch_args or DEFAULT_LAUNCH_ARGS
+        self.user_agent = user_agent or DEFAULT_USER_AGENT
+
+        self._playwright = None
+        self._browser = None
+        self._browser_lock: Optional[asyncio.Lock] = None
+        self._crashed_pages = set()
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._thread_lock = threading.Lock()
+
+        self.stats = {
+            "launches": 0,        # Chromium 启动次数
+            "reuses": 0,          # 复用已启动浏览器的次数
+            "contexts": 0,        # 创建的上下文数
+            "pages": 0,           # 创建的页面数
+            "crashes": 0,         # 页面崩溃次数
+            "discarded": 0,       # 因页面崩溃而丢弃的上下文数
+            "launch_seconds": 0.0,  # 启动浏览器累计耗时
+        }
+
+    # ------------------------------------------------------------------
+    # 事件循环
+    # ------------------------------------------------------------------
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """确保后台事件循环线程已启动"""
+        with self._thread_lock:
+            if self._loop is None or self._thread is None or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="browser-pool",
+                    daemon=True
+                )
+                self._thread.start()
+        return self._loop
+
+    def run(self, coro):
+        """
+        在浏览器池的事件循环中执行协程，并阻塞等待结果
+
+        注意：不能在浏览器池自身的事件循环中调用（会死锁）
+
+        Args:
+            coro: 协程对象
+
+        Returns:
+            协程返回值
+        """
+        loop = self._ensure_loop()
+        return asyncio.run_coroutine_threadsafe(coro, loop).result()
+
+    def _check_loop(self):
+        """浏览器对象只能在池的事件循环中使用"""
+        if asyncio.get_running_loop() is not self._loop:
+            raise RuntimeError("BrowserPool 只能在其事件循环中使用，请通过 pool.run() 调用")
+
+    # ------------------------------------------------------------------
+    # 浏览器 / 上下文 / 页面
+    # ------------------------------------------------------------------
+
+    async def get_browser(self):
+        """获取已启动的浏览器，未启动或已断开时（重新）启动"""
+        self._check_loop()
+        if self._browser_lock is None:
+            self._browser_lock = asyncio.Lock()
+
+        async with self._browser_lock:
+            if self._browser is not None and self._browser.is_connected():
+                self.stats["reuses"] += 1
+                return self._browser
+
+            if self._browser is not None:
+                print("  ⚠️ 浏览器连接已断开，重新启动...")
+
+            if self._playwright is None:
+                from playwright.async_api import async_playwright
+                self._playwright = await async_playwright().start()
+
+            started = time.perf_counter()
+            self._browser = await self._playwright.chromium.launch(
+                headless=self.headless,
+                args=self.launch_args
+            )
+            elapsed = time.perf_counter() - started
+            self.stats["launches"] += 1
+            self.stats["launch_seconds"] += elapsed
+            print(f"  🚀 Chromium 已启动 ({elapsed:.2f}s)")
+
+            return self._browser
+
+    async def new_context(self, **options):
+        """
+        创建隔离的浏览器上下文（独立 cookie / 缓存 / 存储）
+
+        Args:
+            **options: 传给 browser.new_context 的参数
+
+        Returns:
+            BrowserContext
+        """
+        browser = await self.get_browser()
+        options.setdefault("user_agent", self.user_agent)
+        context = await browser.new_context(**options)
+        self.stats["contexts"] += 1
+        return context
+
+    async def new_page(self, context):
+        """
+        在上下文中创建页面，并监听崩溃事件
+
+        Args:
+            context: 浏览器上下文
+
+        Returns:
+            Page
+        """
+        page = await context.new_page()
+        page.on("crash", self._on_crash)
+        self.stats["pages"] += 1
+        return page
+
+    def _on_crash(self, page):
+        """页面崩溃回调：标记后随上下文一起丢弃"""
+        self._crashed_pages.add(page)
+        self.stats["crashes"] += 1
+        print("  ⚠️ 页面崩溃，所在上下文将被丢弃")
+
+    def is_crashed(self, page) -> bool:
+        """页面是否已崩溃"""
+        return page in self._crashed_pages
+
+    @asynccontextmanager
+    async def context(self, **options):
+        """
+        借出一个隔离的上下文，用完自动关闭
+
+        用法:
+            async with pool.context() as context:
+                page = await pool.new_page(context)
+        """
+        context = await self.new_context(**options)
+        try:
+            yield context
+        finally:
+            await self._close_context(context)
+
+    @asynccontextmanager
+    async def page(self, **options):
+        """
+        借出一个独立上下文中的页面，用完连同上下文一起关闭
+
+        用法:
+            async with pool.page() as page:
+                await page.goto(url)
+        """
+        context = await self.new_context(**options)
+        page = await self.new_page(context)
+        try:
+            yield page
+        finally:
+            if self.is_crashed(page):
+                self._crashed_pages.discard(page)
+                self.stats["discarded"] += 1
+            await self._close_context(context)
+
+    async def _close_context(self, context):
+        """关闭上下文，忽略浏览器已断开等错误"""
+        try:
+            await context.close()
+        except Exception:
+            pass
+
+    # ------------------------------------------------------------------
+    # 生命周期与统计
+    # ------------------------------------------------------------------
+
+    async def _close_async(self):
+        """关闭浏览器和 Playwright"""
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+        self._browser = None
+        self._playwright = None
+        self._browser_lock = None
+        self._crashed_pages.clear()
+
+    def close(self):
+        """关闭浏览器并停止后台事件循环"""
+        with self._thread_lock:
+            loop, thread = self._loop, self._thread
+            self._loop = None
+            self._thread = None
+
+        if loop is None:
+            return
+
+        if thread is not None and thread.is_alive():
+            if self._browser is not None or self._playwright is not None:
+                try:
+                    asyncio.run_coroutine_threadsafe(self._close_async(), loop).result(timeout=30)
+                except Exception:
+                    pass
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=5)
+
+        if not loop.is_running():
+            loop.close()
+
+    def get_stats(self) -> Dict:
+        """获取启动/复用统计"""
+        stats = dict(self.stats)
+        stats["running"] = self._browser is not None
+        return stats
+
+    def format_stats(self) -> str:
+        """格式化统计信息"""
+        return (
+            f"启动 {self.stats['launches']} 次 ({self.stats['launch_seconds']:.2f}s), "
+            f"复用 {self.stats['reuses']} 次, "
+            f"页面 {self.stats['pages']} 个, "
+            f"崩溃丢弃上下文 {self.stats['discarded']} 个"
+        )
+
+
+_pool: Optional[BrowserPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """获取进程级共享的浏览器池（便捷函数）"""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool()
+            atexit.register(_pool.close)
+    return _pool
@@ -4,10 +4,33 @@ Claude Summarizer - AI 总结和分类技能
 """
 import json
 import os
-from typing import Dict, List, Optional
-from anthropic import Anthropic
-
-from src.config import ZHIPU_API_KEY, ANTHROPIC_BASE_URL, CLAUDE_MODEL, CLAUDE_MAX_TOKENS
+import time
+import asyncio
+import hashlib
+from collections import Counter
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+from anthropic import AsyncAnthropic, BadRequestError
+
+from src.database import Database
+from src.json_stream import JsonArrayStream
+from src.skill_classifier import SkillClassifier, detail_text
+from src.token_budget import TokenBudget, estimate_tokens
+from src.config import (
+    ZHIPU_API_KEY,
+    ANTHROPIC_BASE_URL,
+    CLAUDE_MODEL,
+    CLAUDE_MAX_TOKENS,
+    CLAUDE_CHUNK_SIZE,
+    CLAUDE_CONCURRENCY,
+    CLAUDE_MAX_RETRIES,
+    CLAUDE_RETRY_BACKOFF,
+    CLAUDE_TIMEOUT,
+    CLAUDE_STREAM,
+    CLAUDE_PROMPT_CACHE,
+    CLAUDE_CACHE_MIN_TOKENS,
+    CLASSIFIER_ENABLED,
+)
 
 
 # 分类定义
@@ -30,40 +53,113 @@ CATEGORIES = {
 }
 
 
+def cache_min_tokens(model: str) -> int:
+    """
+    模型可缓存前缀的最小 token 数（短于它的前缀带 cache_control 也不会被缓存）
+
+    Args:
+        model: 模型名称
+
+    Returns:
+        最小 token 数，CLAUDE_CACHE_MIN_TOKENS 非 0 时直接使用该值
+    """
+    if CLAUDE_CACHE_MIN_TOKENS > 0:
+        return CLAUDE_CACHE_MIN_TOKENS
+    return 2048 if "haiku" in (model or "").lower() else 1024
+
+
+def compute_content_hash(detail: Dict) -> str:
+    """
+    计算技能分析输入的内容指纹（when_to_use、规则列表、拥有者）
+
+    Args:
+        detail: 技能详情
+
+    Returns:
+        sha256 十六进制字符串
+    """
+    content = json.dumps({
+        "when_to_use": detail.get("when_to_use") or "",
+        "rules": [[rule.get("file"), rule.get("desc")] for rule in detail.get("rules") or []],
+        "owner": detail.get("owner") or "",
+    }, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+async def _aiter(items: List[Any]) -> AsyncIterator[Any]:
+    """把列表包装为异步迭代器"""
+    for item in items:
+        yield item
+
+
 class ClaudeSummarizer:
     """AI 总结和分类技能"""
 
-    def __init__(self, api_key: str = None, base_url: str = None):
+    def __init__(self, api_key: str = None, base_url: str = None,
+                 chunk_size: int = None, concurrency: int = None, max_retries: int = None,
+                 stream: bool = None, prompt_cache: bool = None, classifier: SkillClassifier = None):
         """
         初始化 Claude 客户端
 
         Args:
             api_key: API 密钥，默认从环境变量读取
             base_url: API 基础 URL，默认从环境变量读取
+            chunk_size: 每个请求分析的技能数，默认使用配置中的值
+            concurrency: 同时进行的请求数，默认使用配置中的值
+            max_retries: 每块最多尝试次数，默认使用配置中的值
+            stream: 是否流式接收响应并逐个解析技能，默认使用配置中的值
+            prompt_cache: 是否为静态系统提示词开启 prompt caching，默认使用配置中的值
+            classifier: 本地预分类器，默认按配置创建（CLASSIFIER_ENABLED=false 时不预分类）
         """
         self.api_key = api_key or ZHIPU_API_KEY
         self.base_url = base_url or ANTHROPIC_BASE_URL
         self.model = CLAUDE_MODEL
         self.max_tokens = CLAUDE_MAX_TOKENS
+        self.chunk_size = max(1, chunk_size or CLAUDE_CHUNK_SIZE)
+        self.concurrency = max(1, concurrency or CLAUDE_CONCURRENCY)
+        self.max_retries = max(1, max_retries or CLAUDE_MAX_RETRIES)
+        self.retry_backoff = CLAUDE_RETRY_BACKOFF
+        self.stream = CLAUDE_STREAM if stream is None else stream
+        self.prompt_cache = CLAUDE_PROMPT_CACHE if prompt_cache is None else prompt_cache
+        self.system_prompt = self._build_system_prompt()
+        # 系统提示词（估算）短于模型的最小缓存长度时只提示：服务端会忽略过短前缀上的 cache_control，
+        # 代理的实际下限未知，仍照常发送；需要关闭时设置 CLAUDE_PROMPT_CACHE=false
+        self.system_prompt_tokens = estimate_tokens(self.system_prompt)
+        self.cache_shortfall = max(0, cache_min_tokens(self.model) - self.system_prompt_tokens)
+        if self.prompt_cache and self.cache_shortfall:
+            print(f"  ⚠️ 系统提示词约 {self.system_prompt_tokens} tokens，"
+                  f"比 {self.model} 的最小缓存长度少约 {self.cache_shortfall} tokens，缓存可能不会命中")
+        self.budget = TokenBudget(max_chunk_size=self.chunk_size)
+        self.classifier = classifier or (SkillClassifier() if CLASSIFIER_ENABLED else None)
+        self.usage_records: List[Dict] = []
+        self.stats = {"reused": 0, "regenerated": 0, "preclassified": 0, "chunks": 0, "retries": 0, "failed_chunks": 0}
 
         if not self.api_key:
             raise ValueError("ZHIPU_API_KEY 环境变量未设置")
 
-        try:
-            self.client = Anthropic(
-                base_url=self.base_url,
-                api_key=self.api_key
-            )
-            print(f"✅ Claude 客户端初始化成功")
-        except Exception as e:
-            raise Exception(f"Claude 客户端初始化失败: {e}")
-
-    def summarize_and_classify(self, details: List[Dict]) -> List[Dict]:
+        # 重试由分块逻辑自己控制（包括 JSON 格式错误），SDK 内部不再重试；
+        # 异步客户端的连接池绑定事件循环，每次运行时按这些参数重新创建
+        self.client_options = {
+            "base_url": self.base_url,
+            "api_key": self.api_key,
+            "timeout": CLAUDE_TIMEOUT,
+            "max_retries": 0,
+        }
+        print(f"✅ Claude 客户端初始化成功")
+
+    def summarize_and_classify(self, details: List[Dict], db: Database = None,
+                               run_time: str = None) -> List[Dict]:
         """
-        批量总结和分类技能
+        批量总结和分类技能（增量）
+
+        传入 db 时，输入内容指纹与 skills_details 中一致的技能直接复用已有分析，
+        只有新增或内容变化的技能才调用模型；每个技能的分析一解析完成就写回数据库。
+        调用模型前先本地预分类，置信度达到阈值的技能由模型只生成摘要，分类使用本地结果
 
         Args:
             details: 技能详情列表
+            db: 数据库，用于复用和保存分析结果；为 None 时全部重新生成且不保存
+            run_time: llm_usage 中的运行时间，分多批调用时传入同一个值以便汇总，默认为当前时间
 
         Returns:
             [
@@ -74,85 +170,443 @@ class ClaudeSummarizer:
                     "use_case": "视频自动化、个性化视频生成、数据可视化视频",
                     "solves": ["程序化视频", "字幕生成", "3D动效", "音频处理"],
                     "category": "video",
-                    "category_zh": "视频处理"
+                    "category_zh": "视频处理",
+                    "content_hash": "9f86d0...",
+                    "reused": True
                 },
                 ...
             ]
         """
-        if not details:
-            return []
+        return asyncio.run(self.summarize_batches(_aiter([details]), db, run_time))
 
-        print(f"🤖 正在调用 Claude 分析 {len(details)} 个技能...")
+    async def summarize_batches(self, batches: AsyncIterator[List[Dict]], db: Database = None,
+                                run_time: str = None) -> List[Dict]:
+        """
+        边接收边分析多批技能（流水线使用，summarize_and_classify 是只有一批的情况）
 
-        # 构建批量分析 Prompt
-        prompt = self._build_batch_prompt(details)
+        每收到一批就复用已有分析、预分类、裁剪并分块，块立即开始请求；
+        所有批次的块共享同一个并发限制，批次之间的请求相互重叠
 
-        try:
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                temperature=0.3,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ]
-            )
-
-            result_text = response.content[0].text
-            print(f"✅ Claude 响应成功")
-
-            # 解析结果
-            results = self._parse_batch_response(result_text, details)
+        Args:
+            batches: 技能详情批次的异步迭代器
+            db: 数据库，用于复用和保存分析结果；为 None 时全部重新生成且不保存
+            run_time: llm_usage 中的运行时间，默认为当前时间
 
-            return results
+        Returns:
+            所有技能的分析结果，按收到的顺序排列（格式同 summarize_and_classify）
+        """
+        self.stats = {"reused": 0, "regenerated": 0, "preclassified": 0, "chunks": 0, "retries": 0, "failed_chunks": 0}
+        self.usage_records = []
+        self.budget.stats["trimmed"] = 0
+        run_time = run_time or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        cached = db.get_all_skill_details() if db else {}
+        hashes: Dict[str, str] = {}
+        # 预分类的输入文本（随分析结果保存，作为以后训练分类器的特征）和预分类成功的技能
+        texts: Dict[str, str] = {}
+        preset_names = set()
+        received: List[Dict] = []
+        reused: List[Dict] = []
+        generated: List[Dict] = []
+        tasks: List[asyncio.Task] = []
+
+        def on_result(result: Dict) -> None:
+            # 降级结果不记录指纹，下次运行会重新生成
+            result["content_hash"] = None if result.get("fallback") else hashes.get(result["name"])
+            result["classifier_text"] = texts.get(result["name"]) or None
+            if result.get("fallback"):
+                result["category_source"] = "fallback"
+            else:
+                result["category_source"] = "preset" if result["name"] in preset_names else "llm"
+            generated.append(result)
+            if db:
+                db.save_skill_details([result], verbose=False)
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        async with AsyncAnthropic(**self.client_options) as client:
+            try:
+                async for batch in batches:
+                    received.extend(batch)
+                    batch_hashes = {d.get("name"): compute_content_hash(d) for d in batch}
+                    hashes.update(batch_hashes)
+                    texts.update((d.get("name"), detail_text(d)) for d in batch if not d.get("error"))
+
+                    batch_reused = self._reuse_cached(batch, batch_hashes, cached)
+                    reused.extend(batch_reused)
+                    reused_names = {r["name"] for r in batch_reused}
+                    if db:
+                        self._backfill_classifier_texts(db, batch_reused, cached, texts)
+                    pending = [d for d in batch if d.get("name") not in reused_names]
+                    if not pending:
+                        continue
+
+                    if self.classifier:
+                        pending = self._preclassify(pending, cached)
+                        preset_names.update(d.get("name") for d in pending if d.get("preset_category"))
+                    self.stats["regenerated"] += len(pending)
+
+                    for chunk in self._plan_chunks(pending):
+                        self.stats["chunks"] += 1
+                        tasks.append(asyncio.create_task(
+                            self._summarize_chunk(client, semaphore, chunk, self.stats["chunks"], on_result, run_time)
+                        ))
+            except BaseException:
+                for task in tasks:
+                    task.cancel()
+                raise
+
+            await asyncio.gather(*tasks)
+
+        self.stats["reused"] = len(reused)
+        if tasks:
+            self._report_usage()
+            if db:
+                print(f"✅ 保存技能详情: {len(generated)} 条记录")
+                db.save_llm_usage(self.usage_records)
+        print(f"♻️ 复用已有分析 {self.stats['reused']} 个, 重新生成 {self.stats['regenerated']} 个")
+
+        # 按输入顺序返回
+        order = {d.get("name"): i for i, d in enumerate(received)}
+        return sorted(reused + generated, key=lambda r: order.get(r["name"], len(order)))
+
+    def _reuse_cached(self, details: List[Dict], hashes: Dict[str, str], cached: Dict[str, Dict]) -> List[Dict]:
+        """
+        从 skills_details 中取出内容指纹未变化的分析
 
-        except Exception as e:
-            print(f"❌ Claude API 调用失败: {e}")
-            # 返回基本信息作为降级方案
-            return self._fallback_summaries(details)
+        详情页抓取失败（没有可分析的内容）时，只要已有非降级的分析也直接复用
 
-    def _build_batch_prompt(self, details: List[Dict]) -> str:
+        Args:
+            details: 技能详情列表
+            hashes: {技能名称: 内容指纹}
+            cached: skills_details 中已有的分析 {技能名称: 记录}
+
+        Returns:
+            可复用的分析结果列表
+        """
+        results = []
+
+        for detail in details:
+            name = detail.get("name")
+            row = cached.get(name)
+            if not row or not row.get("content_hash"):
+                continue
+            if row["content_hash"] != hashes[name] and not detail.get("error"):
+                continue
+
+            results.append({
+                "name": name,
+                "summary": row.get("summary"),
+                "description": row.get("description", ""),
+                "use_case": row.get("use_case", ""),
+                "solves": row.get("solves") or [],
+                "category": row.get("category", "other"),
+                "category_zh": row.get("category_zh", CATEGORIES.get("other", "其他")),
+                "rules_count": detail.get("rules_count") or row.get("rules_count", 0),
+                "owner": detail.get("owner") or row.get("owner", ""),
+                "url": detail.get("url") or row.get("url", ""),
+                "content_hash": row["content_hash"],
+                "reused": True
+            })
+
+        return results
+
+    def _backfill_classifier_texts(self, db: Database, reused: List[Dict], cached: Dict[str, Dict],
+                                   texts: Dict[str, str]) -> None:
         """
-        构建批量分析的 Prompt
+        为复用的分析补充预分类训练文本（旧记录没有 classifier_text）
+
+        texts 只包含详情抓取成功的技能，这些技能被复用说明内容指纹未变化，文本就是当初产生该分类的输入
 
         Args:
-            details: 技能详情列表
+            db: 数据库
+            reused: 本批复用的分析结果
+            cached: skills_details 中已有的分析
+            texts: {技能名称: 本次的预分类输入文本}
+        """
+        missing = {}
+        for result in reused:
+            row = cached.get(result["name"], {})
+            text = texts.get(result["name"])
+            if text and not row.get("classifier_text"):
+                missing[result["name"]] = text
+                row["classifier_text"] = text
+        if missing:
+            db.save_classifier_texts(missing)
+
+    def _preclassify(self, details: List[Dict], cached: Dict[str, Dict]) -> List[Dict]:
+        """
+        本地预分类：用已有分析训练分类器（每个实例只训练一次），为置信度达到阈值的技能标记 preset_category
+
+        Args:
+            details: 待分析的技能详情
+            cached: skills_details 中已有的分析（训练数据）
 
         Returns:
-            Prompt 字符串
+            技能详情副本，预分类成功的带 preset_category
         """
-        # 构建技能列表
-        skills_text = ""
-        for i, detail in enumerate(details, 1):
-            skills_text += f"\n{'='*60}\n"
-            skills_text += f"【技能 {i}】\n"
-            skills_text += f"名称: {detail.get('name')}\n"
-            skills_text += f"拥有者: {detail.get('owner')}\n"
-            skills_text += f"URL: {detail.get('url')}\n"
+        if cached and not self.classifier.trained:
+            # 只用分类体系内的历史分类训练
+            trained = self.classifier.fit(row for row in cached.values() if row.get("category") in CATEGORIES)
+            if trained:
+                print(f"  🏷️ 预分类模型: {self.classifier.format_report(self.classifier.evaluate())}")
 
-            if detail.get("when_to_use"):
-                skills_text += f"\n用途说明:\n{detail.get('when_to_use')}\n"
+        results = []
+        sources = Counter()
+        for detail in details:
+            prediction = self.classifier.classify(detail)
+            if prediction["confident"]:
+                sources[prediction["source"]] += 1
+                detail = {**detail, "preset_category": prediction["category"]}
+            results.append(detail)
+
+        preclassified = sum(sources.values())
+        self.stats["preclassified"] += preclassified
+        if sources:
+            breakdown = ", ".join(f"{source} {count}" for source, count in sources.most_common())
+            print(f"  🏷️ 本地预分类 {preclassified}/{len(details)} 个技能 "
+                  f"(阈值 {self.classifier.threshold:.2f}; {breakdown})，这些技能不再让 Claude 分类")
+        return results
 
-            if detail.get("rules"):
-                skills_text += f"\n规则列表 ({len(detail.get('rules'))} 条):\n"
-                for rule in detail.get("rules")[:5]:
-                    skills_text += f"  - {rule.get('file')}: {rule.get('desc')}\n"
-                if len(detail.get("rules")) > 5:
-                    skills_text += f"  ... 还有 {len(detail.get('rules')) - 5} 条\n"
+    def _plan_chunks(self, details: List[Dict]) -> List[List[Dict]]:
+        """
+        按 token 预算裁剪过长字段，再按预算划分请求块
+
+        Args:
+            details: 需要（重新）生成分析的技能详情列表
+
+        Returns:
+            分块后的技能详情
+        """
+        trimmed_before = self.budget.stats["trimmed"]
+        trimmed = [self.budget.trim_detail(d) for d in details]
+        chunks = self.budget.plan_chunks(trimmed)
+
+        print(f"🤖 正在调用 Claude 分析 {len(details)} 个技能 "
+              f"({len(chunks)} 块, 每块最多 {self.chunk_size} 个, 并发 {self.concurrency}"
+              f"{', 流式' if self.stream else ''})...")
+        if self.budget.stats["trimmed"] > trimmed_before:
+            print(f"  ✂️ {self.budget.stats['trimmed'] - trimmed_before} 个技能的内容超出预算，已裁剪")
+        return chunks
+
+    def _report_usage(self) -> None:
+        """汇总本次运行的 token 用量并输出"""
+        for record in self.usage_records:
+            record["chunk_count"] = self.stats["chunks"]
+
+        input_tokens = sum(r["input_tokens"] or 0 for r in self.usage_records)
+        output_tokens = sum(r["output_tokens"] or 0 for r in self.usage_records)
+        cache_read = sum(r["cache_read_tokens"] or 0 for r in self.usage_records)
+        cache_creation = sum(r["cache_creation_tokens"] or 0 for r in self.usage_records)
+        self.stats["input_tokens"] = input_tokens
+        self.stats["output_tokens"] = output_tokens
+        self.stats["cache_read_tokens"] = cache_read
+        self.stats["cache_creation_tokens"] = cache_creation
+        print(f"✅ Claude 分析完成 "
+              f"(重试 {self.stats['retries']} 次, 降级 {self.stats['failed_chunks']} 块)")
+        print(f"  📈 请求 {len(self.usage_records)} 次, 输入 {input_tokens} tokens, 输出 {output_tokens} tokens, "
+              f"缓存读取 {cache_read} / 写入 {cache_creation} tokens")
+
+    async def _summarize_chunk(self, client: AsyncAnthropic, semaphore: asyncio.Semaphore,
+                               chunk: List[Dict], index: int,
+                               on_result: Callable[[Dict], None], run_time: str) -> None:
+        """
+        分析一块技能
+
+        已完成的技能立即交给 on_result；请求失败、响应被截断或遗漏技能时，
+        指数退避后只重试尚未完成的技能，重试耗尽后只让剩余技能降级
+
+        Args:
+            client: 异步 Claude 客户端
+            semaphore: 并发限制
+            chunk: 本块技能详情
+            index: 块序号（用于日志）
+            on_result: 结果回调
+            run_time: 本次运行时间（用于 token 用量记录）
+        """
+        remaining = {d["name"]: d for d in chunk}
+
+        def accept(result: Dict) -> None:
+            # 只接受本块中尚未完成的技能（忽略重复和名称不匹配的结果）
+            if remaining.pop(result["name"], None) is not None:
+                on_result(result)
+
+        for attempt in range(1, self.max_retries + 1):
+            pending = list(remaining.values())
+            prompt = self._build_batch_prompt(pending)
+            max_tokens = self.budget.max_tokens_for(len(pending))
+            usage = {
+                "run_time": run_time,
+                "model": self.model,
+                "chunk_index": index,
+                "chunk_count": None,  # 全部块规划完成后由 _report_usage 填写
+                "attempt": attempt,
+                "skills": len(pending),
+                "estimated_input_tokens": estimate_tokens(self.system_prompt) + estimate_tokens(prompt),
+                "input_tokens": None,
+                "output_tokens": None,
+                "cache_read_tokens": None,
+                "cache_creation_tokens": None,
+                "prompt_cache": self.prompt_cache,
+                "max_tokens": max_tokens,
+                "latency_ms": None,
+                "first_token_ms": None,
+                "streaming": self.stream,
+                "status": "ok",
+            }
+            self.usage_records.append(usage)
+
+            try:
+                async with semaphore:
+                    started = time.perf_counter()
+                    try:
+                        await self._send(client, prompt, max_tokens, pending, accept, usage)
+                    finally:
+                        usage["latency_ms"] = int((time.perf_counter() - started) * 1000)
+
+                if not remaining:
+                    print(f"  ✅ [{index}/{self.stats['chunks']}] 完成 {len(chunk)} 个技能")
+                    return
+                raise ValueError(f"响应缺少 {len(remaining)} 个技能")
+
+            except Exception as e:
+                usage["status"] = type(e).__name__
+                print(f"  ⚠️ [{index}/{self.stats['chunks']}] 第 {attempt} 次请求失败 "
+                      f"(已完成 {len(chunk) - len(remaining)}/{len(chunk)}): {e}")
+                if attempt < self.max_retries:
+                    self.stats["retries"] += 1
+                    # 退避期间不占用并发名额
+                    await asyncio.sleep(self.retry_backoff * 2 ** (attempt - 1))
+
+        print(f"  ❌ [{index}/{self.stats['chunks']}] 重试 {self.max_retries} 次仍有 {len(remaining)} 个技能失败，使用降级结果")
+        self.stats["failed_chunks"] += 1
+        for result in self._fallback_summaries(list(remaining.values())):
+            on_result(result)
+
+    async def _send(self, client: AsyncAnthropic, prompt: str, max_tokens: int,
+                    details: List[Dict], accept: Callable[[Dict], None], usage: Dict) -> None:
+        """
+        发送一次请求（流式或普通）
+
+        开启 prompt caching 时如果接口返回 400（代理不支持 cache_control 等），
+        本次运行关闭缓存并立即重发一次，不计入重试次数
+        """
+        request = self._request_streaming if self.stream else self._request
+        try:
+            await request(client, prompt, max_tokens, details, accept, usage)
+        except BadRequestError as e:
+            if not usage["prompt_cache"]:
+                raise
+            self.prompt_cache = False
+            usage["prompt_cache"] = False
+            print(f"    ⚠️ 接口不支持 prompt caching，本次运行改为普通请求: {e}")
+            await request(client, prompt, max_tokens, details, accept, usage)
+
+    async def _request(self, client: AsyncAnthropic, prompt: str, max_tokens: int,
+                       details: List[Dict], accept: Callable[[Dict], None], usage: Dict) -> None:
+        """
+        普通请求：等待完整响应后严格解析
+
+        Args:
+            client: 异步 Claude 客户端
+            prompt: 提示词
+            max_tokens: 本次请求的输出上限
+            details: 本次请求的技能详情
+            accept: 单个结果回调
+            usage: 用量记录，写入 response.usage 中的 token 数
+        """
+        response = await client.messages.create(
+            model=self.model,
+            max_tokens=max_tokens,
+            # 较新的 SDK 不再把 temperature 作为关键字参数，通过请求体传递
+            extra_body={"temperature": 0.3},
+            system=self._system_param(),
+            messages=[
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ]
+        )
+        self._fill_usage(usage, response)
+
+        for result in self._decode_batch_response(response.content[0].text, details):
+            accept(result)
+
+    async def _request_streaming(self, client: AsyncAnthropic, prompt: str, max_tokens: int,
+                                 details: List[Dict], accept: Callable[[Dict], None], usage: Dict) -> None:
+        """
+        流式请求：边接收边增量解析 JSON 数组，每个技能一完整就交给 accept
+
+        Args:
+            client: 异步 Claude 客户端
+            prompt: 提示词
+            max_tokens: 本次请求的输出上限
+            details: 本次请求的技能详情
+            accept: 单个结果回调
+            usage: 用量记录，写入首 token 耗时和最终消息中的 token 数
+
+        Raises:
+            ValueError: 响应中的数组不完整（被截断）
+        """
+        original_map = {d["name"]: d for d in details}
+        parser = JsonArrayStream()
+        started = time.perf_counter()
+
+        async with client.messages.stream(
+            model=self.model,
+            max_tokens=max_tokens,
+            # 较新的 SDK 不再把 temperature 作为关键字参数，通过请求体传递
+            extra_body={"temperature": 0.3},
+            system=self._system_param(),
+            messages=[
+                {
+                    "role": "user",
+                    "content": prompt
+                }
+            ]
+        ) as stream:
+            async for text in stream.text_stream:
+                if usage["first_token_ms"] is None:
+                    usage["first_token_ms"] = int((time.perf_counter() - started) * 1000)
+                for item in parser.feed(text):
+                    result = self._validate_result(item, original_map)
+                    if result:
+                        accept(result)
+
+            self._fill_usage(usage, await stream.get_final_message())
+
+        if parser.errors:
+            print(f"    ⚠️ 跳过 {len(parser.errors)} 个无法解码的元素: {parser.errors[0]}")
+        if not parser.complete:
+            raise ValueError("响应中的 JSON 数组不完整（可能被截断）")
+
+    def _fill_usage(self, usage: Dict, message: Any) -> None:
+        """从响应消息的 usage 中读取 token 数（代理不返回时保持为空）"""
+        message_usage = getattr(message, "usage", None)
+        if message_usage is None:
+            return
+        usage["input_tokens"] = getattr(message_usage, "input_tokens", None)
+        usage["output_tokens"] = getattr(message_usage, "output_tokens", None)
+        # prompt caching 命中/写入的 token（不支持缓存的代理不返回，保持为空）
+        usage["cache_read_tokens"] = getattr(message_usage, "cache_read_input_tokens", None)
+        usage["cache_creation_tokens"] = getattr(message_usage, "cache_creation_input_tokens", None)
+
+    def _build_system_prompt(self) -> str:
+        """
+        构建静态的系统提示词（任务说明、分类体系、输出格式）
 
+        每次请求都相同，开启 prompt caching 时由服务端缓存
+
+        Returns:
+            系统提示词
+        """
         # 构建分类说明
         category_text = "\n".join([
             f"  - {key}: {zh}"
             for key, zh in CATEGORIES.items()
         ])
 
-        prompt = f"""你是一个技能分析专家。请分析以下 {len(details)} 个技能，为每个技能生成摘要和分类。
-
-{skills_text}
-
----
+        return f"""你是一个技能分析专家。用户会给出若干个技能的信息，请为每个技能生成摘要和分类。
 
 【任务要求】
 
@@ -200,14 +654,65 @@ class ClaudeSummarizer:
 - 只输出 JSON 数组，不要有任何其他说明文字
 - 确保 JSON 格式正确有效
 - name 必须与输入的技能名称完全一致
+- 技能信息中已给出"分类"的，直接省略 category 和 category_zh 字段
 - solves 数组包含 3-5 个问题关键词
 """
 
-        return prompt
+    def _build_batch_prompt(self, details: List[Dict]) -> str:
+        """
+        构建批量分析的 Prompt（每次请求变化的部分：技能列表）
+
+        Args:
+            details: 技能详情列表
+
+        Returns:
+            Prompt 字符串
+        """
+        # 构建技能列表
+        skills_text = ""
+        for i, detail in enumerate(details, 1):
+            skills_text += f"\n{'='*60}\n"
+            skills_text += f"【技能 {i}】\n"
+            skills_text += f"名称: {detail.get('name')}\n"
+            skills_text += f"拥有者: {detail.get('owner')}\n"
+            skills_text += f"URL: {detail.get('url')}\n"
+            if detail.get("preset_category"):
+                skills_text += f"分类: {detail.get('preset_category')}（已确定）\n"
+
+            if detail.get("when_to_use"):
+                skills_text += f"\n用途说明:\n{detail.get('when_to_use')}\n"
+
+            if detail.get("rules"):
+                # 经过 TokenBudget 裁剪的详情只保留前 5 条规则，rules_total 为原始条数
+                rules_total = detail.get("rules_total", len(detail.get("rules")))
+                skills_text += f"\n规则列表 ({rules_total} 条):\n"
+                for rule in detail.get("rules")[:5]:
+                    skills_text += f"  - {rule.get('file')}: {rule.get('desc')}\n"
+                if rules_total > 5:
+                    skills_text += f"  ... 还有 {rules_total - 5} 条\n"
+
+        return f"""请分析以下 {len(details)} 个技能，按系统提示中的要求输出 JSON 数组。
+{skills_text}"""
+
+    def _system_param(self) -> Any:
+        """
+        请求的 system 参数
+
+        开启 prompt caching 时以带 cache_control 的文本块发送，否则发送纯字符串（兼容不支持缓存的代理）
+        """
+        if self.prompt_cache:
+            return [
+                {
+                    "type": "text",
+                    "text": self.system_prompt,
+                    "cache_control": {"type": "ephemeral"}
+                }
+            ]
+        return self.system_prompt
 
     def _parse_batch_response(self, result_text: str, original_details: List[Dict]) -> List[Dict]:
         """
-        解析 Claude 的批量响应
+        解析 Claude 的批量响应，解析失败时返回降级结果
 
         Args:
             result_text: Claude 响应文本
@@ -216,6 +721,29 @@ class ClaudeSummarizer:
         Returns:
             解析后的技能列表
         """
+        try:
+            results = self._decode_batch_response(result_text, original_details)
+            print(f"✅ 成功解析 {len(results)} 个技能的 AI 分析")
+            return results
+        except ValueError as e:
+            print(f"❌ JSON 解析失败: {e}")
+            print(f"   原始响应: {result_text[:500]}...")
+            return self._fallback_summaries(original_details)
+
+    def _decode_batch_response(self, result_text: str, original_details: List[Dict]) -> List[Dict]:
+        """
+        严格解析 Claude 的批量响应（失败时抛出异常，由调用方决定重试或降级）
+
+        Args:
+            result_text: Claude 响应文本
+            original_details: 原始技能详情
+
+        Returns:
+            解析后的技能列表
+
+        Raises:
+            ValueError: 响应不是合法 JSON 或没有任何有效的技能结果
+        """
         # 清理可能的 markdown 代码块标记
         result_text = result_text.strip()
         if result_text.startswith("```json"):
@@ -226,51 +754,59 @@ class ClaudeSummarizer:
             result_text = result_text[:-3]
         result_text = result_text.strip()
 
-        try:
-            results = json.loads(result_text)
-
-            if not isinstance(results, list):
-                results = [results]
-
-            # 验证并补充信息
-            validated_results = []
-            original_map = {d["name"]: d for d in original_details}
-
-            for result in results:
-                if not isinstance(result, dict):
-                    continue
-
-                name = result.get("name")
-
-                # 确保 name 存在
-                if not name:
-                    continue
-
-                # 从原始数据中获取额外信息
-                original = original_map.get(name, {})
-
-                validated_result = {
-                    "name": name,
-                    "summary": result.get("summary", f"{name} 技能"),
-                    "description": result.get("description", ""),
-                    "use_case": result.get("use_case", ""),
-                    "solves": result.get("solves", []),
-                    "category": result.get("category", "other"),
-                    "category_zh": result.get("category_zh", CATEGORIES.get("other", "其他")),
-                    "rules_count": original.get("rules_count", 0),
-                    "owner": original.get("owner", ""),
-                    "url": original.get("url", "")
-                }
+        results = json.loads(result_text)  # JSONDecodeError 是 ValueError 的子类
 
-                validated_results.append(validated_result)
+        if not isinstance(results, list):
+            results = [results]
 
-            print(f"✅ 成功解析 {len(validated_results)} 个技能的 AI 分析")
-            return validated_results
+        # 验证并补充信息
+        original_map = {d["name"]: d for d in original_details}
+        validated_results = [
+            validated for validated in (self._validate_result(result, original_map) for result in results)
+            if validated
+        ]
 
-        except json.JSONDecodeError as e:
-            print(f"❌ JSON 解析失败: {e}")
-            print(f"   原始响应: {result_text[:500]}...")
-            return self._fallback_summaries(original_details)
+        if not validated_results:
+            raise ValueError("响应中没有有效的技能分析结果")
+
+        return validated_results
+
+    def _validate_result(self, result: Any, original_map: Dict[str, Dict]) -> Optional[Dict]:
+        """
+        验证单个技能结果并补充原始信息
+
+        Args:
+            result: 模型输出的一个数组元素
+            original_map: {技能名称: 原始技能详情}
+
+        Returns:
+            规范化后的结果，无效元素返回 None
+        """
+        if not isinstance(result, dict):
+            return None
+
+        name = result.get("name")
+
+        # 确保 name 存在
+        if not name:
+            return None
+
+        # 从原始数据中获取额外信息
+        original = original_map.get(name, {})
+        preset = original.get("preset_category")
+
+        return {
+            "name": name,
+            "summary": result.get("summary", f"{name} 技能"),
+            "description": result.get("description", ""),
+            "use_case": result.get("use_case", ""),
+            "solves": result.get("solves", []),
+            "category": preset or result.get("category", "other"),
+            "category_zh": CATEGORIES[preset] if preset else result.get("category_zh", CATEGORIES.get("other", "其他")),
+            "rules_count": original.get("rules_count", 0),
+            "owner": original.get("owner", ""),
+            "url": original.get("url", "")
+        }
 
     def _fallback_summaries(self, details: List[Dict]) -> List[Dict]:
         """
@@ -286,14 +822,15 @@ class ClaudeSummarizer:
 
         for detail in details:
             name = detail.get("name", "unknown")
+            category = detail.get("preset_category") or "other"
             results.append({
                 "name": name,
                 "summary": f"{name} - AI 分析暂不可用",
                 "description": f"技能名称: {name}",
                 "use_case": "待分析",
                 "solves": ["待分析"],
-                "category": "other",
-                "category_zh": "其他",
+                "category": category,
+                "category_zh": CATEGORIES.get(category, "其他"),
                 "rules_count": detail.get("rules_count", 0),
                 "owner": detail.get("owner", ""),
                 "url": detail.get("url", ""),
@@ -303,7 +840,7 @@ class ClaudeSummarizer:
         return results
 
 
-def summarize_skills(details: List[Dict]) -> List[Dict]:
+def summarize_skills(details: List[Dict], db: Database = None) -> List[Dict]:
     """便捷函数：总结和分类技能"""
     summarizer = ClaudeSummarizer()
-    return summarizer.summarize_and_classify(details)
+    return summarizer.summarize_and_classify(details, db)
@@ -43,6 +43,14 @@ def _get_env_int(key: str, default: int) -> int:
     return int(value)
 
 
+def _get_env_list(key: str, default: str) -> list:
+    """获取逗号分隔的列表环境变量，忽略空项"""
+    value = os.getenv(key)
+    if value is None or value == "":
+        value = default
+    return [item.strip() for item in value.split(",") if item.strip()]
+
+
 SMTP_HOST = os.getenv("SMTP_HOST")
 SMTP_PORT = _get_env_int("SMTP_PORT", 587)
 SMTP_USER = os.getenv("SMTP_USER")
@@ -293,7 +301,75 @@ def guess_theme_from_content(content_analysis: dict) -> str:
 SKILLS_BASE_URL = os.getenv("SKILLS_BASE_URL", "https://skills.sh")
 SKILLS_TRENDING_URL = f"{SKILLS_BASE_URL}/trending"
 TOP_N_DETAILS = 20  # 抓取详情的数量
-FETCH_REQUEST_DELAY = 2  # 抓取详情时的请求间隔（秒）
+FETCH_REQUEST_DELAY = 2  # 抓取详情时的请求间隔（秒），仅串行模式使用
+FETCH_CONCURRENCY = _get_env_int("FETCH_CONCURRENCY", 4)  # 详情页并发数，1 = 串行
+FETCH_RATE_LIMIT = float(os.getenv("FETCH_RATE_LIMIT", "2"))  # 并发模式下每秒最多请求数（令牌桶）
+
+# 详情页条件请求缓存（ETag / Last-Modified）
+DETAIL_CACHE_ENABLED = os.getenv("DETAIL_CACHE_ENABLED", "true").lower() == "true"
+DETAIL_CACHE_DIR = os.getenv("DETAIL_CACHE_DIR", "data/http_cache")
+DETAIL_CACHE_MAX_MB = _get_env_int("DETAIL_CACHE_MAX_MB", 50)
+
+# 详情页解析后端: lxml=XPath 只读取相关节点, bs4=BeautifulSoup 全量解析（原实现）
+DETAIL_PARSER = os.getenv("DETAIL_PARSER", "lxml").lower()
+
+# 详情页原始 HTML：默认解析后即丢弃，开启后 gzip 压缩保存到磁盘，供排查解析问题时按 URL 读取
+KEEP_RAW_HTML = os.getenv("KEEP_RAW_HTML", "false").lower() == "true"
+RAW_HTML_DIR = os.getenv("RAW_HTML_DIR", "data/raw_html")
+
+# 榜单获取模式: auto=优先直接解析数据载荷、失败时回退浏览器, fast=仅数据载荷, browser=仅浏览器
+SKILLS_FETCH_MODE = os.getenv("SKILLS_FETCH_MODE", "auto").lower()
+SKILLS_FAST_TIMEOUT = _get_env_int("SKILLS_FAST_TIMEOUT", 10)  # 数据载荷请求超时（秒）
+
+# 全量榜单流式抓取（Top 100 之外的长尾）
+TRACK_FULL_CATALOG = os.getenv("TRACK_FULL_CATALOG", "false").lower() == "true"
+SKILLS_CATALOG_BATCH_SIZE = _get_env_int("SKILLS_CATALOG_BATCH_SIZE", 500)  # 每批产出的技能数
+SKILLS_CATALOG_MAX_IDLE_SCROLLS = _get_env_int("SKILLS_CATALOG_MAX_IDLE_SCROLLS", 3)  # 连续无新数据的滚动次数上限
+CATALOG_DB_PATH = os.getenv("CATALOG_DB_PATH", "data/catalog.db")  # 全量快照单独存放，避免干扰每日趋势
+CATALOG_RETENTION_DAYS = _get_env_int("CATALOG_RETENTION_DAYS", 7)  # 全量快照保留天数（每次写入后清理）
+CATALOG_ARCHIVE_DIR = os.getenv("CATALOG_ARCHIVE_DIR", "data/archive_catalog")  # 全量快照的长期归档（技能 id 与主库不同，单独存放）
+
+# 榜单页面就绪检测（毫秒），各阶段独立超时
+SKILLS_READY_ROWS_TIMEOUT = _get_env_int("SKILLS_READY_ROWS_TIMEOUT", 20000)  # 等待排行榜行出现
+SKILLS_READY_NETWORKIDLE_TIMEOUT = _get_env_int("SKILLS_READY_NETWORKIDLE_TIMEOUT", 10000)  # 等待网络空闲
+SKILLS_READY_STABLE_TIMEOUT = _get_env_int("SKILLS_READY_STABLE_TIMEOUT", 10000)  # 等待内容长度稳定
+SKILLS_READY_MIN_ROWS = _get_env_int("SKILLS_READY_MIN_ROWS", 10)  # 认为榜单已渲染的最少行数
+
+# 榜单渲染时的资源拦截策略: block=拦截, audit=只统计不拦截, off=关闭
+SKILLS_RESOURCE_POLICY = os.getenv("SKILLS_RESOURCE_POLICY", "block").lower()
+SKILLS_BLOCKED_RESOURCE_TYPES = _get_env_list(
+    "SKILLS_BLOCKED_RESOURCE_TYPES", "image,media,font,stylesheet"
+)
+# 允许加载的脚本：主机（含子域名）、主机/路径前缀，或站点自身主机上的 /路径前缀；其余第三方脚本一律拦截
+SKILLS_SCRIPT_ALLOWLIST = _get_env_list("SKILLS_SCRIPT_ALLOWLIST", "skills.sh,/_next/")
+
+# Claude 分块并发分析：每块单独请求、单独重试，只有重试耗尽的块才降级
+CLAUDE_CHUNK_SIZE = _get_env_int("CLAUDE_CHUNK_SIZE", 10)  # 每个请求分析的技能数
+CLAUDE_CONCURRENCY = _get_env_int("CLAUDE_CONCURRENCY", 3)  # 同时进行的请求数
+CLAUDE_MAX_RETRIES = _get_env_int("CLAUDE_MAX_RETRIES", 3)  # 每块最多尝试次数
+CLAUDE_RETRY_BACKOFF = float(os.getenv("CLAUDE_RETRY_BACKOFF", "2"))  # 重试退避基数（秒），按 2 的幂增长
+CLAUDE_TIMEOUT = _get_env_int("CLAUDE_TIMEOUT", 120)  # 单次请求超时（秒）
+CLAUDE_STREAM = os.getenv("CLAUDE_STREAM", "true").lower() == "true"  # 流式接收响应，逐个技能解析和保存
+# 静态系统提示词（任务说明/分类/输出格式）使用 prompt caching；接口不支持时自动关闭
+CLAUDE_PROMPT_CACHE = os.getenv("CLAUDE_PROMPT_CACHE", "true").lower() == "true"
+# 可缓存前缀的最小 token 数，系统提示词估算低于它时输出提示（仍发送 cache_control）；0 = 按模型判断（Haiku 2048，其余 1024）
+CLAUDE_CACHE_MIN_TOKENS = _get_env_int("CLAUDE_CACHE_MIN_TOKENS", 0)
+
+# Claude 提示词 token 预算（估算值）：超出时裁剪字段、据此划分请求块和确定 max_tokens
+CLAUDE_INPUT_BUDGET = _get_env_int("CLAUDE_INPUT_BUDGET", 6000)  # 每个请求中技能内容的输入 token 上限
+CLAUDE_SKILL_INPUT_TOKENS = _get_env_int("CLAUDE_SKILL_INPUT_TOKENS", 600)  # 单个技能的输入 token 上限
+CLAUDE_OUTPUT_TOKENS_PER_SKILL = _get_env_int("CLAUDE_OUTPUT_TOKENS_PER_SKILL", 300)  # 每个技能的预计输出 token
+
+# 本地预分类（关键词规则 + TF-IDF 最近质心）：置信度达到阈值的技能不再让 Claude 分类
+CLASSIFIER_ENABLED = os.getenv("CLASSIFIER_ENABLED", "true").lower() == "true"
+CLASSIFIER_THRESHOLD = float(os.getenv("CLASSIFIER_THRESHOLD", "0.75"))  # 置信度阈值（0-1）
+CLASSIFIER_MIN_SAMPLES = _get_env_int("CLASSIFIER_MIN_SAMPLES", 30)  # 训练 TF-IDF 模型所需的最少历史记录，不足时只用关键词规则
+
+# 详情抓取与 AI 分析流水线：边抓取边分批分析，关闭时先抓取完再分析
+PIPELINE_ENABLED = os.getenv("PIPELINE_ENABLED", "true").lower() == "true"
+PIPELINE_BATCH_SIZE = _get_env_int("PIPELINE_BATCH_SIZE", 5)  # 凑够多少个详情就发起一批分析
+PIPELINE_QUEUE_SIZE = _get_env_int("PIPELINE_QUEUE_SIZE", 50)  # 详情队列容量（分析跟不上时抓取阻塞）
+PIPELINE_FLUSH_SECONDS = float(os.getenv("PIPELINE_FLUSH_SECONDS", "1.0"))  # 凑批最长等待（秒）
 
 # ============================================================================
 # Resend 邮件配置
@@ -307,6 +383,19 @@ EMAIL_TO = os.getenv("EMAIL_TO")
 # ============================================================================
 DB_PATH = os.getenv("DB_PATH", "data/trends.db")
 DB_RETENTION_DAYS = int(os.getenv("DB_RETENTION_DAYS", "30"))
+# 连接参数：WAL 日志 + synchronous=NORMAL（WAL 下只在检查点时 fsync），页缓存/内存映射大小
+DB_JOURNAL_MODE = os.getenv("DB_JOURNAL_MODE", "WAL").upper()
+DB_SYNCHRONOUS = os.getenv("DB_SYNCHRONOUS", "NORMAL").upper()
+DB_CACHE_SIZE_MB = _get_env_int("DB_CACHE_SIZE_MB", 64)  # 页缓存
+DB_MMAP_SIZE_MB = _get_env_int("DB_MMAP_SIZE_MB", 256)  # 内存映射读取，0 = 关闭
+DB_WRITE_BATCH_SIZE = _get_env_int("DB_WRITE_BATCH_SIZE", 5000)  # 批量写入时每次 executemany 的行数
+DB_DETAIL_CACHE_SIZE = _get_env_int("DB_DETAIL_CACHE_SIZE", 1000)  # 技能详情 LRU 缓存条数，0 = 不缓存
+DB_READ_POOL_SIZE = _get_env_int("DB_READ_POOL_SIZE", 4)  # 只读连接数上限，0 = 读取也使用写连接
+DB_BUSY_TIMEOUT_MS = _get_env_int("DB_BUSY_TIMEOUT_MS", 5000)  # 数据库被锁定时的等待时间（毫秒）
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # 只读连接全部借出时的最长等待时间（秒）
+# 长期归档：清理过期数据前把每日排名 / 安装量写入按月分区的 NumPy 列式文件
+ARCHIVE_ENABLED = os.getenv("ARCHIVE_ENABLED", "true").lower() == "true"
+ARCHIVE_DIR = os.getenv("ARCHIVE_DIR", "data/archive")
 
 # ============================================================================
 # 告警阈值
@@ -0,0 +1,221 @@
+"""
+Connection Pool - SQLite 连接管理
+一个写连接 + 一组 mode=ro 只读连接，WAL 模式下多个线程可以并行查询，不阻塞写入流程
+"""
+import time
+import sqlite3
+import threading
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.config import (
+    DB_READ_POOL_SIZE,
+    DB_BUSY_TIMEOUT_MS,
+    DB_POOL_TIMEOUT,
+)
+
+
+# 只对写连接有意义（或只读连接无权修改）的 PRAGMA
+WRITER_ONLY_PRAGMAS = {"journal_mode", "synchronous"}
+
+
+class _Waiter:
+    """等待只读连接的线程：归还的连接按先来后到直接交给它"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.conn: Optional[sqlite3.Connection] = None
+
+
+class ConnectionPool:
+    """
+    SQLite 连接池
+
+    写连接只有一个（由调用方保证同一时间只有一个线程写入）；只读连接按线程借出，
+    同一线程嵌套借用时复用已借出的连接；归还时优先交给等待最久的线程，否则放回空闲列表
+    """
+
+    def __init__(self, db_path: str, pragmas: Dict[str, Any] = None, size: int = None,
+                 busy_timeout_ms: int = None, checkout_timeout: float = None):
+        """
+        初始化（连接都是按需创建的）
+
+        Args:
+            db_path: 数据库文件路径
+            pragmas: 每个连接建立时执行的 PRAGMA（只读连接跳过 WRITER_ONLY_PRAGMAS）
+            size: 只读连接数上限，0 表示读取也使用写连接，默认使用配置中的值
+            busy_timeout_ms: 数据库被锁定时的等待时间（毫秒），默认使用配置中的值
+            checkout_timeout: 只读连接全部借出时的最长等待时间（秒），默认使用配置中的值
+        """
+        self.db_path = db_path
+        self.pragmas = pragmas or {}
+        self.size = DB_READ_POOL_SIZE if size is None else max(0, size)
+        self.busy_timeout_ms = DB_BUSY_TIMEOUT_MS if busy_timeout_ms is None else busy_timeout_ms
+        self.checkout_timeout = DB_POOL_TIMEOUT if checkout_timeout is None else checkout_timeout
+
+        # 内存数据库无法被其他连接打开，只能共用写连接
+        if self.db_path == ":memory:":
+            self.size = 0
+
+        self._writer: Optional[sqlite3.Connection] = None
+        self._idle: List[sqlite3.Connection] = []
+        self._waiters: "deque[_Waiter]" = deque()
+        self._readers: List[sqlite3.Connection] = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        # close() 后递增，旧连接归还时直接关闭
+        self._generation = 0
+
+        self.stats = {
+            "readers_opened": 0,   # 创建的只读连接数
+            "checkouts": 0,        # 借出只读连接的次数（不含同线程嵌套）
+            "nested": 0,           # 同一线程嵌套借用、复用已借出连接的次数
+            "waits": 0,            # 只读连接全部借出、需要等待的次数
+            "wait_seconds": 0.0,   # 等待只读连接的累计耗时
+            "timeouts": 0,         # 等待超时次数
+            "busy_errors": 0,      # 超过 busy_timeout 仍被锁定的查询次数
+            "in_use": 0,           # 当前借出的只读连接数
+            "peak_in_use": 0,      # 同时借出的最大只读连接数
+        }
+
+    def writer(self) -> sqlite3.Connection:
+        """获取写连接（不存在时创建）"""
+        with self._lock:
+            if self._writer is None:
+                self._writer = self._open(self.db_path, uri=False, read_only=False)
+            return self._writer
+
+    @contextmanager
+    def reader(self) -> Iterator[sqlite3.Connection]:
+        """
+        借出一个只读连接，退出时归还
+
+        size 为 0 时直接使用写连接
+
+        Yields:
+            sqlite3 连接
+        """
+        if self.size == 0:
+            yield self.writer()
+            return
+
+        held = getattr(self._local, "conn", None)
+        if held is not None and self._local.generation == self._generation:
+            with self._lock:
+                self.stats["nested"] += 1
+            yield held
+            return
+
+        conn, generation = self._checkout()
+        self._local.conn, self._local.generation = conn, generation
+        try:
+            yield conn
+        except sqlite3.OperationalError as e:
+            if "locked" in str(e) or "busy" in str(e):
+                with self._lock:
+                    self.stats["busy_errors"] += 1
+            raise
+        finally:
+            self._local.conn = None
+            self._release(conn, generation)
+
+    def _checkout(self) -> Tuple[sqlite3.Connection, int]:
+        """取出空闲连接；没有空闲且未达上限时新建，否则排队等待归还"""
+        with self._lock:
+            generation = self._generation
+            self.stats["checkouts"] += 1
+            conn = None
+            if self._idle:
+                conn = self._idle.pop()
+            elif len(self._readers) < self.size:
+                conn = self._open(self._read_only_uri(), uri=True, read_only=True)
+                self._readers.append(conn)
+                self.stats["readers_opened"] += 1
+            if conn is not None:
+                self._mark_in_use()
+                return conn, generation
+
+            waiter = _Waiter()
+            self._waiters.append(waiter)
+            self.stats["waits"] += 1
+
+        started = time.perf_counter()
+        waiter.event.wait(self.checkout_timeout)
+
+        with self._lock:
+            self.stats["wait_seconds"] += time.perf_counter() - started
+            if waiter.conn is None:
+                self._waiters.remove(waiter)
+                self.stats["timeouts"] += 1
+                raise TimeoutError(
+                    f"等待只读连接超时（{self.checkout_timeout}s，连接池大小 {self.size}）"
+                )
+            # _release 交接时已计入 in_use
+            return waiter.conn, self._generation
+
+    def _mark_in_use(self) -> None:
+        """记录借出数（调用方持有 _lock）"""
+        self.stats["in_use"] += 1
+        self.stats["peak_in_use"] = max(self.stats["peak_in_use"], self.stats["in_use"])
+
+    def _release(self, conn: sqlite3.Connection, generation: int) -> None:
+        """归还连接：交给等待最久的线程或放回空闲列表；连接池已关闭过时直接关闭该连接"""
+        if conn.in_transaction:
+            conn.rollback()
+        with self._lock:
+            self.stats["in_use"] -= 1
+            if generation != self._generation:
+                conn.close()
+                return
+            if self._waiters:
+                waiter = self._waiters.popleft()
+                waiter.conn = conn
+                self._mark_in_use()
+                waiter.event.set()
+                return
+            self._idle.append(conn)
+
+    def _read_only_uri(self) -> str:
+        """只读连接的 URI：file:<绝对路径>?mode=ro"""
+        return f"{Path(self.db_path).resolve().as_uri()}?mode=ro"
+
+    def _open(self, target: str, uri: bool, read_only: bool) -> sqlite3.Connection:
+        """创建连接并执行 PRAGMA"""
+        conn = sqlite3.connect(
+            target,
+            uri=uri,
+            timeout=self.busy_timeout_ms / 1000,
+            check_same_thread=False,
+        )
+        conn.row_factory = sqlite3.Row  # 返回字典格式
+        for name, value in self.pragmas.items():
+            if read_only and name in WRITER_ONLY_PRAGMAS:
+                continue
+            conn.execute(f"PRAGMA {name}={value}")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        if read_only:
+            conn.execute("PRAGMA query_only=1")
+        return conn
+
+    def close(self) -> None:
+        """关闭空闲的只读连接和写连接；仍被借出的只读连接在归还时关闭"""
+        with self._lock:
+            self._generation += 1
+            for conn in self._idle:
+                conn.close()
+            self._idle = []
+            self._readers = []
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+    def get_stats(self) -> Dict:
+        """连接池统计（附带当前只读连接数和空闲数）"""
+        with self._lock:
+            stats = dict(self.stats)
+            stats["size"] = self.size
+            stats["readers"] = len(self._readers)
+            stats["idle"] = len(self._idle)
+        return stats
@@ -5,26 +5,127 @@ SQLite 数据库操作模块
 import os
 import sqlite3
 import json
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple
 from pathlib import Path
 
-from src.config import DB_PATH, DB_RETENTION_DAYS
+from src.archive import SnapshotArchive
+from src.connection_pool import ConnectionPool
+from src.config import (
+    DB_PATH,
+    DB_RETENTION_DAYS,
+    DB_JOURNAL_MODE,
+    DB_SYNCHRONOUS,
+    DB_CACHE_SIZE_MB,
+    DB_MMAP_SIZE_MB,
+    DB_WRITE_BATCH_SIZE,
+    DB_DETAIL_CACHE_SIZE,
+    ARCHIVE_ENABLED,
+    SKILLS_BASE_URL,
+)
+
+
+# 每个连接建立时执行的 PRAGMA（按顺序）
+DEFAULT_PRAGMAS = {
+    "journal_mode": DB_JOURNAL_MODE,
+    "synchronous": DB_SYNCHRONOUS,
+    "cache_size": -DB_CACHE_SIZE_MB * 1024,   # 负数表示 KiB
+    "mmap_size": DB_MMAP_SIZE_MB * 1024 * 1024,
+    "temp_store": "MEMORY",
+}
+
+# 表结构迁移：(目标版本号, Database 上的迁移方法名)，按版本号升序执行
+MIGRATIONS = [
+    (1, "_migrate_skill_ids"),
+    (2, "_migrate_snapshot_catalog"),
+    (3, "_migrate_history_rollup"),
+]
+
+# IN (...) 查询每次最多绑定的参数数（低于旧版 SQLite 的 999 上限）
+_IN_CHUNK_SIZE = 500
+
+# 快照查询列（s = skills_snapshot, k = skills），url 由第一个参数 SKILLS_BASE_URL 拼接
+_SNAPSHOT_COLUMNS = """
+    s.rank, k.name, k.owner, s.installs, s.installs_delta, s.installs_rate, s.rank_delta,
+    ? || '/' || k.owner || '/' || k.name AS url
+"""
+
+# skills_details 查询列
+_DETAIL_COLUMNS = """
+    name, summary, description, use_case, solves, category, category_zh, rules_count, owner, url,
+    content_hash, classifier_text, category_source
+"""
+
+
+def _hash_snapshot_row(digest: Any, row: Tuple) -> None:
+    """把一行 (rank, owner, name, installs) 计入快照内容指纹"""
+    digest.update(("\t".join(str(value) for value in row) + "\n").encode("utf-8"))
+
+
+def _detail_from_row(row: sqlite3.Row) -> Dict:
+    """skills_details 的一行转为详情字典（解析 JSON 字段）"""
+    detail = dict(row)
+    if detail.get("solves"):
+        detail["solves"] = json.loads(detail["solves"])
+    return detail
+
+
+def _copy_detail(detail: Dict) -> Dict:
+    """复制详情字典（solves 列表也复制），调用方修改结果不会影响缓存"""
+    copied = dict(detail)
+    if isinstance(copied.get("solves"), list):
+        copied["solves"] = list(copied["solves"])
+    return copied
+
+
+def _batched(rows: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    """把可迭代对象按 size 分批（支持生成器，不会一次性展开）"""
+    iterator = iter(rows)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
 
 
 class Database:
     """SQLite 数据库操作类"""
 
-    def __init__(self, db_path: str = None):
+    def __init__(self, db_path: str = None, pragmas: Dict[str, Any] = None,
+                 batch_size: int = None, detail_cache_size: int = None,
+                 read_pool_size: int = None, archive_dir: str = None):
         """
         初始化数据库连接
 
         Args:
             db_path: 数据库文件路径，默认使用配置中的路径
+            pragmas: 连接建立时执行的 PRAGMA，默认使用 DEFAULT_PRAGMAS；传入 {} 使用 SQLite 默认值
+            batch_size: 批量写入时每次 executemany 的行数，默认使用配置中的值
+            detail_cache_size: 技能详情 LRU 缓存条数（0 = 不缓存），默认使用配置中的值
+            read_pool_size: 只读连接数上限（0 = 读取也使用写连接），默认使用配置中的值
+            archive_dir: 长期归档目录，默认使用配置中的值（ARCHIVE_ENABLED 关闭时不归档）
         """
         self.db_path = db_path or DB_PATH
+        self.pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+        self.batch_size = max(1, batch_size or DB_WRITE_BATCH_SIZE)
+        self.detail_cache_size = DB_DETAIL_CACHE_SIZE if detail_cache_size is None else detail_cache_size
+        # {技能名称: 详情}，不存在的技能缓存为 None；save_skill_details 写入时失效
+        self._detail_cache: "OrderedDict[str, Optional[Dict]]" = OrderedDict()
+        self._detail_cache_version = 0
+        self._detail_cache_lock = threading.Lock()
+        self.detail_cache_stats = {"hits": 0, "misses": 0}
         self._ensure_db_dir()
+        # 写连接即 self.conn；查询方法通过 reader() 使用只读连接
+        self.pool = ConnectionPool(self.db_path, self.pragmas, size=read_pool_size)
+        self._write_lock = threading.RLock()
         self.conn = None
+        # 清理过期数据前先归档到列式文件；None 表示直接删除
+        self.archive = SnapshotArchive(archive_dir) if ARCHIVE_ENABLED else None
 
     def _ensure_db_dir(self):
         """确保数据库目录存在"""
@@ -32,16 +133,66 @@ class Database:
         db_dir.mkdir(parents=True, exist_ok=True)
 
     def connect(self):
-        """建立数据库连接"""
+        """建立数据库连接（写连接）"""
         if self.conn is None:
-            self.conn = sqlite3.connect(self.db_path)
-            self.conn.row_factory = sqlite3.Row  # 返回字典格式
+            self.conn = self.pool.writer()
+
+    def reader(self):
+        """
+        借出只读连接（上下文管理器），多个线程可以并行查询
+
+        Returns:
+            yield sqlite3 连接的上下文管理器
+        """
+        return self.pool.reader()
 
     def close(self):
-        """关闭数据库连接"""
-        if self.conn:
-            self.conn.close()
-            self.conn = None
+        """关闭数据库连接（WAL 模式下先把日志合并回主文件，数据库可以单文件拷贝）"""
+        # 只读连接无法删除 -wal / -shm，只用过只读连接时也通过写连接合并日志
+        if self.conn or self.pool.get_stats()["readers"]:
+            if str(self.pragmas.get("journal_mode", "")).upper() == "WAL":
+                self.connect()
+                self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        self.pool.close()
+        self.conn = None
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Cursor]:
+        """
+        显式写事务：BEGIN IMMEDIATE 开始，正常结束提交，异常回滚
+
+        已经处于事务中时直接复用外层事务；写连接同一时间只给一个线程使用
+
+        Yields:
+            游标
+        """
+        self.connect()
+        with self._write_lock:
+            cursor = self.conn.cursor()
+            if self.conn.in_transaction:
+                yield cursor
+                return
+
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                yield cursor
+            except BaseException:
+                self.conn.rollback()
+                raise
+            self.conn.commit()
+
+    def _executemany_batched(self, cursor: sqlite3.Cursor, sql: str, rows: Iterable[Tuple]) -> int:
+        """
+        分批 executemany（行可以来自生成器）
+
+        Returns:
+            写入的行数
+        """
+        count = 0
+        for batch in _batched(rows, self.batch_size):
+            cursor.executemany(sql, batch)
+            count += len(batch)
+        return count
 
     def __enter__(self):
         self.connect()
@@ -51,10 +202,95 @@ class Database:
         self.close()
 
     def init_db(self) -> None:
-        """初始化数据库表"""
+        """初始化数据库表，并把表结构迁移到最新版本（PRAGMA user_version 记录版本号）"""
         self.connect()
         cursor = self.conn.cursor()
 
+        version = self.get_schema_version()
+        if version == 0:
+            self._create_baseline(cursor)
+
+        # 2. skills_details - 技能详情缓存表
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS skills_details (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                name TEXT UNIQUE NOT NULL,
+                summary TEXT NOT NULL,
+                description TEXT,
+                use_case TEXT,
+                solves TEXT,
+                category TEXT NOT NULL,
+                category_zh TEXT NOT NULL,
+                rules_count INTEGER,
+                owner TEXT NOT NULL,
+                url TEXT NOT NULL,
+                content_hash TEXT,
+                classifier_text TEXT,
+                category_source TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        # 兼容旧表：补充 content_hash 列（分析输入内容的指纹，用于增量分析）、
+        # classifier_text / category_source 列（本地预分类的训练输入和分类来源）
+        cursor.execute("PRAGMA table_info(skills_details)")
+        detail_columns = {row["name"] for row in cursor.fetchall()}
+        for column in ("content_hash", "classifier_text", "category_source"):
+            if column not in detail_columns:
+                print(f"📦 skills_details 新增 {column} 列...")
+                cursor.execute(f"ALTER TABLE skills_details ADD COLUMN {column} TEXT")
+
+        # 4. llm_usage - Claude 调用用量（每次请求一条，用于跟踪成本和速度）
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS llm_usage (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                run_time TEXT NOT NULL,
+                model TEXT NOT NULL,
+                chunk_index INTEGER,
+                chunk_count INTEGER,
+                attempt INTEGER,
+                skills INTEGER,
+                estimated_input_tokens INTEGER,
+                input_tokens INTEGER,
+                output_tokens INTEGER,
+                cache_read_tokens INTEGER,
+                cache_creation_tokens INTEGER,
+                prompt_cache INTEGER DEFAULT 0,
+                max_tokens INTEGER,
+                latency_ms INTEGER,
+                first_token_ms INTEGER,
+                streaming INTEGER DEFAULT 0,
+                status TEXT NOT NULL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+        # 兼容旧表：补充 prompt caching 统计列
+        cursor.execute("PRAGMA table_info(llm_usage)")
+        usage_columns = {row["name"] for row in cursor.fetchall()}
+        for column, definition in [
+            ("cache_read_tokens", "INTEGER"),
+            ("cache_creation_tokens", "INTEGER"),
+            ("prompt_cache", "INTEGER DEFAULT 0"),
+        ]:
+            if column not in usage_columns:
+                cursor.execute(f"ALTER TABLE llm_usage ADD COLUMN {column} {definition}")
+
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_details_category ON skills_details(category)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_details_owner ON skills_details(owner)")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_usage_run ON llm_usage(run_time)")
+
+        self.conn.commit()
+        self._migrate(version)
+        print(f"✅ 数据库初始化完成: {self.db_path}")
+
+    def get_schema_version(self) -> int:
+        """获取表结构版本号（PRAGMA user_version，新建或未迁移的旧库为 0）"""
+        self.connect()
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
+    def _create_baseline(self, cursor: sqlite3.Cursor) -> None:
+        """版本 0：原始的快照表和历史表结构，之后由 MIGRATIONS 逐步升级"""
         # 1. skills_snapshot - 快照表（每次抓取一条记录）
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS skills_snapshot (
@@ -95,24 +331,6 @@ class Database:
             print("🗑️ 删除旧表 skills_daily...")
             cursor.execute("DROP TABLE skills_daily")
 
-        # 2. skills_details - 技能详情缓存表
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS skills_details (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT UNIQUE NOT NULL,
-                summary TEXT NOT NULL,
-                description TEXT,
-                use_case TEXT,
-                solves TEXT,
-                category TEXT NOT NULL,
-                category_zh TEXT NOT NULL,
-                rules_count INTEGER,
-                owner TEXT NOT NULL,
-                url TEXT NOT NULL,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-
         # 3. skills_history - 历史趋势表
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS skills_history (
@@ -125,63 +343,357 @@ class Database:
             )
         """)
 
-        # 创建索引
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_snapshot_time ON skills_snapshot(snapshot_time)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_snapshot_date ON skills_snapshot(date)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_snapshot_name ON skills_snapshot(name)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_snapshot_rank ON skills_snapshot(snapshot_time, rank)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_details_category ON skills_details(category)")
-        cursor.execute("CREATE INDEX IF NOT EXISTS idx_details_owner ON skills_details(owner)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_history_name ON skills_history(skill_name)")
         cursor.execute("CREATE INDEX IF NOT EXISTS idx_history_date ON skills_history(date)")
 
-        self.conn.commit()
-        print(f"✅ 数据库初始化完成: {self.db_path}")
+    def _migrate(self, version: int) -> None:
+        """
+        依次执行尚未应用的迁移，每个迁移和版本号更新在同一个事务中提交
 
-    def save_snapshot(self, snapshot_time: str, date: str, skills: List[Dict]) -> None:
+        Args:
+            version: 当前表结构版本号
+        """
+        pending = [(target, name) for target, name in MIGRATIONS if target > version]
+        if not pending:
+            return
+
+        for target, name in pending:
+            print(f"📦 迁移表结构 v{target}: {name}...")
+            with self.transaction() as cursor:
+                getattr(self, name)(cursor)
+                cursor.execute(f"PRAGMA user_version={target}")
+
+        # 回收迁移前旧表占用的页（VACUUM 不能在事务中执行）
+        if version > 0 or self.conn.execute("SELECT COUNT(*) FROM skills_snapshot").fetchone()[0]:
+            self.conn.execute("VACUUM")
+
+    def _migrate_skill_ids(self, cursor: sqlite3.Cursor) -> None:
+        """
+        v1：新增 skills 维度表（owner, name -> 整数 id）
+
+        快照表和历史表只保存 skill_id 和数值，url 查询时由 SKILLS_BASE_URL/owner/name 拼接
+        """
+        cursor.execute("""
+            CREATE TABLE skills (
+                id INTEGER PRIMARY KEY,
+                owner TEXT NOT NULL,
+                name TEXT NOT NULL,
+                UNIQUE(owner, name)
+            )
+        """)
+        cursor.execute("CREATE INDEX idx_skills_name ON skills(name)")
+
+        cursor.execute("""
+            INSERT OR IGNORE INTO skills (owner, name)
+            SELECT owner, name FROM skills_snapshot ORDER BY id
+        """)
+        # 历史表没有 owner：只在快照表中找不到同名技能时才新建，拥有者取自详情表
+        cursor.execute("""
+            INSERT OR IGNORE INTO skills (owner, name)
+            SELECT COALESCE(d.owner, ''), h.skill_name
+            FROM (SELECT DISTINCT skill_name FROM skills_history) h
+            LEFT JOIN skills_details d ON d.name = h.skill_name
+            WHERE NOT EXISTS (SELECT 1 FROM skills k WHERE k.name = h.skill_name)
+        """)
+
+        cursor.execute("ALTER TABLE skills_snapshot RENAME TO skills_snapshot_v0")
+        cursor.execute("ALTER TABLE skills_history RENAME TO skills_history_v0")
+
+        cursor.execute("""
+            CREATE TABLE skills_snapshot (
+                id INTEGER PRIMARY KEY,
+                snapshot_time TEXT NOT NULL,
+                date TEXT NOT NULL,
+                rank INTEGER NOT NULL,
+                skill_id INTEGER NOT NULL REFERENCES skills(id),
+                installs INTEGER NOT NULL,
+                installs_delta INTEGER DEFAULT 0,
+                installs_rate REAL DEFAULT 0,
+                rank_delta INTEGER DEFAULT 0,
+                UNIQUE(snapshot_time, skill_id)
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE skills_history (
+                id INTEGER PRIMARY KEY,
+                skill_id INTEGER NOT NULL REFERENCES skills(id),
+                date TEXT NOT NULL,
+                rank INTEGER NOT NULL,
+                installs INTEGER NOT NULL,
+                UNIQUE(skill_id, date)
+            )
+        """)
+
+        cursor.execute("""
+            INSERT OR REPLACE INTO skills_snapshot
+            (snapshot_time, date, rank, skill_id, installs, installs_delta, installs_rate, rank_delta)
+            SELECT s.snapshot_time, s.date, s.rank, k.id, s.installs, s.installs_delta, s.installs_rate, s.rank_delta
+            FROM skills_snapshot_v0 s
+            JOIN skills k ON k.owner = s.owner AND k.name = s.name
+            ORDER BY s.id
+        """)
+        # 同名技能有多个拥有者时，历史记录归到最早出现的那个
+        cursor.execute("""
+            INSERT OR REPLACE INTO skills_history (skill_id, date, rank, installs)
+            SELECT (SELECT MIN(k.id) FROM skills k WHERE k.name = h.skill_name), h.date, h.rank, h.installs
+            FROM skills_history_v0 h
+            ORDER BY h.id
+        """)
+
+        cursor.execute("DROP TABLE skills_snapshot_v0")
+        cursor.execute("DROP TABLE skills_history_v0")
+
+        cursor.execute("CREATE INDEX idx_snapshot_time ON skills_snapshot(snapshot_time)")
+        cursor.execute("CREATE INDEX idx_snapshot_date ON skills_snapshot(date)")
+        cursor.execute("CREATE INDEX idx_snapshot_skill ON skills_snapshot(skill_id)")
+        cursor.execute("CREATE INDEX idx_snapshot_rank ON skills_snapshot(snapshot_time, rank)")
+        cursor.execute("CREATE INDEX idx_history_date ON skills_history(date)")
+
+    def _migrate_snapshot_catalog(self, cursor: sqlite3.Cursor) -> None:
+        """
+        v2：新增 snapshots 目录表（每次快照一行：时间、日期、行数、内容指纹）
+
+        快照行只保存 snapshot_id，最新 / 上一次 / 按日期 / 快照列表都只查目录表的索引，
+        不再对 skills_snapshot 做 MAX / DISTINCT / GROUP BY
+        """
+        cursor.execute("""
+            CREATE TABLE snapshots (
+                id INTEGER PRIMARY KEY,
+                snapshot_time TEXT UNIQUE NOT NULL,
+                date TEXT NOT NULL,
+                row_count INTEGER NOT NULL DEFAULT 0,
+                content_hash TEXT
+            )
+        """)
+        cursor.execute("CREATE INDEX idx_snapshots_date ON snapshots(date, snapshot_time)")
+
+        cursor.execute("""
+            INSERT INTO snapshots (snapshot_time, date, row_count)
+            SELECT snapshot_time, MAX(date), COUNT(*)
+            FROM skills_snapshot
+            GROUP BY snapshot_time
+            ORDER BY snapshot_time
+        """)
+
+        # 已有快照按排名顺序补算内容指纹
+        hashes = []
+        current, digest = None, None
+        cursor.execute("""
+            SELECT s.snapshot_time, s.rank, k.owner, k.name, s.installs
+            FROM skills_snapshot s
+            JOIN skills k ON k.id = s.skill_id
+            ORDER BY s.snapshot_time, s.rank
+        """)
+        for row in cursor.fetchall():
+            if row["snapshot_time"] != current:
+                if digest is not None:
+                    hashes.append((digest.hexdigest(), current))
+                current, digest = row["snapshot_time"], hashlib.sha256()
+            _hash_snapshot_row(digest, tuple(row)[1:])
+        if digest is not None:
+            hashes.append((digest.hexdigest(), current))
+        cursor.executemany("UPDATE snapshots SET content_hash = ? WHERE snapshot_time = ?", hashes)
+
+        cursor.execute("ALTER TABLE skills_snapshot RENAME TO skills_snapshot_v1")
+        cursor.execute("""
+            CREATE TABLE skills_snapshot (
+                snapshot_id INTEGER NOT NULL REFERENCES snapshots(id),
+                skill_id INTEGER NOT NULL REFERENCES skills(id),
+                rank INTEGER NOT NULL,
+                installs INTEGER NOT NULL,
+                installs_delta INTEGER DEFAULT 0,
+                installs_rate REAL DEFAULT 0,
+                rank_delta INTEGER DEFAULT 0,
+                PRIMARY KEY (snapshot_id, skill_id)
+            ) WITHOUT ROWID
+        """)
+        cursor.execute("""
+            INSERT INTO skills_snapshot
+            (snapshot_id, skill_id, rank, installs, installs_delta, installs_rate, rank_delta)
+            SELECT p.id, s.skill_id, s.rank, s.installs, s.installs_delta, s.installs_rate, s.rank_delta
+            FROM skills_snapshot_v1 s
+            JOIN snapshots p ON p.snapshot_time = s.snapshot_time
+        """)
+        cursor.execute("DROP TABLE skills_snapshot_v1")
+
+        cursor.execute("CREATE INDEX idx_snapshot_rank ON skills_snapshot(snapshot_id, rank)")
+        cursor.execute("CREATE INDEX idx_snapshot_skill ON skills_snapshot(skill_id)")
+
+    def _migrate_history_rollup(self, cursor: sqlite3.Cursor) -> None:
+        """
+        v3：skills_history 改为由快照汇总的视图，快照不再重复写一份历史表
+
+        每个技能每天一行，取当天最后一次快照中的排名和安装量（与原来 INSERT OR REPLACE 的结果一致）
+        """
+        cursor.execute("""
+            SELECT COUNT(*) FROM skills_history h
+            WHERE NOT EXISTS (
+                SELECT 1 FROM skills_snapshot s
+                JOIN snapshots p ON p.id = s.snapshot_id
+                WHERE s.skill_id = h.skill_id AND p.date = h.date
+            )
+        """)
+        orphaned = cursor.fetchone()[0]
+        if orphaned:
+            print(f"⚠️ {orphaned} 条历史记录没有对应的快照，迁移后不再保留")
+
+        cursor.execute("DROP TABLE skills_history")
+        # 聚合查询中与 MAX() 同时选出的列取自 snapshot_time 最大的那一行（SQLite 的 bare column 语义）
+        cursor.execute("""
+            CREATE VIEW skills_history AS
+            SELECT s.skill_id, p.date, s.rank, s.installs, MAX(p.snapshot_time) AS snapshot_time
+            FROM skills_snapshot s
+            JOIN snapshots p ON p.id = s.snapshot_id
+            GROUP BY s.skill_id, p.date
+        """)
+
+    def _load_skill_ids(self, cursor: sqlite3.Cursor) -> Dict[Tuple[str, str], int]:
+        """读取 skills 维度表：{(owner, name): id}"""
+        cursor.execute("SELECT id, owner, name FROM skills")
+        return {(row["owner"], row["name"]): row["id"] for row in cursor.fetchall()}
+
+    def _intern_skills(self, cursor: sqlite3.Cursor, skill_ids: Dict[Tuple[str, str], int],
+                       skills: List[Dict]) -> List[int]:
+        """
+        把技能映射为 skills 表的整数 id，表中没有的先插入
+
+        Args:
+            cursor: 当前事务的游标
+            skill_ids: 已知的 {(owner, name): id}，新插入的 id 会补充进去
+            skills: 技能列表
+
+        Returns:
+            与 skills 一一对应的 id 列表
+        """
+        ids = []
+        for skill in skills:
+            key = (skill.get("owner"), skill.get("name"))
+            skill_id = skill_ids.get(key)
+            if skill_id is None:
+                cursor.execute("INSERT INTO skills (owner, name) VALUES (?, ?)", key)
+                skill_id = skill_ids[key] = cursor.lastrowid
+            ids.append(skill_id)
+        return ids
+
+    def save_snapshot(self, snapshot_time: str, date: str, skills: Iterable[Dict]) -> int:
         """
         保存快照数据
 
+        同一 snapshot_time 重复保存时整体替换该次快照
+
         Args:
             snapshot_time: 快照时间 YYYY-MM-DD HH:MM:SS
             date: 日期 YYYY-MM-DD
-            skills: 技能列表
+            skills: 技能列表，也可以是生成器（流式写入，不要求先汇总成列表）
+
+        Returns:
+            写入的记录数
         """
-        self.connect()
-        cursor = self.conn.cursor()
+        count = 0
+        digest = hashlib.sha256()
+
+        with self.transaction() as cursor:
+            snapshot_id = self._register_snapshot(cursor, snapshot_time, date)
+            skill_ids = self._load_skill_ids(cursor)
+            # 快照表按批 executemany，整个快照在一个事务中提交
+            for batch in _batched(skills, self.batch_size):
+                ids = self._intern_skills(cursor, skill_ids, batch)
+                cursor.executemany("""
+                    INSERT OR REPLACE INTO skills_snapshot
+                    (snapshot_id, skill_id, rank, installs, installs_delta, installs_rate, rank_delta)
+                    VALUES (?, ?, ?, ?, ?, ?, ?)
+                """, [
+                    (
+                        snapshot_id,
+                        skill_id,
+                        skill.get("rank"),
+                        skill.get("installs"),
+                        skill.get("installs_delta", 0),
+                        skill.get("installs_rate", 0),
+                        skill.get("rank_delta", 0)
+                    )
+                    for skill, skill_id in zip(batch, ids)
+                ])
+
+                for skill in batch:
+                    _hash_snapshot_row(digest, (skill.get("rank"), skill.get("owner"),
+                                                skill.get("name"), skill.get("installs")))
+                count += len(batch)
+
+            if count:
+                cursor.execute("""
+                    UPDATE snapshots
+                    SET row_count = (SELECT COUNT(*) FROM skills_snapshot WHERE snapshot_id = ?),
+                        content_hash = ?
+                    WHERE id = ?
+                """, (snapshot_id, digest.hexdigest(), snapshot_id))
+            else:
+                # 空快照不进入目录（与之前“没有行就没有快照”一致）
+                cursor.execute("DELETE FROM snapshots WHERE id = ?", (snapshot_id,))
+
+        print(f"✅ 保存快照数据: {count} 条记录 ({snapshot_time})")
+        return count
+
+    def _register_snapshot(self, cursor: sqlite3.Cursor, snapshot_time: str, date: str) -> int:
+        """在 snapshots 目录表中登记一次快照（已存在时清空旧行），返回 snapshot_id"""
+        cursor.execute("SELECT id FROM snapshots WHERE snapshot_time = ?", (snapshot_time,))
+        row = cursor.fetchone()
+        if row:
+            cursor.execute("DELETE FROM skills_snapshot WHERE snapshot_id = ?", (row["id"],))
+            cursor.execute("UPDATE snapshots SET date = ? WHERE id = ?", (date, row["id"]))
+            return row["id"]
 
-        for skill in skills:
-            cursor.execute("""
-                INSERT OR REPLACE INTO skills_snapshot
-                (snapshot_time, date, rank, name, owner, installs, installs_delta, installs_rate, rank_delta, url)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                snapshot_time,
-                date,
-                skill.get("rank"),
-                skill.get("name"),
-                skill.get("owner"),
-                skill.get("installs"),
-                skill.get("installs_delta", 0),
-                skill.get("installs_rate", 0),
-                skill.get("rank_delta", 0),
-                skill.get("url", "")
-            ))
+        cursor.execute("INSERT INTO snapshots (snapshot_time, date) VALUES (?, ?)", (snapshot_time, date))
+        return cursor.lastrowid
 
-            # 同时写入历史表
-            cursor.execute("""
-                INSERT OR REPLACE INTO skills_history
-                (skill_name, date, rank, installs)
-                VALUES (?, ?, ?, ?)
-            """, (
-                skill.get("name"),
-                date,
-                skill.get("rank"),
-                skill.get("installs")
-            ))
+    def _find_snapshot(self, cursor: sqlite3.Cursor, date: str = None,
+                       before_time: str = None) -> Optional[int]:
+        """
+        在 snapshots 目录表中查找快照（只走索引，与快照数量无关）
 
-        self.conn.commit()
-        print(f"✅ 保存快照数据: {len(skills)} 条记录 ({snapshot_time})")
+        Args:
+            cursor: 游标
+            date: 只查找该日期的快照
+            before_time: 只查找该时间之前的快照
+
+        Returns:
+            满足条件的最新一次快照的 id，不存在时返回 None
+        """
+        conditions, params = [], []
+        if date:
+            conditions.append("date = ?")
+            params.append(date)
+        if before_time:
+            conditions.append("snapshot_time < ?")
+            params.append(before_time)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        cursor.execute(f"""
+            SELECT id FROM snapshots
+            {where}
+            ORDER BY snapshot_time DESC
+            LIMIT 1
+        """, params)
+        row = cursor.fetchone()
+        return row["id"] if row else None
+
+    def _snapshot_rows(self, cursor: sqlite3.Cursor, snapshot_id: Optional[int]) -> List[Dict]:
+        """读取一次快照的全部技能，按排名排序"""
+        if snapshot_id is None:
+            return []
+
+        cursor.execute(f"""
+            SELECT {_SNAPSHOT_COLUMNS}
+            FROM skills_snapshot s
+            JOIN skills k ON k.id = s.skill_id
+            WHERE s.snapshot_id = ?
+            ORDER BY s.rank
+        """, (SKILLS_BASE_URL, snapshot_id))
+        return [dict(row) for row in cursor.fetchall()]
 
     # 兼容旧方法
     def save_today_data(self, date: str, skills: List[Dict]) -> None:
@@ -199,31 +711,9 @@ class Database:
         Returns:
             技能列表
         """
-        self.connect()
-        cursor = self.conn.cursor()
-
-        # 获取该日期最新的快照时间
-        cursor.execute("""
-            SELECT MAX(snapshot_time) as latest
-            FROM skills_snapshot
-            WHERE date = ?
-        """, (date,))
-
-        row = cursor.fetchone()
-        if not row or not row["latest"]:
-            return []
-
-        latest_time = row["latest"]
-
-        cursor.execute("""
-            SELECT rank, name, owner, installs, installs_delta, installs_rate, rank_delta, url
-            FROM skills_snapshot
-            WHERE snapshot_time = ?
-            ORDER BY rank
-        """, (latest_time,))
-
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        with self.reader() as conn:
+            cursor = conn.cursor()
+            return self._snapshot_rows(cursor, self._find_snapshot(cursor, date=date))
 
     def get_last_snapshot(self, before_time: str = None) -> List[Dict]:
         """
@@ -236,42 +726,9 @@ class Database:
         Returns:
             技能列表
         """
-        self.connect()
-        cursor = self.conn.cursor()
-
-        if before_time:
-            # 获取指定时间之前的最新快照
-            cursor.execute("""
-                SELECT DISTINCT snapshot_time
-                FROM skills_snapshot
-                WHERE snapshot_time < ?
-                ORDER BY snapshot_time DESC
-                LIMIT 1
-            """, (before_time,))
-        else:
-            # 获取最新的快照
-            cursor.execute("""
-                SELECT DISTINCT snapshot_time
-                FROM skills_snapshot
-                ORDER BY snapshot_time DESC
-                LIMIT 1
-            """)
-
-        row = cursor.fetchone()
-        if not row:
-            return []
-
-        snapshot_time = row["snapshot_time"]
-
-        cursor.execute("""
-            SELECT rank, name, owner, installs, installs_delta, installs_rate, rank_delta, url
-            FROM skills_snapshot
-            WHERE snapshot_time = ?
-            ORDER BY rank
-        """, (snapshot_time,))
-
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+        with self.reader() as conn:
+            cursor = conn.cursor()
+            return self._snapshot_rows(cursor, self._find_snapshot(cursor, before_time=before_time))
 
     def get_yesterday_data(self, date: str) -> List[Dict]:
         """
@@ -287,38 +744,70 @@ class Database:
         current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         return self.get_last_snapshot(before_time=current_time)
 
-    def save_skill_details(self, details: List[Dict]) -> None:
+    def save_skill_details(self, details: List[Dict], verbose: bool = True) -> None:
         """
         保存/更新技能详情
 
         Args:
-            details: AI 分析的技能详情列表
+            details: AI 分析的技能详情列表（content_hash 为分析输入的指纹，降级结果为 None；
+                     classifier_text 为本地预分类使用的文本，category_source 为分类来源 llm / preset / fallback）
+            verbose: 是否输出保存日志（逐条保存时由调用方汇总输出）
         """
-        self.connect()
-        cursor = self.conn.cursor()
-
-        for detail in details:
-            solves_json = json.dumps(detail.get("solves", []), ensure_ascii=False)
+        names = [detail.get("name") for detail in details]
+        self._invalidate_details(names)
 
-            cursor.execute("""
+        with self.transaction() as cursor:
+            self._executemany_batched(cursor, """
                 INSERT OR REPLACE INTO skills_details
-                (name, summary, description, use_case, solves, category, category_zh, rules_count, owner, url)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                (name, summary, description, use_case, solves, category, category_zh, rules_count, owner, url, content_hash,
+                 classifier_text, category_source)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
             """, (
-                detail.get("name"),
-                detail.get("summary"),
-                detail.get("description"),
-                detail.get("use_case"),
-                solves_json,
-                detail.get("category"),
-                detail.get("category_zh"),
-                detail.get("rules_count"),
-                detail.get("owner"),
-                detail.get("url")
+                (
+                    detail.get("name"),
+                    detail.get("summary"),
+                    detail.get("description"),
+                    detail.get("use_case"),
+                    json.dumps(detail.get("solves", []), ensure_ascii=False),
+                    detail.get("category"),
+                    detail.get("category_zh"),
+                    detail.get("rules_count"),
+                    detail.get("owner"),
+                    detail.get("url"),
+                    detail.get("content_hash"),
+                    detail.get("classifier_text"),
+                    detail.get("category_source")
+                )
+                for detail in details
             ))
 
-        self.conn.commit()
-        print(f"✅ 保存技能详情: {len(details)} 条记录")
+        # 提交后再失效一次：提交前开始的查询读到的是旧数据，不能回填缓存
+        self._invalidate_details(names)
+
+        if verbose:
+            print(f"✅ 保存技能详情: {len(details)} 条记录")
+
+    def save_classifier_texts(self, texts: Dict[str, str]) -> None:
+        """
+        补充已有分析的预分类训练文本（只更新 classifier_text 列）
+
+        Args:
+            texts: {技能名称: 用途说明 + 规则列表文本}
+        """
+        names = list(texts)
+        self._invalidate_details(names)
+        with self.transaction() as cursor:
+            self._executemany_batched(cursor, """
+                UPDATE skills_details SET classifier_text = ? WHERE name = ?
+            """, ((text, name) for name, text in texts.items()))
+        self._invalidate_details(names)
+
+    def _invalidate_details(self, names: List[str]) -> None:
+        """使技能详情缓存失效，并让进行中的查询不再回填缓存"""
+        with self._detail_cache_lock:
+            self._detail_cache_version += 1
+            for name in names:
+                self._detail_cache.pop(name, None)
 
     def get_skill_details(self, name: str) -> Optional[Dict]:
         """
@@ -330,23 +819,71 @@ class Database:
         Returns:
             技能详情字典，如果不存在返回 None
         """
-        self.connect()
-        cursor = self.conn.cursor()
+        return self.get_skill_details_many([name]).get(name)
 
-        cursor.execute("""
-            SELECT name, summary, description, use_case, solves, category, category_zh, rules_count, owner, url
-            FROM skills_details
-            WHERE name = ?
-        """, (name,))
+    def get_skill_details_many(self, names: Iterable[str]) -> Dict[str, Dict]:
+        """
+        批量获取技能详情（先查 LRU 缓存，未命中的每 _IN_CHUNK_SIZE 个名称一次 IN 查询）
 
-        row = cursor.fetchone()
-        if row:
-            result = dict(row)
-            # 解析 JSON 字段
-            if result.get("solves"):
-                result["solves"] = json.loads(result["solves"])
+        Args:
+            names: 技能名称
+
+        Returns:
+            {skill_name: detail_dict}，不存在的技能不出现在结果中
+        """
+        result: Dict[str, Dict] = {}
+        missing: List[str] = []
+
+        with self._detail_cache_lock:
+            version = self._detail_cache_version
+            for name in dict.fromkeys(names):
+                if name in self._detail_cache:
+                    self._detail_cache.move_to_end(name)
+                    self.detail_cache_stats["hits"] += 1
+                    detail = self._detail_cache[name]
+                    if detail is not None:
+                        result[name] = _copy_detail(detail)
+                else:
+                    self.detail_cache_stats["misses"] += 1
+                    missing.append(name)
+
+        if not missing:
             return result
-        return None
+
+        found: Dict[str, Dict] = {}
+        with self.reader() as conn:
+            cursor = conn.cursor()
+            for chunk in _batched(missing, _IN_CHUNK_SIZE):
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(f"""
+                    SELECT {_DETAIL_COLUMNS}
+                    FROM skills_details
+                    WHERE name IN ({placeholders})
+                """, chunk)
+                for row in cursor.fetchall():
+                    detail = _detail_from_row(row)
+                    found[detail["name"]] = detail
+
+        with self._detail_cache_lock:
+            # 查询期间有写入时不回填缓存，避免把旧数据放回去
+            cacheable = version == self._detail_cache_version
+            for name in missing:
+                detail = found.get(name)
+                if detail is not None:
+                    result[name] = _copy_detail(detail)
+                if cacheable:
+                    self._cache_detail(name, detail)
+
+        return result
+
+    def _cache_detail(self, name: str, detail: Optional[Dict]) -> None:
+        """放入 LRU 缓存，超出容量时淘汰最久未使用的条目（调用方持有 _detail_cache_lock）"""
+        if self.detail_cache_size <= 0:
+            return
+        self._detail_cache[name] = detail
+        self._detail_cache.move_to_end(name)
+        while len(self._detail_cache) > self.detail_cache_size:
+            self._detail_cache.popitem(last=False)
 
     def get_all_skill_details(self) -> Dict[str, Dict]:
         """
@@ -355,27 +892,100 @@ class Database:
         Returns:
             {skill_name: detail_dict} 的字典
         """
-        self.connect()
-        cursor = self.conn.cursor()
+        with self.reader() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("""
-            SELECT name, summary, description, use_case, solves, category, category_zh, rules_count, owner, url
-            FROM skills_details
-        """)
+            cursor.execute(f"""
+                SELECT {_DETAIL_COLUMNS}
+                FROM skills_details
+            """)
 
-        result = {}
-        for row in cursor.fetchall():
-            detail = dict(row)
-            if detail.get("solves"):
-                detail["solves"] = json.loads(detail["solves"])
-            result[detail["name"]] = detail
+            result = {}
+            for row in cursor.fetchall():
+                detail = _detail_from_row(row)
+                result[detail["name"]] = detail
 
-        return result
+            return result
+
+    def save_llm_usage(self, records: List[Dict]) -> None:
+        """
+        保存 Claude 调用用量
+
+        Args:
+            records: 每次请求一条的用量记录（ClaudeSummarizer.usage_records）
+        """
+        if not records:
+            return
+
+        with self.transaction() as cursor:
+            self._executemany_batched(cursor, """
+                INSERT INTO llm_usage
+                (run_time, model, chunk_index, chunk_count, attempt, skills, estimated_input_tokens,
+                 input_tokens, output_tokens, cache_read_tokens, cache_creation_tokens, prompt_cache,
+                 max_tokens, latency_ms, first_token_ms, streaming, status)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                (
+                    record.get("run_time"),
+                    record.get("model"),
+                    record.get("chunk_index"),
+                    record.get("chunk_count"),
+                    record.get("attempt"),
+                    record.get("skills"),
+                    record.get("estimated_input_tokens"),
+                    record.get("input_tokens"),
+                    record.get("output_tokens"),
+                    record.get("cache_read_tokens"),
+                    record.get("cache_creation_tokens"),
+                    1 if record.get("prompt_cache") else 0,
+                    record.get("max_tokens"),
+                    record.get("latency_ms"),
+                    record.get("first_token_ms"),
+                    1 if record.get("streaming") else 0,
+                    record.get("status", "ok")
+                )
+                for record in records
+            ))
+
+    def get_llm_usage(self, limit: int = 30) -> List[Dict]:
+        """
+        按运行汇总 Claude 调用用量
+
+        Args:
+            limit: 返回的最大运行次数
+
+        Returns:
+            每次运行一条，包含请求数、失败数、输入/输出/缓存 token、总耗时，按时间降序
+        """
+        with self.reader() as conn:
+            cursor = conn.cursor()
+
+            cursor.execute("""
+                SELECT run_time, model,
+                       COUNT(*) as requests,
+                       SUM(CASE WHEN status = 'ok' THEN 0 ELSE 1 END) as failed,
+                       SUM(skills) as skills,
+                       SUM(estimated_input_tokens) as estimated_input_tokens,
+                       SUM(input_tokens) as input_tokens,
+                       SUM(output_tokens) as output_tokens,
+                       SUM(cache_read_tokens) as cache_read_tokens,
+                       SUM(cache_creation_tokens) as cache_creation_tokens,
+                       SUM(latency_ms) as latency_ms,
+                       AVG(first_token_ms) as avg_first_token_ms
+                FROM llm_usage
+                GROUP BY run_time, model
+                ORDER BY run_time DESC
+                LIMIT ?
+            """, (limit,))
+
+            return [dict(row) for row in cursor.fetchall()]
 
     def cleanup_old_data(self, days: int = None) -> int:
         """
         清理过期数据
 
+        开启归档时，先把过期快照按天汇总（当天最后一次快照）写入长期归档，归档失败则不删除
+
         Args:
             days: 保留天数，默认使用配置中的值
 
@@ -385,27 +995,29 @@ class Database:
         retention_days = days or DB_RETENTION_DAYS
         cutoff_date = (datetime.now() - timedelta(days=retention_days)).strftime("%Y-%m-%d")
 
-        self.connect()
-        cursor = self.conn.cursor()
-
-        # 清理快照数据
-        cursor.execute("""
-            DELETE FROM skills_snapshot
-            WHERE date < ?
-        """, (cutoff_date,))
-
-        deleted_snapshot = cursor.rowcount
-
-        # 清理历史数据
-        cursor.execute("""
-            DELETE FROM skills_history
-            WHERE date < ?
-        """, (cutoff_date,))
+        with self.transaction() as cursor:
+            if self.archive is not None:
+                cursor.execute("""
+                    SELECT s.skill_id, p.date, s.rank, s.installs, MAX(p.snapshot_time) AS snapshot_time
+                    FROM snapshots p
+                    JOIN skills_snapshot s ON s.snapshot_id = p.id
+                    WHERE p.date < ?
+                    GROUP BY s.skill_id, p.date
+                """, (cutoff_date,))
+                archived = self.archive.append(row[:4] for row in cursor)
+                if archived > 0:
+                    print(f"📦 归档过期数据: {archived} 条每日记录 → {self.archive.archive_dir}")
+
+            # 清理快照数据（目录表按日期索引找到过期快照）
+            cursor.execute("""
+                DELETE FROM skills_snapshot
+                WHERE snapshot_id IN (SELECT id FROM snapshots WHERE date < ?)
+            """, (cutoff_date,))
 
-        deleted_history = cursor.rowcount
+            total_deleted = cursor.rowcount
 
-        self.conn.commit()
-        total_deleted = deleted_snapshot + deleted_history
+            # 历史趋势由快照汇总，随快照一起清理
+            cursor.execute("DELETE FROM snapshots WHERE date < ?", (cutoff_date,))
 
         if total_deleted > 0:
             print(f"🗑️ 清理过期数据: {total_deleted} 条记录 (早于 {cutoff_date})")
@@ -423,19 +1035,83 @@ class Database:
         Returns:
             历史数据列表，按日期升序排列
         """
-        self.connect()
-        cursor = self.conn.cursor()
+        return self.get_skills_history_many([name], days).get(name, [])
 
-        cutoff_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+    def get_skills_history_many(self, names: Iterable[str], days: int = 7) -> Dict[str, List[Dict]]:
+        """
+        批量获取多个技能的历史趋势（每 _IN_CHUNK_SIZE 个名称一次查询）
 
-        cursor.execute("""
-            SELECT date, rank, installs
-            FROM skills_history
-            WHERE skill_name = ? AND date >= ?
-            ORDER BY date ASC
-        """, (name, cutoff_date))
+        每个技能每天一条，取当天最后一次快照中的排名和安装量
 
-        return [dict(row) for row in cursor.fetchall()]
+        Args:
+            names: 技能名称
+            days: 查询天数
+
+        Returns:
+            {skill_name: 历史数据列表}，列表按日期升序排列；没有历史的技能不出现在结果中
+        """
+        with self.reader() as conn:
+            cursor = conn.cursor()
+
+            cutoff_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+            history: Dict[str, List[Dict]] = {}
+
+            for chunk in _batched(dict.fromkeys(names), _IN_CHUNK_SIZE):
+                placeholders = ", ".join("?" * len(chunk))
+                cursor.execute(f"""
+                    SELECT k.name, p.date, s.rank, s.installs, MAX(p.snapshot_time) AS snapshot_time
+                    FROM skills k
+                    JOIN skills_snapshot s ON s.skill_id = k.id
+                    JOIN snapshots p ON p.id = s.snapshot_id
+                    WHERE k.name IN ({placeholders}) AND p.date >= ?
+                    GROUP BY k.name, p.date
+                    ORDER BY p.date ASC
+                """, (*chunk, cutoff_date))
+
+                for row in cursor.fetchall():
+                    history.setdefault(row["name"], []).append(
+                        {"date": row["date"], "rank": row["rank"], "installs": row["installs"]}
+                    )
+
+            return history
+
+    def get_archived_matrix(self, start_date: str, end_date: str,
+                            names: Iterable[str] = None) -> Dict:
+        """
+        从长期归档读取 技能 × 天数 的排名和安装量矩阵
+
+        Args:
+            start_date: 开始日期（含），YYYY-MM-DD
+            end_date: 结束日期（含），YYYY-MM-DD
+            names: 技能名称列表，默认为范围内归档过的全部技能
+
+        Returns:
+            SnapshotArchive.matrix 的结果，另加 "names"（与行对应的技能名称）
+        """
+        archive = self.archive or SnapshotArchive()
+        with self.reader() as conn:
+            cursor = conn.cursor()
+
+            skill_ids = None
+            if names is not None:
+                skill_ids = []
+                for chunk in _batched(dict.fromkeys(names), _IN_CHUNK_SIZE):
+                    cursor.execute(f"""
+                        SELECT id FROM skills WHERE name IN ({", ".join("?" * len(chunk))}) ORDER BY id
+                    """, chunk)
+                    skill_ids.extend(row["id"] for row in cursor.fetchall())
+
+            result = archive.matrix(start_date, end_date, skill_ids)
+
+            id_to_name = {}
+            for chunk in _batched(result["skill_ids"].tolist(), _IN_CHUNK_SIZE):
+                cursor.execute(f"""
+                    SELECT id, name FROM skills WHERE id IN ({", ".join("?" * len(chunk))})
+                """, chunk)
+                id_to_name.update((row["id"], row["name"]) for row in cursor.fetchall())
+
+        result["names"] = [id_to_name.get(skill_id) for skill_id in result["skill_ids"].tolist()]
+        return result
 
     def get_available_dates(self, limit: int = 30) -> List[str]:
         """
@@ -447,17 +1123,17 @@ class Database:
         Returns:
             日期列表，按降序排列（最新的在前）
         """
-        self.connect()
-        cursor = self.conn.cursor()
+        with self.reader() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("""
-            SELECT DISTINCT date
-            FROM skills_snapshot
-            ORDER BY date DESC
-            LIMIT ?
-        """, (limit,))
+            cursor.execute("""
+                SELECT DISTINCT date
+                FROM snapshots
+                ORDER BY date DESC
+                LIMIT ?
+            """, (limit,))
 
-        return [row["date"] for row in cursor.fetchall()]
+            return [row["date"] for row in cursor.fetchall()]
 
     def get_available_snapshots(self, limit: int = 50) -> List[Dict]:
         """
@@ -467,20 +1143,19 @@ class Database:
             limit: 返回的最大快照数
 
         Returns:
-            快照列表，包含 snapshot_time 和 date
+            快照列表，包含 snapshot_time、date、skill_count 和 content_hash
         """
-        self.connect()
-        cursor = self.conn.cursor()
+        with self.reader() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("""
-            SELECT DISTINCT snapshot_time, date, COUNT(*) as skill_count
-            FROM skills_snapshot
-            GROUP BY snapshot_time
-            ORDER BY snapshot_time DESC
-            LIMIT ?
-        """, (limit,))
+            cursor.execute("""
+                SELECT snapshot_time, date, row_count as skill_count, content_hash
+                FROM snapshots
+                ORDER BY snapshot_time DESC
+                LIMIT ?
+            """, (limit,))
 
-        return [dict(row) for row in cursor.fetchall()]
+            return [dict(row) for row in cursor.fetchall()]
 
     def get_category_stats(self, date: str) -> List[Dict]:
         """
@@ -492,32 +1167,25 @@ class Database:
         Returns:
             分类统计列表
         """
-        self.connect()
-        cursor = self.conn.cursor()
-
-        # 获取该日期最新快照时间
-        cursor.execute("""
-            SELECT MAX(snapshot_time) as latest
-            FROM skills_snapshot
-            WHERE date = ?
-        """, (date,))
-
-        row = cursor.fetchone()
-        if not row or not row["latest"]:
-            return []
+        with self.reader() as conn:
+            cursor = conn.cursor()
 
-        latest_time = row["latest"]
+            # 获取该日期最新快照
+            snapshot_id = self._find_snapshot(cursor, date=date)
+            if snapshot_id is None:
+                return []
 
-        cursor.execute("""
-            SELECT d.category, d.category_zh, COUNT(*) as count
-            FROM skills_snapshot s
-            LEFT JOIN skills_details d ON s.name = d.name
-            WHERE s.snapshot_time = ?
-            GROUP BY d.category
-            ORDER BY count DESC
-        """, (latest_time,))
+            cursor.execute("""
+                SELECT d.category, d.category_zh, COUNT(*) as count
+                FROM skills_snapshot s
+                JOIN skills k ON k.id = s.skill_id
+                LEFT JOIN skills_details d ON d.name = k.name
+                WHERE s.snapshot_id = ?
+                GROUP BY d.category
+                ORDER BY count DESC
+            """, (snapshot_id,))
 
-        return [dict(row) for row in cursor.fetchall()]
+            return [dict(row) for row in cursor.fetchall()]
 
     def get_top_movers(self, date: str, limit: int = 5) -> Dict[str, List[Dict]]:
         """
@@ -530,47 +1198,41 @@ class Database:
         Returns:
             {"rising": [...], "falling": [...]}
         """
-        self.connect()
-        cursor = self.conn.cursor()
-
-        # 获取该日期最新快照时间
-        cursor.execute("""
-            SELECT MAX(snapshot_time) as latest
-            FROM skills_snapshot
-            WHERE date = ?
-        """, (date,))
-
-        row = cursor.fetchone()
-        if not row or not row["latest"]:
-            return {"rising": [], "falling": []}
-
-        latest_time = row["latest"]
-
-        # 上升最多
-        cursor.execute("""
-            SELECT s.name, s.rank, s.rank_delta, d.summary, d.category
-            FROM skills_snapshot s
-            LEFT JOIN skills_details d ON s.name = d.name
-            WHERE s.snapshot_time = ? AND s.rank_delta > 0
-            ORDER BY s.rank_delta DESC, s.rank ASC
-            LIMIT ?
-        """, (latest_time, limit))
+        with self.reader() as conn:
+            cursor = conn.cursor()
 
-        rising = [dict(row) for row in cursor.fetchall()]
+            # 获取该日期最新快照
+            snapshot_id = self._find_snapshot(cursor, date=date)
+            if snapshot_id is None:
+                return {"rising": [], "falling": []}
 
-        # 下降最多
-        cursor.execute("""
-            SELECT s.name, s.rank, s.rank_delta, d.summary, d.category
-            FROM skills_snapshot s
-            LEFT JOIN skills_details d ON s.name = d.name
-            WHERE s.snapshot_time = ? AND s.rank_delta < 0
-            ORDER BY s.rank_delta ASC, s.rank ASC
-            LIMIT ?
-        """, (latest_time, limit))
-
-        falling = [dict(row) for row in cursor.fetchall()]
-
-        return {"rising": rising, "falling": falling}
+            # 上升最多
+            cursor.execute("""
+                SELECT k.name, s.rank, s.rank_delta, d.summary, d.category
+                FROM skills_snapshot s
+                JOIN skills k ON k.id = s.skill_id
+                LEFT JOIN skills_details d ON d.name = k.name
+                WHERE s.snapshot_id = ? AND s.rank_delta > 0
+                ORDER BY s.rank_delta DESC, s.rank ASC
+                LIMIT ?
+            """, (snapshot_id, limit))
+
+            rising = [dict(row) for row in cursor.fetchall()]
+
+            # 下降最多
+            cursor.execute("""
+                SELECT k.name, s.rank, s.rank_delta, d.summary, d.category
+                FROM skills_snapshot s
+                JOIN skills k ON k.id = s.skill_id
+                LEFT JOIN skills_details d ON d.name = k.name
+                WHERE s.snapshot_id = ? AND s.rank_delta < 0
+                ORDER BY s.rank_delta ASC, s.rank ASC
+                LIMIT ?
+            """, (snapshot_id, limit))
+
+            falling = [dict(row) for row in cursor.fetchall()]
+
+            return {"rising": rising, "falling": falling}
 
 
 def get_database() -> Database:
@@ -3,38 +3,69 @@ Detail Fetcher - 抓取技能详情页
 """
 import re
 import time
-from typing import Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 from bs4 import BeautifulSoup
+from lxml import etree
 import requests
 
-from src.config import FETCH_REQUEST_DELAY, SKILLS_BASE_URL
+from src.browser_pool import BrowserPool, get_browser_pool
+from src.rate_limiter import TokenBucket
+from src.http_cache import DetailCache
+from src.detail_parser import parse_detail_html
+from src.raw_html_store import RawHtmlStore
+from src.config import (
+    FETCH_REQUEST_DELAY,
+    FETCH_CONCURRENCY,
+    FETCH_RATE_LIMIT,
+    SKILLS_BASE_URL,
+    DETAIL_CACHE_ENABLED,
+    DETAIL_PARSER,
+    KEEP_RAW_HTML,
+)
 
 
 class DetailFetcher:
     """抓取技能详情页"""
 
-    def __init__(self, timeout: int = 30, delay: float = None):
+    def __init__(self, timeout: int = 30, delay: float = None,
+                 concurrency: int = None, rate_limit: float = None,
+                 cache: DetailCache = None, parser: str = None,
+                 raw_store: RawHtmlStore = None):
         """
         初始化
 
         Args:
             timeout: 请求超时时间（秒）
-            delay: 请求间隔（秒），默认使用配置中的值
+            delay: 串行模式下的请求间隔（秒），默认使用配置中的值
+            concurrency: 并发数，1 表示串行，默认使用配置中的值
+            rate_limit: 并发模式下每秒最多请求数，默认使用配置中的值
+            cache: 条件请求缓存，默认按配置启用
+            parser: 详情页解析后端，lxml（XPath）或 bs4（BeautifulSoup），默认使用配置中的值
+            raw_store: 原始 HTML 存储，默认按配置启用（KEEP_RAW_HTML）
         """
         self.base_url = SKILLS_BASE_URL
         self.timeout = timeout
         self.delay = delay if delay is not None else FETCH_REQUEST_DELAY
+        self.concurrency = max(1, concurrency if concurrency is not None else FETCH_CONCURRENCY)
+        self.rate_limit = rate_limit if rate_limit is not None else FETCH_RATE_LIMIT
+        self.cache = cache if cache is not None else (DetailCache() if DETAIL_CACHE_ENABLED else None)
+        self.parser = (parser or DETAIL_PARSER).lower()
+        self.raw_store = raw_store if raw_store is not None else (RawHtmlStore() if KEEP_RAW_HTML else None)
         self.session = requests.Session()
         self.session.headers.update({
             "User-Agent": "Mozilla/5.0 (compatible; SkillsTrendingBot/1.0)"
         })
 
-    def fetch_top20_details(self, skills: List[Dict]) -> List[Dict]:
+    def fetch_top20_details(self, skills: List[Dict],
+                            on_detail: Callable[[Dict], None] = None) -> List[Dict]:
         """
         批量抓取 Top 20 详情
 
         Args:
             skills: Top 20 技能列表
+            on_detail: 每抓取完一个详情就调用一次（按完成顺序，在调用线程中执行），
+                       用于边抓取边处理（见 src/pipeline.py）
 
         Returns:
             [
@@ -42,54 +73,124 @@ class DetailFetcher:
                     "name": "remotion-best-practices",
                     "owner": "remotion-dev/skills",
                     "url": "...",
-                    "html_content": "<html>...</html>",
                     "when_to_use": "Use this skills whenever...",
                     "rules": [
                         {"file": "3d.md", "desc": "3D content in Remotion..."},
                         ...
                     ],
-                    "rules_count": 27
+                    "rules_count": 27,
+                    "latency": 0.412,
+                    "parse_ms": 3.1
                 },
                 ...
             ]
         """
-        results = []
         top_n = min(20, len(skills))
-
-        print(f"📥 开始抓取 Top {top_n} 详情...")
-
-        for i, skill in enumerate(skills[:top_n], 1):
-            url = skill.get("url", "")
-            if not url:
-                # 尝试构建 URL
-                name = skill.get("name", "")
-                owner = skill.get("owner", "")
-                url = f"{self.base_url}/{owner}/{name}"
-
-            print(f"  [{i}/{top_n}] 抓取: {skill.get('name')}")
-
-            detail = self.fetch_detail_page(url, skill)
-            if detail:
-                results.append(detail)
-            else:
-                # 即使失败也保留基本信息
-                results.append({
-                    "name": skill.get("name"),
-                    "owner": skill.get("owner"),
-                    "url": url,
-                    "when_to_use": "",
-                    "rules": [],
-                    "rules_count": 0,
-                    "error": "Failed to fetch details"
-                })
-
-            # 限速
-            if i < top_n:
-                time.sleep(self.delay)
-
-        print(f"✅ 成功抓取 {len(results)} 个技能详情")
+        targets = skills[:top_n]
+
+        if self.concurrency > 1:
+            print(f"📥 开始抓取 Top {top_n} 详情 (并发 {self.concurrency}, 限速 {self.rate_limit}/s)...")
+        else:
+            print(f"📥 开始抓取 Top {top_n} 详情...")
+
+        # 按完成顺序回调，返回值保持输入顺序
+        ordered: Dict[int, Dict] = {}
+        for index, detail in self.iter_details(targets):
+            ordered[index] = detail
+            if on_detail:
+                on_detail(detail)
+        results = [ordered[i] for i in sorted(ordered)]
+
+        latencies = [r["latency"] for r in results]
+        if latencies:
+            print(f"✅ 成功抓取 {len(results)} 个技能详情 "
+                  f"(平均延迟 {sum(latencies) / len(latencies):.2f}s, 最大 {max(latencies):.2f}s)")
+        else:
+            print(f"✅ 成功抓取 {len(results)} 个技能详情")
+        parse_times = [r["parse_ms"] for r in results if "parse_ms" in r]
+        if parse_times:
+            print(f"  解析 ({self.parser}): 平均 {sum(parse_times) / len(parse_times):.1f}ms, "
+                  f"最大 {max(parse_times):.1f}ms")
+        if self.cache:
+            print(f"  缓存: {self.cache.format_stats()}")
+        if self.raw_store:
+            print(f"  原始 HTML: {self.raw_store.format_stats()}")
         return results
 
+    def iter_details(self, skills: List[Dict]) -> Iterator[Tuple[int, Dict]]:
+        """
+        逐个产出抓取完成的详情（按完成顺序）
+
+        并发模式：线程池限制并发数，令牌桶限制请求速率；串行模式：按 delay 间隔依次请求
+
+        Args:
+            skills: 技能列表
+
+        Yields:
+            (输入序号（从 1 开始）, 详情字典)
+        """
+        total = len(skills)
+
+        if self.concurrency <= 1:
+            for i, skill in enumerate(skills, 1):
+                yield i, self._fetch_one(skill, i, total)
+
+                # 限速
+                if i < total:
+                    time.sleep(self.delay)
+            return
+
+        bucket = TokenBucket(self.rate_limit, capacity=self.concurrency)
+
+        def task(i: int, skill: Dict) -> Dict:
+            bucket.acquire()
+            return self._fetch_one(skill, i, total)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {executor.submit(task, i, skill): i for i, skill in enumerate(skills, 1)}
+            for future in as_completed(futures):
+                yield futures[future], future.result()
+
+    def _fetch_one(self, skill: Dict, index: int, total: int) -> Dict:
+        """
+        抓取单个技能详情，失败时保留基本信息
+
+        Args:
+            skill: 技能基本信息
+            index: 序号（用于日志）
+            total: 总数（用于日志）
+
+        Returns:
+            详情字典，包含本次请求耗时 latency（秒）
+        """
+        url = skill.get("url", "")
+        if not url:
+            # 尝试构建 URL
+            name = skill.get("name", "")
+            owner = skill.get("owner", "")
+            url = f"{self.base_url}/{owner}/{name}"
+
+        print(f"  [{index}/{total}] 抓取: {skill.get('name')}")
+
+        started = time.perf_counter()
+        detail = self.fetch_detail_page(url, skill)
+        latency = round(time.perf_counter() - started, 3)
+
+        if not detail:
+            # 即使失败也保留基本信息
+            detail = {
+                "name": skill.get("name"),
+                "owner": skill.get("owner"),
+                "url": url,
+                "when_to_use": "",
+                "rules": [],
+                "rules_count": 0,
+                "error": "Failed to fetch details"
+            }
+
+        detail["latency"] = latency
+        return detail
+
     def fetch_detail_page(self, url: str, skill_info: Dict = None) -> Optional[Dict]:
         """
         获取单个技能详情
@@ -105,13 +206,33 @@ class DetailFetcher:
             skill_info = {}
 
         try:
-            response = self.session.get(url, timeout=self.timeout)
+            entry = self.cache.get(url) if self.cache else None
+            headers = self.cache.conditional_headers(entry) if self.cache else {}
+
+            response = self.session.get(url, timeout=self.timeout, headers=headers)
+
+            # 304：页面未变化，直接复用缓存的解析结果
+            if entry and response.status_code == 304:
+                self.cache.record_hit()
+                return self._detail_from_cache(entry, url, skill_info)
+
             response.raise_for_status()
 
             html_content = response.text
 
             # 解析页面
             detail = self.parse_detail_page(html_content, url, skill_info)
+            self._keep_raw_html(url, html_content)
+
+            if self.cache:
+                self.cache.record_miss()
+                self.cache.put(
+                    url,
+                    response.headers.get("ETag"),
+                    response.headers.get("Last-Modified"),
+                    {"when_to_use": detail["when_to_use"], "rules": detail["rules"]}
+                )
+
             return detail
 
         except requests.RequestException as e:
@@ -121,6 +242,84 @@ class DetailFetcher:
             print(f"    ⚠️ 解析失败: {e}")
             return None
 
+    def _keep_raw_html(self, url: str, html_content: str) -> None:
+        """开启原始 HTML 存储时写入磁盘（详情字典中不再携带 HTML）"""
+        if not self.raw_store:
+            return
+        try:
+            self.raw_store.put(url, html_content)
+        except OSError as e:
+            print(f"    ⚠️ 原始 HTML 保存失败: {e}")
+
+    def get_raw_html(self, url: str) -> Optional[str]:
+        """
+        按 URL 读取保存的原始 HTML（用于排查解析问题）
+
+        Args:
+            url: 技能详情页 URL
+
+        Returns:
+            页面 HTML；未开启 KEEP_RAW_HTML 或未保存过该页面时返回 None
+        """
+        if not self.raw_store:
+            return None
+        return self.raw_store.get(url)
+
+    def _detail_from_cache(self, entry: Dict, url: str, skill_info: Dict) -> Dict:
+        """
+        用缓存的解析结果构建详情（不再解析 HTML）
+
+        Args:
+            entry: 缓存条目
+            url: 页面 URL
+            skill_info: 技能基本信息
+
+        Returns:
+            技能详情字典
+        """
+        parsed = entry.get("parsed", {})
+        rules = parsed.get("rules", [])
+
+        return {
+            "name": skill_info.get("name") or url.strip("/").split("/")[-1],
+            "owner": skill_info.get("owner", "unknown"),
+            "url": url,
+            "when_to_use": parsed.get("when_to_use", ""),
+            "rules": rules,
+            "rules_count": len(rules),
+            "cached": True
+        }
+
+    def fetch_detail_page_rendered(self, url: str, skill_info: Dict = None,
+                                   pool: BrowserPool = None) -> Optional[Dict]:
+        """
+        使用共享浏览器池渲染并获取技能详情（用于需要 JS 渲染的详情页）
+
+        Args:
+            url: 技能详情页 URL
+            skill_info: 技能基本信息
+            pool: 浏览器池，默认使用进程级共享池
+
+        Returns:
+            技能详情字典或 None
+        """
+        pool = pool or get_browser_pool()
+
+        try:
+            html_content = pool.run(self._render_page_async(url, pool))
+            detail = self.parse_detail_page(html_content, url, skill_info or {})
+            self._keep_raw_html(url, html_content)
+            return detail
+        except Exception as e:
+            print(f"    ⚠️ 渲染失败: {e}")
+            return None
+
+    async def _render_page_async(self, url: str, pool: BrowserPool) -> str:
+        """在浏览器池中打开页面并返回渲染后的 HTML"""
+        async with pool.page() as page:
+            await page.goto(url, wait_until="networkidle", timeout=self.timeout * 1000)
+            return await page.content()
+
     def parse_detail_page(self, html_content: str, url: str, skill_info: Dict) -> Dict:
         """
         解析技能详情页
@@ -131,20 +330,20 @@ class DetailFetcher:
             skill_info: 技能基本信息
 
         Returns:
-            技能详情字典
+            技能详情字典，包含本页解析耗时 parse_ms（毫秒）
         """
-        soup = BeautifulSoup(html_content, "lxml")
+        started = time.perf_counter()
 
-        # 提取 "When to use" 部分
-        when_to_use = self._extract_when_to_use(soup)
+        if self.parser == "bs4":
+            when_to_use, rules, name = self._parse_with_bs4(html_content, url, skill_info)
+        else:
+            try:
+                when_to_use, rules, name = self._parse_with_lxml(html_content, url, skill_info)
+            except (ValueError, etree.ParserError):
+                # lxml 无法建树的页面（如空文档）改用 BeautifulSoup，不丢失该页
+                when_to_use, rules, name = self._parse_with_bs4(html_content, url, skill_info)
 
-        # 提取规则列表
-        rules = self._extract_rules(soup)
-
-        # 提取技能名称（如果未提供）
-        name = skill_info.get("name")
-        if not name:
-            name = self._extract_name_from_soup(soup, url)
+        parse_ms = round((time.perf_counter() - started) * 1000, 2)
 
         # 提取拥有者
         owner = skill_info.get("owner", "unknown")
@@ -153,12 +352,50 @@ class DetailFetcher:
             "name": name,
             "owner": owner,
             "url": url,
-            "html_content": html_content,
             "when_to_use": when_to_use,
             "rules": rules,
-            "rules_count": len(rules)
+            "rules_count": len(rules),
+            "parse_ms": parse_ms
         }
 
+    def _parse_with_lxml(self, html_content: str, url: str, skill_info: Dict) -> tuple:
+        """
+        lxml/XPath 后端：建一次树，只读取相关节点
+
+        Returns:
+            (when_to_use, rules, name)
+        """
+        parsed = parse_detail_html(html_content)
+
+        name = skill_info.get("name")
+        if not name:
+            name = self._extract_name(url, parsed["title"])
+
+        return parsed["when_to_use"], parsed["rules"], name
+
+    def _parse_with_bs4(self, html_content: str, url: str, skill_info: Dict) -> tuple:
+        """
+        BeautifulSoup 后端（原实现，保留用于对照）
+
+        Returns:
+            (when_to_use, rules, name)
+        """
+        soup = BeautifulSoup(html_content, "lxml")
+
+        # 提取 "When to use" 部分
+        when_to_use = self._extract_when_to_use(soup)
+
+        # 提取规则列表
+        rules = self._extract_rules(soup)
+
+        # 提取技能名称（如果未提供）
+        name = skill_info.get("name")
+        if not name:
+            title = soup.find("title")
+            name = self._extract_name(url, title.get_text() if title else None)
+
+        return when_to_use, rules, name
+
     def _extract_when_to_use(self, soup: BeautifulSoup) -> str:
         """
         提取 "When to use" 部分
@@ -248,13 +485,13 @@ class DetailFetcher:
 
         return rules
 
-    def _extract_name_from_soup(self, soup: BeautifulSoup, url: str) -> str:
+    def _extract_name(self, url: str, title: Optional[str]) -> str:
         """
-        从 URL 或页面中提取技能名称
+        从 URL 或页面标题中提取技能名称
 
         Args:
-            soup: BeautifulSoup 对象
             url: 页面 URL
+            title: 页面标题
 
         Returns:
             技能名称
@@ -265,12 +502,9 @@ class DetailFetcher:
             return parts[-1]
 
         # 从页面标题提取
-        title = soup.find("title")
         if title:
-            title_text = title.get_text()
             # 通常格式是 "skill-name by owner"
-            name = title_text.split(" by ")[0].strip()
-            return name
+            return title.split(" by ")[0].strip()
 
         return "unknown"
 
@@ -0,0 +1,152 @@
+"""
+Detail Parser - 基于 lxml/XPath 的技能详情页解析
+每个页面只建一次树，只读取 "When to use" 段落和规则列表所在的节点
+（提取结果与 BeautifulSoup 版本保持一致）
+"""
+import re
+from typing import Dict, List
+
+import lxml.html
+from lxml import etree
+
+
+# 与 BeautifulSoup 的 get_text() 一致：不包含 script / style / template 中的文本
+TEXT_XPATH = etree.XPath(".//text()[not(ancestor::script or ancestor::style or ancestor::template)]")
+
+# "When to use" 标题，按优先级依次尝试
+WHEN_TO_USE_XPATHS = [
+    etree.XPath("//h2[@id='when-to-use']"),
+    etree.XPath("//*[@id='when-to-use']"),
+    etree.XPath("//h2[contains(., 'When to use')]"),
+    etree.XPath("//h2[contains(., 'When to Use')]"),
+]
+NEXT_SIBLING_XPATH = etree.XPath("following-sibling::*[1]")
+
+# 规则列表：至少 3 个直接 li 子元素才认为是规则列表（在 XPath 中直接过滤）
+RULE_LIST_XPATHS = [
+    etree.XPath("//ul[count(li) >= 3]"),
+    etree.XPath("//ol[count(li) >= 3]"),
+    etree.XPath("//*[contains(@class, 'rules')][count(li) >= 3]"),
+    etree.XPath("//*[contains(@class, 'list')][count(li) >= 3]"),
+]
+FIRST_LINK_XPATH = etree.XPath("(.//a[@href])[1]")
+
+WHEN_TO_USE_RE = re.compile(r'When to use\s*\n\s*(.+?)(?:\n\s*##|\n\s*###|\Z)', re.DOTALL | re.IGNORECASE)
+RULE_FILE_RE = re.compile(r'rules/([a-z0-9_-]+)\.md')
+
+# 文档开头的 XML 声明：lxml 不接受带 encoding 声明的 str，文本已解码，直接去掉即可
+XML_DECLARATION_RE = re.compile(r'^\s*<\?xml[^>]*\?>', re.IGNORECASE)
+
+
+def parse_detail_html(html_content: str) -> Dict:
+    """
+    解析详情页 HTML
+
+    Args:
+        html_content: 页面 HTML
+
+    Returns:
+        {"when_to_use": "...", "rules": [...], "title": "..." 或 None}
+    """
+    if not html_content or not html_content.strip():
+        return {"when_to_use": "", "rules": extract_rules(None, html_content or ""), "title": None}
+
+    try:
+        root = lxml.html.document_fromstring(html_content)
+    except ValueError:
+        # "Unicode strings with encoding declaration are not supported"
+        root = lxml.html.document_fromstring(XML_DECLARATION_RE.sub("", html_content, count=1))
+
+    return {
+        "when_to_use": extract_when_to_use(root),
+        "rules": extract_rules(root, html_content),
+        "title": root.findtext(".//title"),
+    }
+
+
+def element_text(element, strip: bool = True) -> str:
+    """
+    获取元素文本，等价于 BeautifulSoup 的 get_text(strip=...)
+
+    Args:
+        element: lxml 元素
+        strip: 是否去掉每段文本首尾空白（并丢弃空段）
+
+    Returns:
+        拼接后的文本
+    """
+    if not strip:
+        return "".join(TEXT_XPATH(element))
+    return "".join(part.strip() for part in TEXT_XPATH(element))
+
+
+def extract_when_to_use(root) -> str:
+    """
+    提取 "When to use" 部分
+
+    Args:
+        root: lxml 文档根元素
+
+    Returns:
+        when_to_use 文本
+    """
+    for xpath in WHEN_TO_USE_XPATHS:
+        headings = xpath(root)
+        if headings:
+            # 取标题后的第一个兄弟元素（通常是内容）
+            content = NEXT_SIBLING_XPATH(headings[0])
+            if content:
+                return element_text(content[0])
+
+    # 找不到标题时才读取整页文本
+    match = WHEN_TO_USE_RE.search(element_text(root, strip=False))
+    if match:
+        return match.group(1).strip()
+
+    return ""
+
+
+def extract_rules(root, html_content: str) -> List[Dict]:
+    """
+    提取规则列表
+
+    Args:
+        root: lxml 文档根元素（空页面时为 None）
+        html_content: 原始 HTML，备用方案直接在其上匹配，无需重新序列化
+
+    Returns:
+        规则列表
+    """
+    rules = []
+
+    if root is not None:
+        for xpath in RULE_LIST_XPATHS:
+            for lst in xpath(root):
+                for item in lst.iterchildren("li"):
+                    links = FIRST_LINK_XPATH(item)
+                    if not links:
+                        continue
+
+                    link = links[0]
+                    href = link.get("href", "")
+                    text = element_text(link)
+                    # 描述可能在链接后面
+                    desc = element_text(item).replace(text, "", 1).strip()
+
+                    rules.append({
+                        "file": href.split("/")[-1] if href else text,
+                        "desc": desc or text
+                    })
+
+                if rules:
+                    return rules
+
+    # 备用方案：从 HTML 中提取所有看起来像规则的链接
+    for match in RULE_FILE_RE.finditer(html_content):
+        rules.append({
+            "file": f"{match.group(1)}.md",
+            "desc": f"Rule: {match.group(1)}"
+        })
+
+    return rules
+
@@ -0,0 +1,155 @@
+"""
+HTTP Cache - 技能详情页的条件请求磁盘缓存
+保存 ETag / Last-Modified 和解析结果，304 时直接复用解析结果，无需重新解析 HTML
+"""
+import os
+import json
+import hashlib
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from src.config import DETAIL_CACHE_DIR, DETAIL_CACHE_MAX_MB
+
+
+class DetailCache:
+    """详情页条件请求缓存，每个 URL 一个 JSON 文件，按总大小 LRU 淘汰"""
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None):
+        """
+        初始化
+
+        Args:
+            cache_dir: 缓存目录，默认使用配置中的值
+            max_bytes: 缓存总大小上限（字节），默认使用配置中的值
+        """
+        self.cache_dir = Path(cache_dir or DETAIL_CACHE_DIR)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes if max_bytes is not None else DETAIL_CACHE_MAX_MB * 1024 * 1024
+
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+
+        self.stats = {
+            "hits": 0,        # 304，直接复用解析结果
+            "misses": 0,      # 200，重新下载并解析
+            "stores": 0,      # 写入缓存次数
+            "evictions": 0,   # 淘汰的条目数
+        }
+
+    def _path(self, url: str) -> Path:
+        """URL 对应的缓存文件路径"""
+        return self.cache_dir / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.json"
+
+    def get(self, url: str) -> Optional[Dict]:
+        """
+        读取缓存条目
+
+        Args:
+            url: 页面 URL
+
+        Returns:
+            {"url", "etag", "last_modified", "parsed"}，不存在或损坏返回 None
+        """
+        path = self._path(url)
+        try:
+            with open(path, encoding="utf-8") as f:
+                entry = json.load(f)
+            # 更新访问时间，用于 LRU 淘汰
+            os.utime(path)
+            return entry
+        except (OSError, ValueError):
+            return None
+
+    def conditional_headers(self, entry: Optional[Dict]) -> Dict[str, str]:
+        """根据缓存条目生成条件请求头"""
+        headers = {}
+        if not entry:
+            return headers
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def put(self, url: str, etag: Optional[str], last_modified: Optional[str], parsed: Dict) -> None:
+        """
+        写入缓存条目（没有任何校验字段时不缓存）
+
+        Args:
+            url: 页面 URL
+            etag: 响应的 ETag
+            last_modified: 响应的 Last-Modified
+            parsed: 解析结果，如 {"when_to_use": ..., "rules": [...]}
+        """
+        if not etag and not last_modified:
+            return
+
+        data = json.dumps({
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "parsed": parsed
+        }, ensure_ascii=False).encode("utf-8")
+
+        path = self._path(url)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+
+        with self._lock:
+            # 替换前统计总大小（首次调用会扫描目录），再加上本次的增量，避免重复计入新文件
+            total = self._current_total()
+            old_size = path.stat().st_size if path.exists() else 0
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+            self.stats["stores"] += 1
+            self._total_bytes = total + len(data) - old_size
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _current_total(self) -> int:
+        """当前缓存总大小（首次调用时扫描目录）"""
+        if self._total_bytes is None:
+            self._total_bytes = sum(p.stat().st_size for p in self.cache_dir.glob("*.json"))
+        return self._total_bytes
+
+    def _evict(self) -> None:
+        """按最近访问时间淘汰，直到总大小低于上限"""
+        files = sorted(self.cache_dir.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in files)
+
+        for path in files:
+            if total <= self.max_bytes:
+                break
+            size = path.stat().st_size
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            self.stats["evictions"] += 1
+
+        self._total_bytes = total
+
+    def record_hit(self) -> None:
+        """记录命中"""
+        with self._lock:
+            self.stats["hits"] += 1
+
+    def record_miss(self) -> None:
+        """记录未命中"""
+        with self._lock:
+            self.stats["misses"] += 1
+
+    def hit_rate(self) -> float:
+        """命中率"""
+        total = self.stats["hits"] + self.stats["misses"]
+        return self.stats["hits"] / total if total else 0.0
+
+    def format_stats(self) -> str:
+        """格式化统计信息"""
+        return (
+            f"命中 {self.stats['hits']}, 未命中 {self.stats['misses']} "
+            f"(命中率 {self.hit_rate():.0%}), 淘汰 {self.stats['evictions']}"
+        )
@@ -0,0 +1,159 @@
+"""
+JSON Stream - 增量 JSON 数组解析器
+边接收模型输出边解析，数组中每个元素一完整就立即返回，不必等待整个响应
+"""
+import json
+from typing import Any, List
+
+
+# 解析状态
+SEEK = "seek"        # 跳过数组之前的内容（如 ```json 代码块标记）
+ARRAY = "array"      # 位于顶层数组内
+DONE = "done"        # 顶层数组（或单个对象）已结束，忽略后续内容
+
+
+class JsonArrayStream:
+    """
+    增量解析顶层 JSON 数组
+
+    用法:
+        parser = JsonArrayStream()
+        for text in stream:
+            for item in parser.feed(text):
+                ...
+        parser.complete  # 是否看到了完整的数组
+
+    模型偶尔只输出单个对象而不是数组，此时把该对象当作唯一元素返回。
+    """
+
+    def __init__(self):
+        self.state = SEEK
+        self.complete = False
+        self.errors: List[str] = []   # 无法解码的元素（截断到 80 字符）
+
+        self._buffer = ""
+        self._pos = 0              # 下一个待扫描字符在 buffer 中的位置
+        self._depth = 0            # 当前嵌套深度（顶层数组内为 1）
+        self._in_string = False
+        self._escape = False
+        self._start = -1           # 当前元素在 buffer 中的起始位置，-1 表示不在元素中
+        self._single_object = False
+
+    def feed(self, text: str) -> List[Any]:
+        """
+        送入一段文本
+
+        Args:
+            text: 新接收的响应片段
+
+        Returns:
+            本次新完成的元素列表
+        """
+        if self.state == DONE or not text:
+            return []
+
+        self._buffer += text
+        items = []
+
+        buffer = self._buffer
+        pos = self._pos
+        depth = self._depth
+        in_string = self._in_string
+        escape = self._escape
+        start = self._start
+        length = len(buffer)
+
+        while pos < length:
+            ch = buffer[pos]
+
+            if in_string:
+                if escape:
+                    escape = False
+                elif ch == "\\":
+                    escape = True
+                elif ch == '"':
+                    in_string = False
+                pos += 1
+                continue
+
+            if self.state == SEEK:
+                if ch == "[":
+                    self.state = ARRAY
+                    depth = 1
+                elif ch == "{":
+                    # 单个对象：当作只有一个元素的数组
+                    self.state = ARRAY
+                    self._single_object = True
+                    depth = 2
+                    start = pos
+                pos += 1
+                continue
+
+            if ch == '"':
+                in_string = True
+                if depth == 1 and start < 0:
+                    start = pos
+            elif ch in "[{":
+                if depth == 1 and start < 0:
+                    start = pos
+                depth += 1
+            elif ch in "]}":
+                depth -= 1
+                if depth == 1 and start >= 0:
+                    # 对象/数组元素结束
+                    self._decode(buffer[start:pos + 1], items)
+                    start = -1
+                    if self._single_object:
+                        self._finish()
+                        break
+                elif depth == 0:
+                    # 顶层数组结束，先收尾最后一个标量元素
+                    if start >= 0:
+                        self._decode(buffer[start:pos], items)
+                        start = -1
+                    self._finish()
+                    break
+            elif ch == ",":
+                if depth == 1 and start >= 0:
+                    self._decode(buffer[start:pos], items)
+                    start = -1
+            elif depth == 1 and start < 0 and not ch.isspace():
+                # 数字 / true / false / null 标量元素
+                start = pos
+
+            pos += 1
+
+        if self.state == DONE:
+            self._buffer = ""
+            return items
+
+        # 丢弃已经处理完的前缀，缓冲区只保留未完成的元素
+        keep_from = start if start >= 0 else pos
+        self._buffer = buffer[keep_from:]
+        self._pos = pos - keep_from
+        self._start = 0 if start >= 0 else -1
+        self._depth = depth
+        self._in_string = in_string
+        self._escape = escape
+
+        return items
+
+    def _decode(self, text: str, items: List[Any]) -> None:
+        """解码一个完整元素"""
+        text = text.strip()
+        if not text:
+            return
+        try:
+            items.append(json.loads(text))
+        except json.JSONDecodeError:
+            self.errors.append(text[:80])
+
+    def _finish(self) -> None:
+        """标记数组结束"""
+        self.state = DONE
+        self.complete = True
+
+
+def parse_json_array(text: str) -> List[Any]:
+    """便捷函数：一次性解析文本中的 JSON 数组（容忍前后多余内容和截断）"""
+    return JsonArrayStream().feed(text)
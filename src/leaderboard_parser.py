@@ -0,0 +1,236 @@
+"""
+Leaderboard Parser - 单次遍历的排行榜文本解析器
+按行切分页面文本，用状态机识别 rank / name / owner / installs 记录
+"""
+import re
+from typing import Dict, List, Optional, Tuple
+
+
+NAME_RE = re.compile(r'[a-zA-Z0-9_-]+$')
+OWNER_RE = re.compile(r'[\w-]+/[\w-]+$')
+INSTALLS_RE = re.compile(r'[\d.]+K?')
+
+# 解析状态
+SEEK_MARKER = "seek_marker"        # 寻找 "Leaderboard" 标题
+EXPECT_RANK = "expect_rank"        # 等待排名行
+EXPECT_NAME = "expect_name"        # 等待技能名称行（兼容 "### name" 旧格式）
+EXPECT_OWNER = "expect_owner"      # 等待拥有者行 owner/repo
+EXPECT_INSTALLS = "expect_installs"  # 等待安装量行
+
+
+def parse_installs(installs_str: str) -> int:
+    """解析安装量字符串，支持 "7.0K" 格式"""
+    if not installs_str:
+        return 0
+
+    installs_str = installs_str.strip().upper()
+
+    if "K" in installs_str:
+        try:
+            return int(float(installs_str.replace("K", "")) * 1000)
+        except ValueError:
+            return 0
+
+    try:
+        return int(installs_str)
+    except ValueError:
+        return 0
+
+
+class LeaderboardParser:
+    """
+    排行榜状态机解析器
+
+    支持三种记录布局:
+        新格式:   1 / remotion-best-practices / remotion-dev/skills / 7.0K（各占一行）
+        旧格式:   1 / ### remotion-best-practices / remotion-dev/skills / 7.0K
+        单行格式: 1 remotion-best-practices remotion-dev/skills 7.0K
+
+    每一行只检查一次；不构成记录的行会连同原因记录在 rejections 中。
+    """
+
+    def __init__(self, base_url: str, max_rejections: int = 200, streaming: bool = False):
+        """
+        初始化
+
+        Args:
+            base_url: skills.sh 基础 URL，用于拼接技能链接
+            max_rejections: 最多保留的拒绝明细条数（计数不受限制）
+            streaming: 流式模式，记录不去重、不累积，通过 drain() 取走
+        """
+        self.base_url = base_url
+        self.max_rejections = max_rejections
+        self.streaming = streaming
+        self.reset()
+
+    def reset(self) -> None:
+        """重置解析状态"""
+        self.state = SEEK_MARKER
+        self.marker: Optional[str] = None
+        self.line_no = 0
+        self.rejections: List[Tuple[int, str, str]] = []
+        self.rejected_count = 0
+        self._skills: Dict[str, Dict] = {}
+        self._drained: List[Dict] = []
+        self._rank = 0
+        self._name = ""
+        self._owner = ""
+
+    def parse(self, text: str) -> List[Dict]:
+        """
+        解析整页文本
+
+        Args:
+            text: 页面文本（document.body.innerText）
+
+        Returns:
+            按排名排序的技能列表
+        """
+        self.reset()
+        self.feed(text)
+        return self.results()
+
+    def restart(self) -> None:
+        """丢弃未完成的记录，从下一个排名行重新开始（已找到的标题保留）"""
+        if self.marker is not None:
+            self.state = EXPECT_RANK
+
+    def feed(self, text: str) -> None:
+        """按行送入文本，可多次调用以增量解析"""
+        self._feed_lines(text.split("\n"))
+
+    def feed_line(self, raw_line: str) -> None:
+        """送入一行文本，推进状态机"""
+        self._feed_lines((raw_line,))
+
+    def _feed_lines(self, lines) -> None:
+        """状态机主循环（热路径，状态放在局部变量中）"""
+        state = self.state
+        line_no = self.line_no
+        name_match = NAME_RE.match
+        owner_match = OWNER_RE.match
+        installs_match = INSTALLS_RE.match
+
+        for raw_line in lines:
+            line_no += 1
+            line = raw_line.strip()
+
+            if state == SEEK_MARKER:
+                if "LEADERBOARD" in line.upper():
+                    self.marker = line
+                    state = EXPECT_RANK
+                continue
+
+            if not line:
+                continue
+
+            self.line_no = line_no
+
+            if state == EXPECT_RANK:
+                state = self._on_rank(line)
+
+            elif state == EXPECT_NAME:
+                name = line[3:].strip() if line.startswith("###") else line
+                if name_match(name):
+                    self._name = name
+                    state = EXPECT_OWNER
+                else:
+                    state = self._restart(line, "技能名称格式无效")
+
+            elif state == EXPECT_OWNER:
+                if owner_match(line):
+                    self._owner = line
+                    state = EXPECT_INSTALLS
+                else:
+                    state = self._restart(line, "拥有者格式无效")
+
+            else:  # EXPECT_INSTALLS
+                match = installs_match(line)
+                if match:
+                    self._emit(self._rank, self._name, self._owner, match.group(0))
+                    state = EXPECT_RANK
+                else:
+                    state = self._restart(line, "安装量格式无效")
+
+        self.state = state
+        self.line_no = line_no
+
+    def _on_rank(self, line: str) -> str:
+        """
+        处理期望排名的行
+
+        Returns:
+            下一个状态
+        """
+        if line.isdigit():
+            self._rank = int(line)
+            return EXPECT_NAME
+
+        # 单行格式: rank name owner installs
+        tokens = line.split()
+        if (
+            len(tokens) == 4
+            and tokens[0].isdigit()
+            and NAME_RE.match(tokens[1])
+            and OWNER_RE.match(tokens[2])
+            and INSTALLS_RE.match(tokens[3])
+        ):
+            self._emit(int(tokens[0]), tokens[1], tokens[2], tokens[3])
+            return EXPECT_RANK
+
+        self._reject(line, "不是排名行")
+        return EXPECT_RANK
+
+    def _restart(self, line: str, reason: str) -> str:
+        """
+        当前记录不完整：记录原因，并把该行当作新记录的开头重新处理
+
+        Returns:
+            下一个状态
+        """
+        self._reject(line, reason)
+        return self._on_rank(line) if line.isdigit() else EXPECT_RANK
+
+    def _reject(self, line: str, reason: str) -> None:
+        """记录被拒绝的行"""
+        self.rejected_count += 1
+        if len(self.rejections) < self.max_rejections:
+            self.rejections.append((self.line_no, line[:80], reason))
+
+    def _emit(self, rank: int, name: str, owner: str, installs_str: str) -> None:
+        """输出一条记录，同名技能只保留最高排名"""
+        if self.streaming:
+            self._drained.append({
+                "rank": rank,
+                "name": name,
+                "owner": owner,
+                "installs": parse_installs(installs_str),
+                "url": f"{self.base_url}/{owner}/{name}"
+            })
+            return
+
+        existing = self._skills.get(name)
+        if existing is None or existing["rank"] > rank:
+            self._skills[name] = {
+                "rank": rank,
+                "name": name,
+                "owner": owner,
+                "installs": parse_installs(installs_str),
+                "url": f"{self.base_url}/{owner}/{name}"
+            }
+
+    def drain(self) -> List[Dict]:
+        """流式模式：取走上次调用以来解析出的记录（按出现顺序）"""
+        records, self._drained = self._drained, []
+        return records
+
+    def results(self) -> List[Dict]:
+        """按排名排序的解析结果"""
+        return sorted(self._skills.values(), key=lambda x: x["rank"])
+
+    def rejection_summary(self) -> Dict[str, int]:
+        """按原因统计被拒绝的行数（基于保留的明细）"""
+        summary: Dict[str, int] = {}
+        for _, _, reason in self.rejections:
+            summary[reason] = summary.get(reason, 0) + 1
+        return summary
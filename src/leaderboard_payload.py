@@ -0,0 +1,192 @@
+"""
+Leaderboard Payload - 解析 skills.sh 用于 hydrate 的排行榜数据载荷
+无需浏览器：从页面 HTML 中的 __NEXT_DATA__ / RSC (self.__next_f.push) 载荷，
+或直接请求 RSC flight 数据，结构化解码出排行榜
+"""
+import re
+import json
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+
+# Next.js pages router: <script id="__NEXT_DATA__" type="application/json">{...}</script>
+NEXT_DATA_RE = re.compile(
+    r'<script[^>]*id="__NEXT_DATA__"[^>]*>(.*?)</script>',
+    re.DOTALL
+)
+
+# Next.js app router: self.__next_f.push([1,"<flight 片段>"])
+NEXT_F_RE = re.compile(
+    r'self\.__next_f\.push\(\[\d+,\s*("(?:[^"\\]|\\.)*")\]\)',
+    re.DOTALL
+)
+
+# 技能记录的字段别名（按优先级）
+NAME_KEYS = ("name", "skillId", "slug")
+OWNER_KEYS = ("source", "owner", "repo", "topSource")
+INSTALLS_KEYS = ("installs", "installCount", "downloads")
+
+NAME_RE = re.compile(r'^[\w.-]+$')
+OWNER_RE = re.compile(r'^[\w.-]+/[\w.-]+$')
+
+
+def extract_payloads(html: str) -> List[Any]:
+    """
+    从页面 HTML 中提取所有可解码的数据载荷
+
+    Args:
+        html: 页面 HTML
+
+    Returns:
+        解码后的 JSON 对象列表
+    """
+    payloads = []
+
+    match = NEXT_DATA_RE.search(html)
+    if match:
+        try:
+            payloads.append(json.loads(match.group(1)))
+        except json.JSONDecodeError:
+            pass
+
+    # 每个 push 参数是一个 JSON 字符串字面量，拼接后即完整的 flight 数据
+    chunks = []
+    for literal in NEXT_F_RE.findall(html):
+        try:
+            chunks.append(json.loads(literal))
+        except json.JSONDecodeError:
+            continue
+
+    if chunks:
+        payloads.extend(decode_flight("".join(chunks)))
+
+    return payloads
+
+
+def decode_flight(flight: str) -> Iterator[Any]:
+    """
+    解码 RSC flight 数据
+
+    每行格式为 `<id>:<json>`，其中 I/HL/T 等前缀行是模块引用或纯文本，跳过即可
+
+    Args:
+        flight: flight 文本
+
+    Yields:
+        每行解码出的 JSON 对象
+    """
+    for line in flight.split("\n"):
+        _, sep, body = line.partition(":")
+        if not sep or not body or body[0] not in "[{\"":
+            continue
+        try:
+            yield json.loads(body)
+        except json.JSONDecodeError:
+            continue
+
+
+def find_skill_records(payload: Any, min_rows: int = 1) -> List[Dict]:
+    """
+    在任意嵌套的 JSON 中查找最长的技能记录列表
+
+    Args:
+        payload: 解码后的 JSON 对象
+        min_rows: 候选列表的最少记录数
+
+    Returns:
+        技能记录列表（原始字典），找不到返回空列表
+    """
+    best: List[Dict] = []
+    stack = [payload]
+
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            records = [item for item in node if _looks_like_skill(item)]
+            if len(records) >= min_rows and len(records) > len(best):
+                best = records
+            stack.extend(item for item in node if isinstance(item, (dict, list)))
+
+    return best
+
+
+def _looks_like_skill(item: Any) -> bool:
+    """判断字典是否像一条技能记录"""
+    return (
+        isinstance(item, dict)
+        and _first(item, NAME_KEYS) is not None
+        and _first(item, OWNER_KEYS) is not None
+        and _first(item, INSTALLS_KEYS) is not None
+    )
+
+
+def _first(item: Dict, keys: Tuple[str, ...]) -> Optional[Any]:
+    """按优先级取第一个存在的字段"""
+    for key in keys:
+        value = item.get(key)
+        if value is not None:
+            return value
+    return None
+
+
+def decode_skills(records: List[Dict], base_url: str) -> List[Dict]:
+    """
+    将原始技能记录转换为统一的排行榜格式
+
+    Args:
+        records: 原始技能记录
+        base_url: skills.sh 基础 URL
+
+    Returns:
+        与 SkillsFetcher.parse_leaderboard 相同格式的技能列表
+    """
+    skills_dict = {}
+
+    for i, record in enumerate(records, 1):
+        name = str(_first(record, NAME_KEYS))
+        owner = str(_first(record, OWNER_KEYS))
+        rank = record.get("rank") or i
+
+        try:
+            installs = int(_first(record, INSTALLS_KEYS))
+            rank = int(rank)
+        except (TypeError, ValueError):
+            continue
+
+        # 只保留每个技能的最高排名
+        if name not in skills_dict or skills_dict[name]["rank"] > rank:
+            skills_dict[name] = {
+                "rank": rank,
+                "name": name,
+                "owner": owner,
+                "installs": installs,
+                "url": f"{base_url}/{owner}/{name}"
+            }
+
+    return sorted(skills_dict.values(), key=lambda x: x["rank"])
+
+
+def validate_skills(skills: List[Dict], min_rows: int) -> Optional[str]:
+    """
+    校验解码结果是否符合排行榜结构
+
+    Args:
+        skills: 技能列表
+        min_rows: 最少技能数
+
+    Returns:
+        校验失败原因，通过返回 None
+    """
+    if len(skills) < min_rows:
+        return f"技能数不足: {len(skills)} < {min_rows}"
+
+    for skill in skills:
+        if not NAME_RE.match(skill["name"]):
+            return f"技能名称格式异常: {skill['name']!r}"
+        if not OWNER_RE.match(skill["owner"]):
+            return f"拥有者格式异常: {skill['owner']!r}"
+        if skill["installs"] < 0 or skill["rank"] < 1:
+            return f"排名/安装量异常: {skill['name']}"
+
+    return None
@@ -18,15 +18,18 @@ from src.config import (
     RESEND_FROM_EMAIL,
     DB_PATH,
     DB_RETENTION_DAYS,
-    TOP_N_DETAILS
+    TOP_N_DETAILS,
+    TRACK_FULL_CATALOG
 )
-from src.skills_fetcher import SkillsFetcher
+from src.skills_fetcher import SkillsFetcher, save_full_catalog
 from src.detail_fetcher import DetailFetcher
 from src.claude_summarizer import ClaudeSummarizer
+from src.pipeline import FetchSummarizePipeline
 from src.database import Database
 from src.trend_analyzer import TrendAnalyzer
 from src.html_reporter import HTMLReporter
 from src.resend_sender import ResendSender
+from src.browser_pool import get_browser_pool
 
 
 def print_banner():
@@ -77,37 +80,43 @@ def main():
 
     try:
         # 1. 获取今日榜单
-        print(f"[步骤 1/7] 获取技能排行榜...")
+        print(f"[步骤 1/6] 获取技能排行榜...")
         fetcher = SkillsFetcher()
         today_skills = fetcher.fetch()
         print(f"   成功获取 {len(today_skills)} 个技能")
         print()
 
-        # 2. 抓取 Top N 详情
-        print(f"[步骤 2/7] 抓取 Top {TOP_N_DETAILS} 详情...")
-        detail_fetcher = DetailFetcher()
-        top_details = detail_fetcher.fetch_top20_details(today_skills)
-        print(f"   成功抓取 {len(top_details)} 个技能详情")
+        # 可选：流式抓取全量榜单，写入单独的全量快照库
+        if TRACK_FULL_CATALOG:
+            print(f"[附加] 流式获取全量榜单...")
+            try:
+                snapshot_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                catalog_count = save_full_catalog(snapshot_time, today)
+                print(f"   全量榜单: {catalog_count} 个技能")
+            except Exception as e:
+                print(f"   ⚠️ 全量榜单获取失败（不影响主流程）: {e}")
+            print()
+
+        # 2. 初始化数据库（AI 分析需要读取已有结果）
+        print(f"[步骤 2/6] 初始化数据库...")
+        db = Database(DB_PATH)
+        db.init_db()
         print()
 
-        # 3. AI 总结和分类
-        print(f"[步骤 3/7] AI 分析和分类...")
-        summarizer = ClaudeSummarizer()
-        ai_summaries = summarizer.summarize_and_classify(top_details)
+        # 3. 抓取 Top N 详情 + AI 总结和分类（流水线：边抓取边分批分析；
+        #    内容未变化的技能复用已有分析，新结果直接写入数据库）
+        print(f"[步骤 3/6] 抓取 Top {TOP_N_DETAILS} 详情并 AI 分析...")
+        pipeline = FetchSummarizePipeline(DetailFetcher(), ClaudeSummarizer(), db)
+        top_details, ai_summaries = pipeline.run(today_skills)
+        print(f"   成功抓取 {len(top_details)} 个技能详情")
+        print(f"   复用 {pipeline.stats['reused']} 个, 重新生成 {pipeline.stats['regenerated']} 个")
 
         # 构建 AI 摘要映射
         ai_summary_map = {s["name"]: s for s in ai_summaries}
         print()
 
-        # 4. 保存到数据库
-        print(f"[步骤 4/7] 保存到数据库...")
-        db = Database(DB_PATH)
-        db.init_db()
-        db.save_skill_details(ai_summaries)
-        print()
-
-        # 5. 计算趋势
-        print(f"[步骤 5/7] 计算趋势...")
+        # 4. 计算趋势
+        print(f"[步骤 4/6] 计算趋势...")
         analyzer = TrendAnalyzer(db)
         trends = analyzer.calculate_trends(today_skills, today, ai_summary_map)
 
@@ -120,15 +129,15 @@ def main():
         print(f"   暴涨: {len(trends['surging'])} 个")
         print()
 
-        # 6. 生成 HTML 邮件
-        print(f"[步骤 6/7] 生成 HTML 邮件...")
+        # 5. 生成 HTML 邮件
+        print(f"[步骤 5/6] 生成 HTML 邮件...")
         reporter = HTMLReporter()
         html_content = reporter.generate_email_html(trends, today)
         print(f"   HTML 长度: {len(html_content)} 字符")
         print()
 
-        # 7. 发送邮件
-        print(f"[步骤 7/7] 发送邮件...")
+        # 6. 发送邮件
+        print(f"[步骤 6/6] 发送邮件...")
         sender = ResendSender(RESEND_API_KEY)
         result = sender.send_email(
             to=EMAIL_TO,
@@ -143,9 +152,10 @@ def main():
             print(f"   ❌ 邮件发送失败: {result['message']}")
         print()
 
-        # 8. 清理过期数据
+        # 7. 清理过期数据
         print(f"[清理] 清理 {DB_RETENTION_DAYS} 天前的数据...")
         deleted = db.cleanup_old_data(DB_RETENTION_DAYS)
+        db.close()
         print()
 
         # 完成 - 简洁输出（避免终端字符宽度问题）
@@ -158,6 +168,8 @@ def main():
         print(f"  新晋:   {len(trends['new_entries'])}")
         print(f"  跌出:   {len(trends['dropped_entries'])}")
         print(f"  暴涨:   {len(trends['surging'])}")
+        print(f"  AI:     复用 {pipeline.stats['reused']} / 生成 {pipeline.stats['regenerated']}")
+        print(f"  浏览器: {get_browser_pool().format_stats()}")
         print("=" * 40)
 
     except KeyboardInterrupt:
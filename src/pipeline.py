@@ -0,0 +1,185 @@
+"""
+Pipeline - 详情抓取与 AI 分析流水线
+抓取线程把解析完成的详情放入有界队列，主线程凑够一小批就交给 Claude 分析；
+各批次的请求共享同一个并发限制并相互重叠，抓取和推理也相互重叠，
+总耗时接近 max(抓取, 分析) 而不是两者之和
+"""
+import time
+import queue
+import asyncio
+import threading
+from datetime import datetime
+from typing import AsyncIterator, Dict, List, Tuple
+
+from src.detail_fetcher import DetailFetcher
+from src.claude_summarizer import ClaudeSummarizer
+from src.database import Database
+from src.config import (
+    PIPELINE_ENABLED,
+    PIPELINE_BATCH_SIZE,
+    PIPELINE_QUEUE_SIZE,
+    PIPELINE_FLUSH_SECONDS,
+)
+
+
+# 队列结束标记
+_DONE = object()
+
+
+class FetchSummarizePipeline:
+    """详情抓取（生产者线程）+ AI 分析（主线程消费者）"""
+
+    def __init__(self, fetcher: DetailFetcher, summarizer: ClaudeSummarizer, db: Database = None,
+                 enabled: bool = None, batch_size: int = None, queue_size: int = None,
+                 flush_seconds: float = None):
+        """
+        初始化
+
+        Args:
+            fetcher: 详情抓取器
+            summarizer: AI 分析器
+            db: 数据库，只在主线程中使用（复用已有分析、保存结果）
+            enabled: 是否启用流水线，False 时先抓取完再分析（原流程），默认使用配置中的值
+            batch_size: 凑够多少个详情就发起一批分析，默认使用配置中的值
+            queue_size: 详情队列容量，分析跟不上时抓取线程阻塞等待，默认使用配置中的值
+            flush_seconds: 凑批的最长等待时间（秒），超时后不足一批也立即分析，默认使用配置中的值
+        """
+        self.fetcher = fetcher
+        self.summarizer = summarizer
+        self.db = db
+        self.enabled = PIPELINE_ENABLED if enabled is None else enabled
+        self.batch_size = max(1, batch_size or PIPELINE_BATCH_SIZE)
+        self.queue_size = max(1, queue_size or PIPELINE_QUEUE_SIZE)
+        self.flush_seconds = PIPELINE_FLUSH_SECONDS if flush_seconds is None else flush_seconds
+        # 一批最多取出的详情数（队列中已积压时一次取满一块）
+        self.max_batch = max(self.batch_size, summarizer.chunk_size)
+        self.stats: Dict = {}
+
+    def run(self, skills: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        抓取 Top 20 详情并完成 AI 分析
+
+        Args:
+            skills: 榜单技能列表
+
+        Returns:
+            (详情列表, AI 分析结果列表)，两者都保持榜单顺序
+        """
+        self.stats = {
+            "batches": 0,
+            "crawl_seconds": 0.0,
+            "total_seconds": 0.0,
+            "tail_seconds": 0.0,
+        }
+        run_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        started = time.perf_counter()
+
+        if self.enabled:
+            details, summaries = self._run_pipelined(skills, run_time)
+        else:
+            details = self.fetcher.fetch_top20_details(skills)
+            self.stats["crawl_seconds"] = time.perf_counter() - started
+            self.stats["batches"] = 1
+            summaries = self.summarizer.summarize_and_classify(details, self.db, run_time=run_time)
+
+        self.stats["total_seconds"] = time.perf_counter() - started
+        # 抓取结束后还需要等待 AI 分析的时间（流水线的收益 = 串行时的分析耗时 - 这段时间）
+        self.stats["tail_seconds"] = max(0.0, self.stats["total_seconds"] - self.stats["crawl_seconds"])
+        self.stats.update(self.summarizer.stats)
+
+        # 按榜单顺序返回
+        order = {d.get("name"): i for i, d in enumerate(details)}
+        summaries.sort(key=lambda r: order.get(r["name"], len(order)))
+
+        print(f"⏱️ 抓取 {self.stats['crawl_seconds']:.1f}s, 抓取结束后等待 AI {self.stats['tail_seconds']:.1f}s "
+              f"({self.stats['batches']} 批), 总计 {self.stats['total_seconds']:.1f}s"
+              f"{' (流水线)' if self.enabled else ''}")
+        return details, summaries
+
+    def _run_pipelined(self, skills: List[Dict], run_time: str) -> Tuple[List[Dict], List[Dict]]:
+        """生产者线程抓取，主线程按批分析"""
+        details_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        crawl: Dict = {"details": [], "error": None}
+
+        def produce():
+            crawl_started = time.perf_counter()
+            try:
+                crawl["details"] = self.fetcher.fetch_top20_details(skills, on_detail=details_queue.put)
+            except BaseException as e:
+                crawl["error"] = e
+            finally:
+                self.stats["crawl_seconds"] = time.perf_counter() - crawl_started
+                details_queue.put(_DONE)
+
+        print(f"🔀 流水线: 每 {self.batch_size} 个详情（或等待 {self.flush_seconds:.1f}s）分析一批，"
+              f"队列容量 {self.queue_size}")
+
+        producer = threading.Thread(target=produce, name="detail-fetcher", daemon=True)
+        producer.start()
+
+        summaries = asyncio.run(
+            self.summarizer.summarize_batches(self._batches(details_queue), self.db, run_time)
+        )
+
+        producer.join()
+        if crawl["error"] is not None:
+            raise crawl["error"]
+
+        return crawl["details"], summaries
+
+    async def _batches(self, details_queue: queue.Queue) -> AsyncIterator[List[Dict]]:
+        """把队列中的详情按批产出（阻塞等待放到线程中，不占用事件循环）"""
+        loop = asyncio.get_running_loop()
+        finished = False
+        while not finished:
+            batch, finished = await loop.run_in_executor(None, self._next_batch, details_queue)
+            if batch:
+                self.stats["batches"] += 1
+                yield batch
+
+    def _next_batch(self, details_queue: queue.Queue) -> Tuple[List[Dict], bool]:
+        """
+        从队列中取出下一批详情
+
+        阻塞等待第一个详情，然后最多等待 flush_seconds 凑够 batch_size 个，
+        最后把队列中已就绪的详情一并取出（不超过 max_batch）
+
+        Returns:
+            (本批详情, 抓取是否已结束)
+        """
+        batch: List[Dict] = []
+
+        item = details_queue.get()
+        if item is _DONE:
+            return batch, True
+        batch.append(item)
+
+        deadline = time.monotonic() + self.flush_seconds
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0:
+                break
+            try:
+                item = details_queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+
+        while len(batch) < self.max_batch:
+            try:
+                item = details_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _DONE:
+                return batch, True
+            batch.append(item)
+
+        return batch, False
+
+
+def fetch_and_summarize(skills: List[Dict], db: Database = None) -> Tuple[List[Dict], List[Dict]]:
+    """便捷函数：流水线抓取详情并 AI 分析"""
+    pipeline = FetchSummarizePipeline(DetailFetcher(), ClaudeSummarizer(), db)
+    return pipeline.run(skills)
@@ -0,0 +1,54 @@
+"""
+Rate Limiter - 线程安全的令牌桶限速器
+"""
+import time
+import threading
+
+
+class TokenBucket:
+    """令牌桶：平均速率不超过 rate 次/秒，允许最多 capacity 次的突发"""
+
+    def __init__(self, rate: float, capacity: float = None):
+        """
+        初始化
+
+        Args:
+            rate: 每秒补充的令牌数（<= 0 表示不限速）
+            capacity: 桶容量（允许的突发请求数），默认 max(1, rate)
+        """
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        """按流逝时间补充令牌"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0) -> float:
+        """
+        获取令牌，不足时阻塞等待
+
+        Args:
+            tokens: 需要的令牌数
+
+        Returns:
+            实际等待的秒数
+        """
+        if self.rate <= 0:
+            return 0.0
+
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return waited
+                wait = (tokens - self._tokens) / self.rate
+
+            time.sleep(wait)
+            waited += wait
@@ -0,0 +1,82 @@
+"""
+Raw HTML Store - 详情页原始 HTML 的压缩磁盘存储
+原始 HTML 不再随详情字典在流程中传递，需要排查解析问题时按 URL 按需读取
+"""
+import os
+import gzip
+import hashlib
+import threading
+from pathlib import Path
+from typing import Optional
+
+from src.config import RAW_HTML_DIR
+
+
+class RawHtmlStore:
+    """按 URL 保存 gzip 压缩的原始 HTML，每个 URL 一个文件"""
+
+    def __init__(self, store_dir: str = None):
+        """
+        初始化
+
+        Args:
+            store_dir: 存储目录，默认使用配置中的值
+        """
+        self.store_dir = Path(store_dir or RAW_HTML_DIR)
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+
+        self.stats = {
+            "stores": 0,         # 写入页面数
+            "raw_bytes": 0,      # 原始大小
+            "stored_bytes": 0,   # 压缩后大小
+        }
+        self._lock = threading.Lock()
+
+    def _path(self, url: str) -> Path:
+        """URL 对应的存储文件路径"""
+        return self.store_dir / f"{hashlib.sha1(url.encode('utf-8')).hexdigest()}.html.gz"
+
+    def put(self, url: str, html_content: str) -> None:
+        """
+        写入原始 HTML（覆盖旧版本）
+
+        Args:
+            url: 页面 URL
+            html_content: 页面 HTML
+        """
+        raw = html_content.encode("utf-8")
+        data = gzip.compress(raw)
+
+        path = self._path(url)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self.stats["stores"] += 1
+            self.stats["raw_bytes"] += len(raw)
+            self.stats["stored_bytes"] += len(data)
+
+    def get(self, url: str) -> Optional[str]:
+        """
+        读取原始 HTML
+
+        Args:
+            url: 页面 URL
+
+        Returns:
+            页面 HTML，不存在或损坏返回 None
+        """
+        try:
+            with gzip.open(self._path(url), "rt", encoding="utf-8") as f:
+                return f.read()
+        except (OSError, EOFError):
+            return None
+
+    def format_stats(self) -> str:
+        """格式化统计信息"""
+        return (
+            f"保存 {self.stats['stores']} 页, "
+            f"{self.stats['raw_bytes'] / 1024:.1f} KB -> {self.stats['stored_bytes'] / 1024:.1f} KB"
+        )
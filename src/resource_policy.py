@@ -0,0 +1,175 @@
+"""
+Resource Policy - 基于 Playwright 路由的资源拦截策略
+渲染排行榜只需要页面文本，图片/字体/样式/统计脚本都可以直接拦截
+"""
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from src.config import (
+    SKILLS_BASE_URL,
+    SKILLS_RESOURCE_POLICY,
+    SKILLS_BLOCKED_RESOURCE_TYPES,
+    SKILLS_SCRIPT_ALLOWLIST,
+)
+
+
+# 常见统计/追踪服务（URL 子串匹配）
+DEFAULT_TRACKER_PATTERNS = [
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "plausible.io",
+    "/_vercel/insights",
+    "/_vercel/speed-insights",
+    "vitals.vercel-insights.com",
+    "va.vercel-scripts.com",
+    "segment.com",
+    "segment.io",
+    "hotjar.com",
+    "clarity.ms",
+    "posthog.com",
+    "sentry.io",
+    "connect.facebook.net",
+]
+
+
+def _parse_allow_entry(entry: str, default_host: str) -> Tuple[str, str]:
+    """
+    解析脚本白名单条目
+
+    Args:
+        entry: "skills.sh"（主机及其子域名）、"skills.sh/_next/"（主机 + 路径前缀）
+            或 "/_next/"（站点自身主机上的路径前缀）
+        default_host: 条目只有路径时使用的主机
+
+    Returns:
+        (主机, 路径前缀)
+    """
+    host, slash, path = entry.strip().partition("/")
+    return (host or default_host).lower(), slash + path or "/"
+
+
+class ResourcePolicy:
+    """资源拦截策略，同时统计请求数和下载字节数"""
+
+    def __init__(self, mode: str = "block", blocked_types: List[str] = None,
+                 tracker_patterns: List[str] = None, script_allowlist: List[str] = None):
+        """
+        初始化
+
+        Args:
+            mode: block=拦截, audit=只统计不拦截（用于测量拦截前的基线）
+            blocked_types: 拦截的资源类型（Playwright resource_type）
+            tracker_patterns: 统计/追踪服务 URL 子串
+            script_allowlist: 允许加载的脚本：主机（含子域名）、主机/路径前缀，或站点自身的 /路径前缀
+        """
+        self.mode = mode
+        self.blocked_types = set(blocked_types if blocked_types is not None else SKILLS_BLOCKED_RESOURCE_TYPES)
+        self.tracker_patterns = tracker_patterns if tracker_patterns is not None else DEFAULT_TRACKER_PATTERNS
+        self.script_allowlist = script_allowlist if script_allowlist is not None else SKILLS_SCRIPT_ALLOWLIST
+        site_host = urlparse(SKILLS_BASE_URL).hostname or ""
+        self._script_rules = [_parse_allow_entry(entry, site_host) for entry in self.script_allowlist if entry.strip()]
+
+        self.stats = {
+            "requests": 0,        # 页面发起的请求总数（拦截前）
+            "allowed": 0,         # 放行的请求数（拦截后）
+            "blocked": 0,         # 拦截（audit 模式下为本应拦截）的请求数
+            "bytes": 0,           # 放行请求实际下载的字节数
+            "blocked_by": {},     # 按拦截原因统计
+        }
+
+    @classmethod
+    def from_config(cls) -> Optional["ResourcePolicy"]:
+        """根据配置创建策略，off 时返回 None"""
+        if SKILLS_RESOURCE_POLICY == "off":
+            return None
+        return cls(mode=SKILLS_RESOURCE_POLICY)
+
+    def block_reason(self, resource_type: str, url: str) -> Optional[str]:
+        """
+        判断请求是否应被拦截
+
+        Args:
+            resource_type: 资源类型，如 image / script / stylesheet
+            url: 请求 URL
+
+        Returns:
+            拦截原因，放行返回 None
+        """
+        if any(pattern in url for pattern in self.tracker_patterns):
+            return "tracker"
+
+        if resource_type in self.blocked_types:
+            return resource_type
+
+        if resource_type == "script" and not self._script_allowed(url):
+            return "third-party-script"
+
+        return None
+
+    def _script_allowed(self, url: str) -> bool:
+        """脚本的主机（或其上级域名）和路径前缀是否命中白名单"""
+        parsed = urlparse(url)
+        hostname = parsed.hostname or ""
+        path = parsed.path or "/"
+        return any(
+            (hostname == host or hostname.endswith("." + host)) and path.startswith(prefix)
+            for host, prefix in self._script_rules
+        )
+
+    async def attach(self, page) -> None:
+        """
+        在页面上注册路由和统计监听
+
+        Args:
+            page: Playwright 页面
+        """
+        await page.route("**/*", self._handle_route)
+        page.on("requestfinished", self._on_request_finished)
+
+    async def _handle_route(self, route) -> None:
+        """路由处理：拦截或放行"""
+        request = route.request
+        self.stats["requests"] += 1
+
+        # audit 模式下同样统计"本应拦截"的请求，但全部放行，用于对比拦截前后
+        reason = self.block_reason(request.resource_type, request.url)
+        if reason:
+            self.stats["blocked"] += 1
+            self.stats["blocked_by"][reason] = self.stats["blocked_by"].get(reason, 0) + 1
+            if self.mode == "block":
+                await route.abort()
+                return
+
+        self.stats["allowed"] += 1
+        await route.continue_()
+
+    async def _on_request_finished(self, request) -> None:
+        """统计已完成请求的下载字节数"""
+        try:
+            sizes = await request.sizes()
+            self.stats["bytes"] += sizes.get("responseBodySize", 0) + sizes.get("responseHeadersSize", 0)
+        except Exception:
+            pass
+
+    def get_stats(self) -> Dict:
+        """获取统计信息"""
+        stats = dict(self.stats)
+        stats["blocked_by"] = dict(self.stats["blocked_by"])
+        stats["mode"] = self.mode
+        return stats
+
+    def format_stats(self) -> str:
+        """格式化统计信息"""
+        text = (
+            f"请求 {self.stats['requests']} -> {self.stats['allowed']} "
+            f"(拦截 {self.stats['blocked']}), "
+            f"下载 {self.stats['bytes'] / 1024:.1f} KB"
+        )
+        if self.stats["blocked_by"]:
+            detail = ", ".join(f"{k}={v}" for k, v in sorted(self.stats["blocked_by"].items()))
+            text += f" [{detail}]"
+        if self.mode == "audit":
+            text += " (audit 模式，未实际拦截)"
+        return text
+
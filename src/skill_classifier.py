@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+Skill Classifier - 本地技能预分类
+关键词规则 + TF-IDF 最近质心模型（纯 Python，基于 skills_details 历史分类训练），
+置信度达到阈值的技能直接确定分类，Claude 只需生成摘要
+
+训练和分类使用同一种文本（详情页的用途说明 + 规则列表，保存在 skills_details.classifier_text），
+预分类得到的分类（category_source = preset）不作为训练标签
+
+用法（用历史记录评估精确率）:
+    python -m src.skill_classifier
+    python -m src.skill_classifier --db data/trends.db --threshold 0.8
+"""
+import os
+import re
+import sys
+import math
+import argparse
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+# 添加项目根目录到 Python 路径（支持直接运行本文件）
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_root)
+
+from src.config import DB_PATH, CLASSIFIER_THRESHOLD, CLASSIFIER_MIN_SAMPLES
+from src.database import Database
+
+
+# 关键词规则：英文按词匹配，中文按子串匹配；技能名称中的命中权重更高
+KEYWORD_RULES = {
+    "frontend": ["react", "vue", "svelte", "angular", "nextjs", "tailwind", "css", "html", "frontend", "shadcn", "前端"],
+    "backend": ["backend", "fastapi", "django", "flask", "express", "nestjs", "graphql", "microservice", "microservices", "后端"],
+    "mobile": ["ios", "android", "swift", "swiftui", "kotlin", "flutter", "expo", "mobile", "移动端"],
+    "devops": ["docker", "kubernetes", "k8s", "terraform", "devops", "deploy", "deployment", "ansible", "helm", "运维", "部署"],
+    "video": ["video", "remotion", "ffmpeg", "视频"],
+    "animation": ["animation", "animations", "gsap", "lottie", "framer", "动画"],
+    "data": ["pandas", "csv", "etl", "excel", "spreadsheet", "xlsx", "dataset", "数据处理", "数据分析"],
+    "ai": ["llm", "rag", "embedding", "embeddings", "pytorch", "tensorflow", "huggingface", "finetune", "机器学习", "大模型"],
+    "testing": ["test", "tests", "testing", "pytest", "jest", "vitest", "cypress", "e2e", "tdd", "测试"],
+    "marketing": ["seo", "marketing", "copywriting", "ads", "newsletter", "营销"],
+    "documentation": ["docs", "documentation", "readme", "docstring", "docstrings", "文档"],
+    "design": ["design", "figma", "ux", "typography", "设计"],
+    "database": ["sql", "postgres", "postgresql", "mysql", "sqlite", "database", "mongodb", "redis", "prisma", "supabase", "数据库"],
+    "security": ["security", "oauth", "vulnerability", "xss", "csrf", "encryption", "pentest", "安全"],
+}
+
+NAME_WEIGHT = 3          # 名称中命中一个关键词的得分
+TEXT_WEIGHT = 1          # 正文中命中一个关键词的得分（每个关键词只计一次）
+RULE_PRIOR = 1.0         # 规则得分归一化时的平滑项，命中越少置信度越低
+MODEL_TEMPERATURE = 0.05 # 质心相似度转换为概率时的温度
+
+ENGLISH_STOPWORDS = {
+    "the", "and", "for", "with", "this", "that", "you", "your", "are", "use", "using", "when",
+    "from", "into", "will", "can", "all", "any", "not", "its", "best", "practices", "skill", "skills",
+    "guide", "guidelines", "rules", "how", "what", "should", "md",
+}
+
+WORD_RE = re.compile(r"[a-z][a-z0-9]+")
+CJK_RE = re.compile(r"[一-鿿]+")
+FALLBACK_SUMMARY_SUFFIX = "AI 分析暂不可用"
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    分词：英文小写单词（去停用词）+ 中文二元组
+
+    Args:
+        text: 文本
+
+    Returns:
+        token 列表
+    """
+    text = (text or "").lower()
+    tokens = [w for w in WORD_RE.findall(text) if w not in ENGLISH_STOPWORDS]
+    for run in CJK_RE.findall(text):
+        if len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def detail_text(detail: Dict) -> str:
+    """分类器的输入文本：详情页的用途说明 + 规则列表（训练时读取保存下来的同一文本）"""
+    rules = " ".join(f"{rule.get('file') or ''} {rule.get('desc') or ''}" for rule in detail.get("rules") or [])
+    return f"{detail.get('when_to_use') or ''} {rules}".strip()
+
+
+def name_tokens(name: str) -> List[str]:
+    """技能名称按 - / _ / 空格拆分"""
+    return [part for part in re.split(r"[-_\s/.]+", (name or "").lower()) if part]
+
+
+class SkillClassifier:
+    """关键词规则 + TF-IDF 最近质心的技能分类器"""
+
+    def __init__(self, threshold: float = None, min_samples: int = None):
+        """
+        初始化
+
+        Args:
+            threshold: 置信度阈值，默认使用配置中的值
+            min_samples: 训练模型所需的最少历史记录，默认使用配置中的值
+        """
+        self.threshold = CLASSIFIER_THRESHOLD if threshold is None else threshold
+        self.min_samples = CLASSIFIER_MIN_SAMPLES if min_samples is None else min_samples
+        self.samples = 0
+        self.skipped_preset = 0  # 因分类来自预分类而排除的记录数
+        self.idf: Dict[str, float] = {}
+        self.sums: Dict[str, Dict[str, float]] = {}   # 每个分类的向量和（未归一化的质心）
+        self.norms: Dict[str, float] = {}             # 向量和的模长平方
+        self._training: List[Tuple[str, str, str, Dict[str, float]]] = []  # (分类, 名称, 文本, 向量)，用于评估
+
+    @property
+    def trained(self) -> bool:
+        """模型是否已训练"""
+        return bool(self.sums)
+
+    def fit(self, rows: Iterable[Dict]) -> int:
+        """
+        用 skills_details 历史记录训练 TF-IDF 最近质心模型
+
+        特征来自记录的 classifier_text（与 classify() 使用的 detail_text 相同），没有该文本的记录、
+        降级结果、没有分类的记录以及分类来自预分类的记录（避免模型用自己的预测训练自己）不参与训练；
+        记录数少于 min_samples 时不训练，只使用关键词规则
+
+        Args:
+            rows: 历史分析记录（Database.get_all_skill_details() 的值）
+
+        Returns:
+            参与训练的记录数
+        """
+        docs = []
+        skipped_preset = 0
+        for row in rows:
+            category = row.get("category")
+            text = row.get("classifier_text")
+            if not category or not text or (row.get("summary") or "").endswith(FALLBACK_SUMMARY_SUFFIX):
+                continue
+            if row.get("category_source") == "preset":
+                skipped_preset += 1
+                continue
+            name = row.get("name") or ""
+            docs.append((category, name, text, name_tokens(name) * 2 + tokenize(text)))
+
+        self.samples = 0
+        self.skipped_preset = skipped_preset
+        self.idf, self.sums, self.norms, self._training = {}, {}, {}, []
+        if len(docs) < max(1, self.min_samples):
+            return 0
+
+        df = Counter()
+        for *_, tokens in docs:
+            df.update(set(tokens))
+        total = len(docs)
+        self.idf = {token: math.log((1 + total) / (1 + count)) + 1 for token, count in df.items()}
+
+        sums: Dict[str, Dict[str, float]] = defaultdict(dict)
+        for category, name, text, tokens in docs:
+            vector = self._vectorize(tokens)
+            self._training.append((category, name, text, vector))
+            target = sums[category]
+            for token, weight in vector.items():
+                target[token] = target.get(token, 0.0) + weight
+
+        self.sums = dict(sums)
+        self.norms = {c: sum(w * w for w in vec.values()) for c, vec in self.sums.items()}
+        self.samples = total
+        return total
+
+    def classify(self, detail: Dict) -> Dict:
+        """
+        对一个待分析的技能分类
+
+        Args:
+            detail: 技能详情（name、when_to_use、rules）
+
+        Returns:
+            {"category": "frontend", "confidence": 0.83, "source": "rules+model", "confident": True}
+        """
+        name = detail.get("name") or ""
+        text = detail_text(detail)
+        category, confidence, source = self._predict(name, text)
+        return {
+            "category": category,
+            "confidence": round(confidence, 3),
+            "source": source,
+            "confident": confidence >= self.threshold,
+        }
+
+    def evaluate(self) -> Dict:
+        """
+        用历史分类评估跳过 LLM 分类这一决策的精确率
+
+        留一法：每条记录都用去掉它自身后的质心，按 classify() 相同的输入（名称 + 用途说明 + 规则列表）
+        和相同的规则 + 模型合并方式预测；标签只来自 LLM 分类
+
+        Returns:
+            {
+                "samples": 120,
+                "accuracy": 0.71,          # 全部预测的准确率
+                "confident": 64,           # 置信度达到阈值的数量
+                "coverage": 0.53,          # 达到阈值的比例（这些技能会跳过 LLM 分类）
+                "precision": 0.95,         # 达到阈值的预测中与历史分类一致的比例
+                "per_category": {"frontend": {"predicted": 10, "correct": 9}, ...}
+            }
+        """
+        correct = confident = confident_correct = 0
+        per_category: Dict[str, Dict[str, int]] = defaultdict(lambda: {"predicted": 0, "correct": 0})
+
+        for category, name, text, vector in self._training:
+            predicted, confidence, _ = self._predict(name, text, exclude=(category, vector))
+            hit = predicted == category
+            correct += hit
+            if confidence >= self.threshold:
+                confident += 1
+                confident_correct += hit
+                per_category[predicted]["predicted"] += 1
+                per_category[predicted]["correct"] += hit
+
+        total = len(self._training)
+        return {
+            "samples": total,
+            "accuracy": correct / total if total else 0.0,
+            "confident": confident,
+            "coverage": confident / total if total else 0.0,
+            "precision": confident_correct / confident if confident else 0.0,
+            "per_category": dict(per_category),
+        }
+
+    def format_report(self, report: Dict) -> str:
+        """格式化评估结果"""
+        return (f"{report['samples']} 条历史记录（排除预分类 {self.skipped_preset} 条）, 阈值 {self.threshold:.2f}: "
+                f"精确率 {report['precision']:.1%} (覆盖 {report['coverage']:.1%}), "
+                f"整体准确率 {report['accuracy']:.1%}")
+
+    def _predict(self, name: str, text: str,
+                 exclude: Tuple[str, Dict[str, float]] = None) -> Tuple[str, float, str]:
+        """
+        合并规则和模型的概率分布
+
+        两者都有结果时取平均，只有一方有结果时直接使用
+
+        Returns:
+            (分类, 置信度, 来源)
+        """
+        rule_probs = self._rule_probs(name, text)
+        model_probs = {}
+        if self.trained:
+            if exclude:
+                vector = exclude[1]
+            else:
+                vector = self._vectorize(name_tokens(name) * 2 + tokenize(text))
+            model_probs = self._model_probs(vector, exclude)
+
+        if rule_probs and model_probs:
+            probs = {c: (rule_probs.get(c, 0.0) + model_probs.get(c, 0.0)) / 2
+                     for c in set(rule_probs) | set(model_probs)}
+            source = "rules+model"
+        elif rule_probs:
+            probs, source = rule_probs, "rules"
+        elif model_probs:
+            probs, source = model_probs, "model"
+        else:
+            return "other", 0.0, "none"
+
+        category = max(probs, key=probs.get)
+        return category, probs[category], source
+
+    def _rule_probs(self, name: str, text: str) -> Dict[str, float]:
+        """关键词规则得分归一化为概率（加平滑项，命中少时置信度低）"""
+        names = set(name_tokens(name))
+        lowered = text.lower()
+        words = set(WORD_RE.findall(lowered))
+
+        scores = {}
+        for category, keywords in KEYWORD_RULES.items():
+            score = 0
+            for keyword in keywords:
+                if keyword.isascii():
+                    if keyword in names:
+                        score += NAME_WEIGHT
+                    elif keyword in words:
+                        score += TEXT_WEIGHT
+                elif keyword in lowered:
+                    score += TEXT_WEIGHT
+            if score:
+                scores[category] = score
+
+        if not scores:
+            return {}
+        total = sum(scores.values()) + RULE_PRIOR
+        return {category: score / total for category, score in scores.items()}
+
+    def _model_probs(self, vector: Dict[str, float],
+                     exclude: Tuple[str, Dict[str, float]] = None) -> Dict[str, float]:
+        """与各分类质心的余弦相似度，softmax 转换为概率"""
+        if not vector:
+            return {}
+
+        similarities = {}
+        for category, centroid in self.sums.items():
+            dot = sum(weight * centroid.get(token, 0.0) for token, weight in vector.items())
+            norm_sq = self.norms[category]
+            if exclude and exclude[0] == category:
+                # 留一法：从质心中减去样本自身（样本向量已归一化，模长为 1）
+                dot -= 1.0
+                norm_sq = norm_sq - 2 * (dot + 1.0) + 1.0
+            if norm_sq <= 1e-9:
+                continue
+            similarities[category] = dot / math.sqrt(norm_sq)
+
+        if not similarities:
+            return {}
+        top = max(similarities.values())
+        exps = {c: math.exp((s - top) / MODEL_TEMPERATURE) for c, s in similarities.items()}
+        total = sum(exps.values())
+        return {c: e / total for c, e in exps.items()}
+
+    def _vectorize(self, tokens: List[str]) -> Dict[str, float]:
+        """TF-IDF 向量（对数词频，L2 归一化，忽略训练集中没有的词）"""
+        counts = Counter(token for token in tokens if token in self.idf)
+        vector = {token: (1 + math.log(count)) * self.idf[token] for token, count in counts.items()}
+        norm = math.sqrt(sum(w * w for w in vector.values()))
+        if not norm:
+            return {}
+        return {token: w / norm for token, w in vector.items()}
+
+
+def build_classifier(rows: Iterable[Dict] = None) -> SkillClassifier:
+    """便捷函数：创建分类器，传入历史记录时同时训练"""
+    classifier = SkillClassifier()
+    if rows is not None:
+        classifier.fit(rows)
+    return classifier
+
+
+def main():
+    parser = argparse.ArgumentParser(description="用 skills_details 历史分类评估本地预分类精确率")
+    parser.add_argument("--db", default=DB_PATH, help="数据库路径")
+    parser.add_argument("--threshold", type=float, default=None, help="置信度阈值")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ 数据库不存在: {args.db}")
+        sys.exit(1)
+
+    db = Database(args.db)
+    db.init_db()
+    rows = list(db.get_all_skill_details().values())
+    db.close()
+
+    classifier = SkillClassifier(threshold=args.threshold, min_samples=1)
+    trained = classifier.fit(rows)
+    if not trained:
+        print(f"❌ {args.db} 中没有可用的历史分类记录")
+        sys.exit(1)
+
+    report = classifier.evaluate()
+    print(f"📊 {classifier.format_report(report)}")
+    for category, counts in sorted(report["per_category"].items(), key=lambda x: -x[1]["predicted"]):
+        precision = counts["correct"] / counts["predicted"] if counts["predicted"] else 0.0
+        print(f"   {category:<14} {counts['correct']:>4}/{counts['predicted']:<4} {precision:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,118 @@
 """
 Skills Fetcher - 从 skills.sh/trending 获取技能排行榜
-使用 Playwright 处理动态渲染页面
+优先直接解析页面的 hydrate 数据载荷（无需浏览器），失败时使用 Playwright 渲染页面
 """
-import re
+import time
 import asyncio
-from typing import Dict, List
-from playwright.async_api import async_playwright
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+import requests
+
+from src.browser_pool import BrowserPool, get_browser_pool
+from src.resource_policy import ResourcePolicy
+from src.leaderboard_parser import LeaderboardParser, parse_installs
+from src.database import Database
+from src.leaderboard_payload import (
+    extract_payloads,
+    decode_flight,
+    find_skill_records,
+    decode_skills,
+    validate_skills,
+)
+from src.config import (
+    SKILLS_TRENDING_URL,
+    SKILLS_BASE_URL,
+    SKILLS_FETCH_MODE,
+    SKILLS_FAST_TIMEOUT,
+    SKILLS_CATALOG_BATCH_SIZE,
+    SKILLS_CATALOG_MAX_IDLE_SCROLLS,
+    CATALOG_DB_PATH,
+    CATALOG_RETENTION_DAYS,
+    CATALOG_ARCHIVE_DIR,
+    SKILLS_READY_ROWS_TIMEOUT,
+    SKILLS_READY_NETWORKIDLE_TIMEOUT,
+    SKILLS_READY_STABLE_TIMEOUT,
+    SKILLS_READY_MIN_ROWS,
+)
+
+
+# 页面端检测排行榜行是否已渲染: rank\nname\nowner\ninstalls（兼容旧 ### 格式）
+ROWS_READY_JS = r"""
+(minRows) => {
+    const text = document.body ? document.body.innerText : "";
+    const rows = text.match(/^\s*\d+\s*\n\s*(?:###\s*)?[\w-]+\s*\n\s*[\w-]+\/[\w-]+\s*\n\s*[\d.]+K?\s*$/gm);
+    return rows !== null && rows.length >= minRows;
+}
+"""
 
-from src.config import SKILLS_TRENDING_URL, SKILLS_BASE_URL
+CONTENT_LENGTH_JS = "() => document.body ? document.body.innerText.length : 0"
+
+# 只取回上次读到的位置之后的文本，避免每次滚动都跨进程传输整页内容。
+# 位置按内容定位（上次读到的末尾文本 anchor），虚拟化列表移除顶部行时位置不会错位；
+# 找不到 anchor 时返回整页文本
+TEXT_TAIL_JS = """
+(anchor) => {
+    const text = document.body ? document.body.innerText : "";
+    const index = anchor ? text.lastIndexOf(anchor) : -1;
+    if (index < 0) return {found: false, tail: text};
+    return {found: true, tail: text.slice(index + anchor.length)};
+}
+"""
+
+# anchor 取已读取文本末尾的字符数（覆盖多条记录，足以在页面中唯一定位）
+ANCHOR_CHARS = 256
+
+# 滚动到底部；存在 "Load more" / "Show more" 按钮时点击翻页
+SCROLL_MORE_JS = """
+() => {
+    window.scrollTo(0, document.body.scrollHeight);
+    const button = Array.from(document.querySelectorAll("button, a"))
+        .find(el => /^(load|show) more$/i.test((el.innerText || "").trim()));
+    if (button) { button.click(); return true; }
+    return false;
+}
+"""
 
 
 class SkillsFetcher:
     """从 skills.sh/trending 获取排行榜"""
 
-    def __init__(self, timeout: int = 30000):
-        """初始化"""
+    def __init__(self, timeout: int = 30000, pool: BrowserPool = None):
+        """
+        初始化
+
+        Args:
+            timeout: 页面超时时间（毫秒）
+            pool: 浏览器池，默认使用进程级共享池
+        """
         self.base_url = SKILLS_BASE_URL
         self.trending_url = SKILLS_TRENDING_URL
         self.timeout = timeout
+        self.pool = pool or get_browser_pool()
+
+        # 就绪检测配置（毫秒）
+        self.rows_timeout = SKILLS_READY_ROWS_TIMEOUT
+        self.networkidle_timeout = SKILLS_READY_NETWORKIDLE_TIMEOUT
+        self.stable_timeout = SKILLS_READY_STABLE_TIMEOUT
+        self.min_rows = SKILLS_READY_MIN_ROWS
+
+        # 最近一次抓取各等待阶段的实际耗时（秒）及判定就绪的方式
+        self.wait_timings: Dict[str, float] = {}
+        self.ready_by: Optional[str] = None
+
+        # 最近一次抓取的资源拦截统计
+        self.resource_stats: Dict = {}
 
-    def fetch(self) -> List[Dict]:
+        # 最近一次全量榜单抓取的重新定位次数和缺失排名数
+        self.catalog_stats: Dict[str, int] = {}
+
+    def fetch(self, mode: str = None) -> List[Dict]:
         """
         获取 Top 100 技能列表
 
+        Args:
+            mode: auto=优先数据载荷、失败回退浏览器, fast=仅数据载荷, browser=仅浏览器；
+                  默认使用配置 SKILLS_FETCH_MODE
+
         Returns:
             [
                 {
@@ -35,10 +125,70 @@ class SkillsFetcher:
                 ...
             ]
         """
-        print(f"📡 正在获取榜单: {self.trending_url}")
+        mode = (mode or SKILLS_FETCH_MODE).lower()
+        print(f"📡 正在获取榜单: {self.trending_url} (模式: {mode})")
+
+        if mode in ("auto", "fast"):
+            try:
+                return self.fetch_fast()
+            except Exception as e:
+                if mode == "fast":
+                    raise
+                print(f"  ⚠️ 数据载荷解析失败，回退到浏览器渲染: {e}")
+
+        # 在浏览器池的事件循环中运行异步方法（重试之间复用同一个 Chromium）
+        return self.pool.run(self._fetch_async())
+
+    def fetch_fast(self) -> List[Dict]:
+        """
+        无浏览器快速路径：直接请求页面，解码 Next.js hydrate 数据载荷
 
-        # 运行异步方法
-        return asyncio.run(self._fetch_async())
+        先解析 HTML 内嵌的 __NEXT_DATA__ / self.__next_f 载荷，
+        找不到时再以 RSC 请求头获取 flight 数据。结果需通过结构校验。
+
+        Returns:
+            技能列表（格式同 fetch）
+        """
+        started = time.perf_counter()
+        headers = {"User-Agent": "Mozilla/5.0 (compatible; SkillsTrendingBot/1.0)"}
+
+        response = requests.get(self.trending_url, headers=headers, timeout=SKILLS_FAST_TIMEOUT)
+        response.raise_for_status()
+        skills, reason = self._decode_payloads(extract_payloads(response.text))
+
+        if reason:
+            # HTML 中没有可用载荷，直接请求 RSC flight 数据
+            rsc_headers = dict(headers, RSC="1")
+            response = requests.get(self.trending_url, headers=rsc_headers, timeout=SKILLS_FAST_TIMEOUT)
+            response.raise_for_status()
+            skills, reason = self._decode_payloads(list(decode_flight(response.text)))
+
+        if reason:
+            raise Exception(f"数据载荷校验失败: {reason}")
+
+        self.wait_timings = {"fast": time.perf_counter() - started}
+        self.ready_by = "payload"
+        print(f"✅ 成功获取 {len(skills)} 个技能 (数据载荷, {self.wait_timings['fast']:.2f}s)")
+        return skills
+
+    def _decode_payloads(self, payloads: List) -> tuple:
+        """
+        从载荷中解码并校验排行榜
+
+        Returns:
+            (技能列表, 失败原因)，成功时失败原因为 None
+        """
+        if not payloads:
+            return [], "未找到数据载荷"
+
+        records = []
+        for payload in payloads:
+            candidate = find_skill_records(payload, self.min_rows)
+            if len(candidate) > len(records):
+                records = candidate
+
+        skills = decode_skills(records, self.base_url)
+        return skills, validate_skills(skills, self.min_rows)
 
     async def _fetch_async(self) -> List[Dict]:
         """异步获取数据 - 带重试机制"""
@@ -47,37 +197,28 @@ class SkillsFetcher:
 
         for attempt in range(max_retries):
             try:
-                async with async_playwright() as p:
-                    # 启动浏览器 - CI 环境使用 headless 模式
-                    browser = await p.chromium.launch(
-                        headless=True,
-                        args=[
-                            '--disable-dev-shm-usage',
-                            '--no-sandbox',
-                            '--disable-setuid-sandbox',
-                            '--disable-blink-features=AutomationControlled',
-                        ]
-                    )
-
-                    # 创建页面
-                    page = await browser.new_page()
-
-                    # 设置用户代理，避免被识别为机器人
-                    await page.set_extra_http_headers({
-                        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-                    })
+                async with self.pool.page() as page:
+                    # 拦截图片/字体/样式/统计脚本，只保留渲染榜单所需的资源
+                    policy = ResourcePolicy.from_config()
+                    if policy:
+                        await policy.attach(page)
 
                     # 导航到页面
                     print(f"  正在加载页面... (尝试 {attempt + 1}/{max_retries})")
+                    self.wait_timings = {}
+                    started = time.perf_counter()
                     await page.goto(self.trending_url, wait_until="domcontentloaded", timeout=60000)
+                    self.wait_timings["goto"] = time.perf_counter() - started
 
-                    # 等待页面稳定
-                    await asyncio.sleep(15)
+                    # 等待排行榜就绪（行出现 / 网络空闲 / 内容稳定）
+                    self.ready_by = await self._wait_until_ready(page)
 
-                    # 尝试滚动页面以确保内容加载
+                    # 尝试滚动页面以确保内容加载，随后等待内容稳定
                     try:
                         await page.evaluate("window.scrollTo(0, document.body.scrollHeight / 2)")
-                        await asyncio.sleep(2)
+                        started = time.perf_counter()
+                        await self._wait_for_stable_content(page, timeout=2000)
+                        self.wait_timings["scroll"] = time.perf_counter() - started
                     except:
                         pass
 
@@ -86,23 +227,19 @@ class SkillsFetcher:
 
                     # 调试：检查内容
                     print(f"  页面内容长度: {len(content)} 字符")
+                    print(f"  就绪方式: {self.ready_by or '超时'}, 等待耗时: {self._format_timings()}")
+                    if policy:
+                        self.resource_stats = policy.get_stats()
+                        print(f"  资源: {policy.format_stats()}")
 
-                    # 检查是否包含关键内容
-                    if "Skills Leaderboard" not in content and "Leaderboard" not in content:
-                        print(f"  ⚠️ 未找到排行榜标题，等待更长时间...")
-                        await asyncio.sleep(15)
-                        content = await page.evaluate("() => document.body.innerText")
-
-                    await browser.close()
+                # 解析排行榜（页面已归还浏览器池）
+                skills = self.parse_leaderboard(content)
 
-                    # 解析排行榜
-                    skills = self.parse_leaderboard(content)
+                if skills:
+                    print(f"✅ 成功获取 {len(skills)} 个技能")
+                    return skills
 
-                    if skills:
-                        print(f"✅ 成功获取 {len(skills)} 个技能")
-                        return skills
-
-                    raise Exception("无法从页面解析技能列表")
+                raise Exception("无法从页面解析技能列表")
 
             except Exception as e:
                 print(f"  ⚠️ 尝试 {attempt + 1} 失败: {e}")
@@ -113,6 +250,220 @@ class SkillsFetcher:
 
         raise Exception("获取失败：已达最大重试次数")
 
+    def iter_catalog(self, batch_size: int = None, max_rows: int = None) -> Iterator[List[Dict]]:
+        """
+        同步遍历全量榜单（stream_catalog 的同步包装）
+
+        Args:
+            batch_size: 每批技能数
+            max_rows: 最多抓取的技能数，默认不限
+
+        Yields:
+            按排名顺序的技能批次
+        """
+        agen = self.stream_catalog(batch_size=batch_size, max_rows=max_rows)
+        try:
+            while True:
+                try:
+                    yield self.pool.run(agen.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            self.pool.run(agen.aclose())
+
+    async def stream_catalog(self, batch_size: int = None, max_rows: int = None,
+                             max_idle_scrolls: int = None) -> AsyncIterator[List[Dict]]:
+        """
+        流式抓取 Top 100 之外的全量榜单
+
+        不断滚动 / 点击 "Load more"，每次只取回上次读到的文本之后的部分并增量解析，
+        解析出的技能按批产出。已产出的记录不在内存中保留：依靠排名单调递增去重，
+        因此内存占用只与批大小有关，与榜单总长度无关。
+
+        读取位置按内容定位而不是字符偏移：虚拟化列表移除顶部行、文本长度不变甚至变长时也不会跳过记录。
+        定位失败或排名出现缺口时从整页文本重新读取一次；仍然缺失的排名计入 catalog_stats["rank_gaps"]。
+
+        Args:
+            batch_size: 每批技能数
+            max_rows: 最多抓取的技能数，默认不限
+            max_idle_scrolls: 连续多少次滚动无新数据后停止
+
+        Yields:
+            按排名顺序的技能批次
+        """
+        batch_size = batch_size or SKILLS_CATALOG_BATCH_SIZE
+        max_idle_scrolls = max_idle_scrolls or SKILLS_CATALOG_MAX_IDLE_SCROLLS
+
+        print(f"📡 正在流式获取全量榜单: {self.trending_url}")
+
+        async with self.pool.page() as page:
+            policy = ResourcePolicy.from_config()
+            if policy:
+                await policy.attach(page)
+
+            self.wait_timings = {}
+            started = time.perf_counter()
+            await page.goto(self.trending_url, wait_until="domcontentloaded", timeout=60000)
+            self.wait_timings["goto"] = time.perf_counter() - started
+            self.ready_by = await self._wait_until_ready(page)
+
+            parser = LeaderboardParser(self.base_url, streaming=True)
+            self.catalog_stats = {"resyncs": 0, "rank_gaps": 0}
+            batch: List[Dict] = []
+            anchor = ""
+            last_rank = 0
+            total = 0
+            idle_scrolls = 0
+            # 本轮是否读取的是整页文本（排名缺口只重读一次）
+            full_read = True
+
+            while True:
+                result = await page.evaluate(TEXT_TAIL_JS, anchor)
+                if not result["found"]:
+                    if anchor:
+                        # 上次读到的位置已不在页面中：从头重新读取，靠排名高水位去重
+                        self.catalog_stats["resyncs"] += 1
+                        parser.restart()
+                    full_read = True
+
+                # 只处理完整的行，末尾未换行的部分留到下一轮
+                tail = result["tail"]
+                cut = tail.rfind("\n") + 1
+                parser.feed(tail[:cut])
+                # 新读到的文本在页面中紧接着 anchor，拼接后仍是页面中连续的一段
+                read = (anchor if result["found"] else "") + tail[:cut]
+                anchor = read[-ANCHOR_CHARS:] or anchor
+
+                skills = [skill for skill in parser.drain() if skill["rank"] > last_rank]
+                if skills and skills[0]["rank"] > last_rank + 1 and not full_read:
+                    # 排名出现缺口：中间的行可能在读取前已被移出页面，从整页文本重新读取
+                    self.catalog_stats["resyncs"] += 1
+                    anchor = ""
+                    parser.restart()
+                    continue
+                full_read = False
+
+                new_rows = 0
+                for skill in skills:
+                    if skill["rank"] > last_rank + 1:
+                        self.catalog_stats["rank_gaps"] += skill["rank"] - last_rank - 1
+                    last_rank = skill["rank"]
+                    batch.append(skill)
+                    new_rows += 1
+                    total += 1
+
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+
+                    if max_rows and total >= max_rows:
+                        break
+
+                if max_rows and total >= max_rows:
+                    break
+
+                idle_scrolls = 0 if new_rows else idle_scrolls + 1
+                if idle_scrolls >= max_idle_scrolls:
+                    break
+
+                await page.evaluate(SCROLL_MORE_JS)
+                await self._wait_for_stable_content(page, timeout=self.stable_timeout)
+
+            if batch:
+                yield batch
+
+        if self.catalog_stats["rank_gaps"]:
+            print(f"  ⚠️ 全量榜单缺少 {self.catalog_stats['rank_gaps']} 个排名"
+                  f"（重新定位 {self.catalog_stats['resyncs']} 次）")
+        print(f"✅ 全量榜单获取完成: {total} 个技能")
+
+    async def _wait_until_ready(self, page) -> Optional[str]:
+        """
+        等待排行榜渲染完成，按顺序尝试三种就绪策略，行一出现立即返回
+
+        1. rows: 页面文本中出现至少 min_rows 条排行榜记录
+        2. networkidle: 网络空闲后再检查一次排行榜行
+        3. stable: 轮询页面文本长度，直到不再变化
+
+        Args:
+            page: Playwright 页面
+
+        Returns:
+            判定就绪的策略名，全部超时返回 None
+        """
+        # 1. 等待排行榜行出现
+        started = time.perf_counter()
+        try:
+            await page.wait_for_function(
+                ROWS_READY_JS,
+                arg=self.min_rows,
+                timeout=self.rows_timeout,
+                polling=250
+            )
+            return "rows"
+        except Exception:
+            pass
+        finally:
+            self.wait_timings["rows"] = time.perf_counter() - started
+
+        print(f"  ⚠️ {self.rows_timeout}ms 内未检测到排行榜行，等待网络空闲...")
+
+        # 2. 等待网络空闲
+        started = time.perf_counter()
+        try:
+            await page.wait_for_load_state("networkidle", timeout=self.networkidle_timeout)
+            if await page.evaluate(ROWS_READY_JS, self.min_rows):
+                return "networkidle"
+        except Exception:
+            pass
+        finally:
+            self.wait_timings["networkidle"] = time.perf_counter() - started
+
+        # 3. 等待内容长度稳定
+        started = time.perf_counter()
+        try:
+            if await self._wait_for_stable_content(page, timeout=self.stable_timeout):
+                return "stable"
+        finally:
+            self.wait_timings["stable"] = time.perf_counter() - started
+
+        return None
+
+    async def _wait_for_stable_content(self, page, timeout: int, interval: float = 0.25,
+                                       stable_polls: int = 2) -> bool:
+        """
+        轮询页面文本长度，连续 stable_polls 次不变即认为稳定
+
+        Args:
+            page: Playwright 页面
+            timeout: 超时时间（毫秒）
+            interval: 轮询间隔（秒）
+            stable_polls: 需要连续不变的次数
+
+        Returns:
+            是否在超时前达到稳定
+        """
+        deadline = time.perf_counter() + timeout / 1000
+        last_length = -1
+        unchanged = 0
+
+        while time.perf_counter() < deadline:
+            length = await page.evaluate(CONTENT_LENGTH_JS)
+            if length > 0 and length == last_length:
+                unchanged += 1
+                if unchanged >= stable_polls:
+                    return True
+            else:
+                unchanged = 0
+            last_length = length
+            await asyncio.sleep(interval)
+
+        return False
+
+    def _format_timings(self) -> str:
+        """格式化各等待阶段耗时"""
+        return ", ".join(f"{phase}={seconds:.2f}s" for phase, seconds in self.wait_timings.items())
+
     def parse_leaderboard(self, html_content: str) -> List[Dict]:
         """
         解析排行榜 - skills.sh 页面使用文本格式
@@ -125,93 +476,31 @@ class SkillsFetcher:
         remotion-dev/skills
         7.0K
         ...
-        """
-        skills = []
 
-        # 查找排行榜开始位置 - 支持多种格式
-        for marker in ["SKILLS LEADERBOARD", "Skills Leaderboard", "LEADERBOARD", "Leaderboard"]:
-            leaderboard_start = html_content.find(marker)
-            if leaderboard_start != -1:
-                print(f"  找到标记: '{marker}'")
-                break
+        单次遍历页面文本，兼容旧的 "### name" 格式，详见 LeaderboardParser
+        """
+        parser = LeaderboardParser(self.base_url)
+        skills = parser.parse(html_content)
 
-        if leaderboard_start == -1:
+        if parser.marker is None:
             # 调试：打印页面内容的前1000字符
             preview = html_content[:1000] if html_content else "(空内容)"
             print(f"  ⚠️ 页面内容预览:\n{preview}")
             raise Exception("未找到 Skills Leaderboard 标题")
 
-        # 提取排行榜部分
-        content = html_content[leaderboard_start:]
-
-        # 新格式: 没有###前缀，直接是 rank\nname\nowner\ninstalls
-        # 格式示例:
-        # 1
-        # remotion-best-practices
-        # remotion-dev/skills
-        # 7.0K
-
-        patterns = [
-            # 模式1: 新格式 (无###前缀)
-            r'(\d+)\s*\n\s*([a-z0-9-]+)\s*\n\s*([\w-]+/[\w-]+)\s*\n\s*([\d.]+K?)',
-            # 模式2: 允许更多字符
-            r'(\d+)\s*\n\s*([a-zA-Z0-9_-]+)\s*\n\s*([\w-]+/[\w-]+)\s*\n\s*([\d.]+K?)',
-            # 模式3: 旧格式 (有###前缀)
-            r'(\d+)\s*\n\s*###\s*([\w-]+)\s*\n\s*([\w-]+/[\w-]+)\s*\n\s*([\d.]+K?)',
-            # 模式4: 最宽松
-            r'(\d+)\s+([a-zA-Z0-9_-]+)\s+([\w-]+/[\w-]+)\s+([\d.]+K?)',
-        ]
-
-        skills_dict = {}  # 用于去重，保留最新排名
-
-        for i, pattern in enumerate(patterns):
-            matches = re.finditer(pattern, content, re.MULTILINE)
-
-            for match in matches:
-                rank = int(match.group(1))
-                name = match.group(2)
-                owner = match.group(3)
-                installs_str = match.group(4)
-
-                # 处理安装量
-                installs = self._parse_installs(installs_str)
-
-                # 只保留每个技能的最高排名（第一次出现）
-                if name not in skills_dict or skills_dict[name]["rank"] > rank:
-                    skills_dict[name] = {
-                        "rank": rank,
-                        "name": name,
-                        "owner": owner,
-                        "installs": installs,
-                        "url": f"{self.base_url}/{owner}/{name}"
-                    }
-
-            if skills_dict:
-                print(f"  使用模式 {i+1} 匹配到 {len(skills_dict)} 个技能")
-                break
-
-        # 按排名排序
-        skills = sorted(skills_dict.values(), key=lambda x: x["rank"])
+        print(f"  找到标记: '{parser.marker}'")
+        print(f"  解析到 {len(skills)} 个技能，拒绝 {parser.rejected_count} 行")
+
+        if not skills and parser.rejections:
+            # 调试：输出前几条拒绝原因
+            for line_no, line, reason in parser.rejections[:10]:
+                print(f"    第 {line_no} 行 {reason}: {line!r}")
 
         return skills
 
     def _parse_installs(self, installs_str: str) -> int:
         """解析安装量字符串"""
-        if not installs_str:
-            return 0
-
-        installs_str = installs_str.strip().upper()
-
-        if "K" in installs_str:
-            try:
-                return int(float(installs_str.replace("K", "")) * 1000)
-            except ValueError:
-                return 0
-
-        try:
-            return int(installs_str)
-        except ValueError:
-            return 0
+        return parse_installs(installs_str)
 
     def get_date_range(self) -> tuple:
         """获取可用日期范围"""
@@ -222,3 +511,30 @@ def fetch_skills() -> List[Dict]:
     """便捷函数：获取技能列表"""
     fetcher = SkillsFetcher()
     return fetcher.fetch()
+
+
+def save_full_catalog(snapshot_time: str, date: str, db: Database = None, max_rows: int = None) -> int:
+    """
+    便捷函数：流式抓取全量榜单并直接写入快照（不在内存中汇总成列表）
+
+    默认写入单独的 CATALOG_DB_PATH，避免全量快照干扰每日 Top 100 的趋势对比；
+    写入后按 CATALOG_RETENTION_DAYS 清理过期的全量快照（开启归档时先归档到 CATALOG_ARCHIVE_DIR）
+
+    Returns:
+        写入的技能数
+    """
+    owns_db = db is None
+    if owns_db:
+        db = Database(CATALOG_DB_PATH, archive_dir=CATALOG_ARCHIVE_DIR)
+        db.init_db()
+
+    fetcher = SkillsFetcher()
+    rows = (skill for batch in fetcher.iter_catalog(max_rows=max_rows) for skill in batch)
+    try:
+        count = db.save_snapshot(snapshot_time, date, rows)
+        if owns_db:
+            db.cleanup_old_data(CATALOG_RETENTION_DAYS)
+        return count
+    finally:
+        if owns_db:
+            db.close()
@@ -0,0 +1,174 @@
+"""
+Token Budget - Claude 提示词的 token 预算
+估算每个技能的输入/输出 token，按预算裁剪过长字段、确定 max_tokens 并划分请求块
+"""
+import math
+from typing import Dict, List
+
+from src.config import (
+    CLAUDE_MAX_TOKENS,
+    CLAUDE_CHUNK_SIZE,
+    CLAUDE_INPUT_BUDGET,
+    CLAUDE_SKILL_INPUT_TOKENS,
+    CLAUDE_OUTPUT_TOKENS_PER_SKILL,
+)
+
+
+# 每个技能在提示词中的固定开销（分隔线、标题、名称/拥有者/URL 标签）
+SKILL_OVERHEAD_TOKENS = 40
+# 输出的固定开销（代码块标记、数组括号）
+OUTPUT_OVERHEAD_TOKENS = 50
+# max_tokens 相对输出估算的余量
+OUTPUT_SAFETY_FACTOR = 1.3
+# 提示词中每个技能最多列出的规则数及每条描述的最大字符数
+MAX_RULES = 5
+MAX_RULE_DESC_CHARS = 120
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    粗略估算文本的 token 数（不依赖分词器）
+
+    中日韩字符约 1 token/字，其余字符约 4 字符/token
+
+    Args:
+        text: 文本
+
+    Returns:
+        估算的 token 数
+    """
+    if not text:
+        return 0
+    cjk = sum(1 for ch in text if ch >= "\u2e80")  # CJK 部首及之后的码位（含汉字、全角标点）
+    return cjk + math.ceil((len(text) - cjk) / 4)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    把文本截断到约 max_tokens 个 token（按估算比例截取，末尾加省略号）
+
+    Args:
+        text: 文本
+        max_tokens: token 上限
+
+    Returns:
+        截断后的文本，未超限时原样返回
+    """
+    tokens = estimate_tokens(text)
+    if tokens <= max_tokens:
+        return text
+    if max_tokens <= 0:
+        return ""
+    keep = max(1, int(len(text) * max_tokens / tokens))
+    return text[:keep].rstrip() + "…"
+
+
+class TokenBudget:
+    """提示词 token 预算"""
+
+    def __init__(self, input_budget: int = None, skill_input_tokens: int = None,
+                 output_tokens_per_skill: int = None, max_output_tokens: int = None,
+                 max_chunk_size: int = None):
+        """
+        初始化
+
+        Args:
+            input_budget: 每个请求中技能内容部分的输入 token 上限
+            skill_input_tokens: 单个技能的输入 token 上限（超出时裁剪）
+            output_tokens_per_skill: 每个技能的预计输出 token
+            max_output_tokens: max_tokens 上限
+            max_chunk_size: 每个请求最多包含的技能数
+        """
+        self.input_budget = input_budget or CLAUDE_INPUT_BUDGET
+        self.skill_input_tokens = min(skill_input_tokens or CLAUDE_SKILL_INPUT_TOKENS, self.input_budget)
+        self.output_tokens_per_skill = output_tokens_per_skill or CLAUDE_OUTPUT_TOKENS_PER_SKILL
+        self.max_output_tokens = max_output_tokens or CLAUDE_MAX_TOKENS
+        self.max_chunk_size = max(1, max_chunk_size or CLAUDE_CHUNK_SIZE)
+        self.stats = {"trimmed": 0}
+
+    def trim_detail(self, detail: Dict) -> Dict:
+        """
+        按单个技能的 token 上限裁剪提示词字段
+
+        依次：规则最多保留 5 条 → 截短规则描述 → 截短 when_to_use
+
+        Args:
+            detail: 技能详情
+
+        Returns:
+            裁剪后的副本，包含 when_to_use、rules、rules_total 和估算的 input_tokens
+        """
+        rules = detail.get("rules") or []
+        trimmed_rules = [
+            {
+                "file": rule.get("file"),
+                "desc": (rule.get("desc") or "")[:MAX_RULE_DESC_CHARS]
+            }
+            for rule in rules[:MAX_RULES]
+        ]
+        rules_tokens = sum(estimate_tokens(f"  - {r['file']}: {r['desc']}") for r in trimmed_rules)
+
+        header = f"{detail.get('name')}{detail.get('owner')}{detail.get('url')}"
+        fixed_tokens = SKILL_OVERHEAD_TOKENS + estimate_tokens(header) + rules_tokens
+
+        when_to_use = detail.get("when_to_use") or ""
+        allowed = max(0, self.skill_input_tokens - fixed_tokens)
+        short_when_to_use = truncate_to_tokens(when_to_use, allowed)
+
+        changed = short_when_to_use != when_to_use or any(
+            r["desc"] != (orig.get("desc") or "") for r, orig in zip(trimmed_rules, rules)
+        )
+        if changed:
+            self.stats["trimmed"] += 1
+
+        return {
+            **detail,
+            "when_to_use": short_when_to_use,
+            "rules": trimmed_rules,
+            "rules_total": len(rules),
+            "input_tokens": fixed_tokens + estimate_tokens(short_when_to_use),
+        }
+
+    def max_tokens_for(self, skill_count: int) -> int:
+        """
+        根据技能数确定 max_tokens
+
+        Args:
+            skill_count: 本次请求的技能数
+
+        Returns:
+            max_tokens（不超过配置的上限）
+        """
+        expected = OUTPUT_OVERHEAD_TOKENS + skill_count * self.output_tokens_per_skill
+        return min(self.max_output_tokens, math.ceil(expected * OUTPUT_SAFETY_FACTOR))
+
+    def plan_chunks(self, details: List[Dict]) -> List[List[Dict]]:
+        """
+        按输入预算、输出上限和最大块大小贪心划分请求块
+
+        Args:
+            details: 已裁剪的技能详情（带 input_tokens）
+
+        Returns:
+            分块后的技能详情
+        """
+        per_skill_output = self.output_tokens_per_skill * OUTPUT_SAFETY_FACTOR
+        max_by_output = max(1, int((self.max_output_tokens - OUTPUT_OVERHEAD_TOKENS) / per_skill_output))
+        max_skills = min(self.max_chunk_size, max_by_output)
+
+        chunks: List[List[Dict]] = []
+        current: List[Dict] = []
+        current_tokens = 0
+
+        for detail in details:
+            tokens = detail.get("input_tokens") or 0
+            if current and (len(current) >= max_skills or current_tokens + tokens > self.input_budget):
+                chunks.append(current)
+                current, current_tokens = [], 0
+            current.append(detail)
+            current_tokens += tokens
+
+        if current:
+            chunks.append(current)
+
+        return chunks
@@ -53,9 +53,10 @@ class TrendAnalyzer:
         # 保存今日数据（包含变化值）
         self.db.save_today_data(date, today_with_delta)
 
-        # 获取 AI 摘要
+        # 获取 AI 摘要（只查今日和上次榜单中出现的技能）
         if ai_summaries is None:
-            ai_summaries = self.db.get_all_skill_details()
+            names = [s["name"] for s in today_with_delta]
+            ai_summaries = self.db.get_skill_details_many(names + list(yesterday_map))
 
         # 找出各种趋势
         results = {